@@ -0,0 +1,117 @@
+"""Compare the throughput (MB/s) and peak memory of the chunking strategies against the previous chunker.
+
+Usage:
+    python cookbook/knowledge/chunking_benchmark.py [path/to/large.txt] [--size-mb 50]
+
+Without a path, a synthetic text of --size-mb megabytes is generated.
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterable, List
+
+from phi.document import Document
+from phi.document.chunking import ChunkingStrategy, FixedSizeChunking, SentenceChunking
+
+
+def legacy_chunk_document(document: Document, chunk_size: int = 3000) -> List[Document]:
+    """The previous `Reader.chunk_document`: six regex passes and a character by character boundary search"""
+    cleaned_content = document.content
+    for pattern, replacement in [
+        (r"\n+", "\n"),
+        (r"\s+", " "),
+        (r"\t+", "\t"),
+        (r"\r+", "\r"),
+        (r"\f+", "\f"),
+        (r"\v+", "\v"),
+    ]:
+        cleaned_content = re.sub(pattern, replacement, cleaned_content)
+    content_length = len(cleaned_content)
+    chunked_documents: List[Document] = []
+    chunk_number = 1
+    start = 0
+    while start < content_length:
+        end = start + chunk_size
+        if end < content_length:
+            while end > start and cleaned_content[end] not in [" ", "\n", "\r", "\t"]:
+                end -= 1
+        if end == start:
+            end = start + chunk_size
+        if end > content_length:
+            end = content_length
+        chunk = cleaned_content[start:end]
+        meta_data = document.meta_data.copy()
+        meta_data["chunk"] = chunk_number
+        meta_data["chunk_size"] = len(chunk)
+        chunked_documents.append(
+            Document(id=f"{document.name}_{chunk_number}", name=document.name, meta_data=meta_data, content=chunk)
+        )
+        chunk_number += 1
+        start = end
+    return chunked_documents
+
+
+def synthetic_text(size_mb: float) -> str:
+    rnd = random.Random(0)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do"]
+    parts: List[str] = []
+    size = 0
+    while size < size_mb * 1024 * 1024:
+        sentence = " ".join(rnd.choice(words) for _ in range(rnd.randint(5, 25))).capitalize() + ". "
+        if rnd.random() < 0.1:
+            sentence += "\n\n"
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)
+
+
+def consume(chunk: Callable[[Document], Iterable[Document]], document: Document) -> int:
+    # Consume the chunks one at a time, as a loader embedding and writing them would
+    num_chunks = 0
+    for _ in chunk(document):
+        num_chunks += 1
+    return num_chunks
+
+
+def benchmark(name: str, text: str, chunk: Callable[[Document], Iterable[Document]]) -> None:
+    document = Document(name="benchmark", content=text)
+
+    # Measure throughput and peak memory in separate runs, tracemalloc slows down allocations
+    start = time.perf_counter()
+    num_chunks = consume(chunk, document)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    consume(chunk, document)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size_mb = len(text.encode()) / (1024 * 1024)
+    print(f"{name:<32} {num_chunks:>8} chunks {size_mb / elapsed:>8.1f} MB/s  peak {peak / (1024 * 1024):>8.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", help="Text file to chunk")
+    parser.add_argument("--size-mb", type=float, default=50, help="Size of the synthetic text")
+    parser.add_argument("--chunk-size", type=int, default=3000)
+    args = parser.parse_args()
+
+    text = Path(args.path).read_text() if args.path else synthetic_text(args.size_mb)
+    strategies: List[ChunkingStrategy] = [
+        FixedSizeChunking(chunk_size=args.chunk_size),
+        FixedSizeChunking(chunk_size=args.chunk_size, overlap=args.chunk_size // 10),
+        SentenceChunking(chunk_size=args.chunk_size),
+    ]
+
+    benchmark("legacy chunk_document", text, lambda d: legacy_chunk_document(d, args.chunk_size))
+    for strategy in strategies:
+        benchmark(f"{strategy.__class__.__name__}(overlap={strategy.overlap})", text, strategy.chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from os import getenv
 from uuid import uuid4
@@ -729,6 +730,35 @@ class Assistant(BaseModel):
 
         return json.dumps([doc.to_dict() for doc in relevant_docs], indent=2)
 
+    async def aget_references_from_knowledge_base(
+        self, query: str, num_documents: Optional[int] = None
+    ) -> Optional[str]:
+        """Async version of `get_references_from_knowledge_base`"""
+
+        if self.references_function is not None:
+            return await asyncio.to_thread(self.get_references_from_knowledge_base, query, num_documents)
+
+        if self.knowledge_base is None:
+            return None
+
+        relevant_docs: List[Document] = await self.knowledge_base.async_search(query=query, num_documents=num_documents)
+        if len(relevant_docs) == 0:
+            return None
+
+        if self.references_format == "yaml":
+            import yaml
+
+            return yaml.dump([doc.to_dict() for doc in relevant_docs])
+
+        return json.dumps([doc.to_dict() for doc in relevant_docs], indent=2)
+
+    def get_references_cache_metrics(self) -> Dict[str, Any]:
+        """Returns the retrieval cache metrics of the knowledge base, recorded with the references"""
+
+        if self.knowledge_base is None or self.knowledge_base.cache is None:
+            return {}
+        return self.knowledge_base.cache.get_metrics()
+
     def get_formatted_chat_history(self) -> Optional[str]:
         """Returns a formatted chat history to add to the user prompt"""
 
@@ -867,7 +897,10 @@ class Assistant(BaseModel):
                 user_prompt_references = self.get_references_from_knowledge_base(query=message)
                 reference_timer.stop()
                 references = References(
-                    query=message, references=user_prompt_references, time=round(reference_timer.elapsed, 4)
+                    query=message,
+                    references=user_prompt_references,
+                    time=round(reference_timer.elapsed, 4),
+                    **self.get_references_cache_metrics(),
                 )
                 logger.debug(f"Time to get references: {reference_timer.elapsed:.4f}s")
             # Add chat history to the user prompt
@@ -1065,10 +1098,13 @@ class Assistant(BaseModel):
             if self.add_references_to_prompt and message and isinstance(message, str):
                 reference_timer = Timer()
                 reference_timer.start()
-                user_prompt_references = self.get_references_from_knowledge_base(query=message)
+                user_prompt_references = await self.aget_references_from_knowledge_base(query=message)
                 reference_timer.stop()
                 references = References(
-                    query=message, references=user_prompt_references, time=round(reference_timer.elapsed, 4)
+                    query=message,
+                    references=user_prompt_references,
+                    time=round(reference_timer.elapsed, 4),
+                    **self.get_references_cache_metrics(),
                 )
                 logger.debug(f"Time to get references: {reference_timer.elapsed:.4f}s")
             # Add chat history to the user prompt
@@ -1342,7 +1378,12 @@ class Assistant(BaseModel):
         reference_timer.start()
         references = self.get_references_from_knowledge_base(query=query)
         reference_timer.stop()
-        _ref = References(query=query, references=references, time=round(reference_timer.elapsed, 4))
+        _ref = References(
+            query=query,
+            references=references,
+            time=round(reference_timer.elapsed, 4),
+            **self.get_references_cache_metrics(),
+        )
         self.memory.add_references(references=_ref)
         return references or ""
 
@@ -9,6 +9,7 @@ import typer
 
 from phi.cli.ws.ws_cli import ws_cli
 from phi.cli.k.k_cli import k_cli
+from phi.cli.vectordb.vectordb_cli import vectordb_cli
 from phi.utils.log import set_log_level_to_debug, logger
 
 phi_cli = typer.Typer(
@@ -646,3 +647,4 @@ def restart(
 
 phi_cli.add_typer(ws_cli)
 phi_cli.add_typer(k_cli)
+phi_cli.add_typer(vectordb_cli)
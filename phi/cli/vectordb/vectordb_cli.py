@@ -0,0 +1,128 @@
+"""Phidata Vector DB Cli
+
+This is the entrypoint for the `phi vectordb` commands.
+"""
+
+import json
+from typing import Optional
+
+import typer
+
+from phi.cli.console import print_info
+from phi.utils.log import set_log_level_to_debug
+
+vectordb_cli = typer.Typer(
+    name="vectordb",
+    short_help="Maintain vector db collections",
+    help="""\b
+Use `phi vectordb [COMMAND]` to maintain the indexes of PgVector2 collections, e.g. from a scheduled job.
+Run `phi vectordb [COMMAND] --help` for more info.
+""",
+    no_args_is_help=True,
+    add_completion=False,
+    invoke_without_command=True,
+    options_metavar="",
+    subcommand_metavar="[COMMAND] [OPTIONS]",
+)
+
+
+def get_index_manager(
+    collection: str,
+    db_url: str,
+    schema: str,
+    index: str,
+    distance: str,
+    storage: str,
+    rebuild_threshold: Optional[float],
+    concurrently: bool,
+):
+    from phi.embedder.base import Embedder
+    from phi.vectordb.distance import Distance
+    from phi.vectordb.pgvector import PgVector2, Ivfflat, HNSW, VectorStorage
+    from phi.vectordb.pgvector.index_manager import PgVectorIndexManager
+
+    _index = Ivfflat(concurrently=concurrently) if index == "ivfflat" else HNSW(concurrently=concurrently)
+    if rebuild_threshold is not None:
+        _index.rebuild_threshold = rebuild_threshold
+    # Documents are not embedded, the embedder only provides the dimensions of the table definition
+    vector_db = PgVector2(
+        collection=collection,
+        schema=schema,
+        db_url=db_url,
+        embedder=Embedder(),
+        distance=Distance(distance),
+        index=_index,
+        storage=VectorStorage(storage),
+    )
+    if not vector_db.exists():
+        raise typer.BadParameter(f"Collection {schema}.{collection} does not exist")
+    return PgVectorIndexManager(vector_db)
+
+
+@vectordb_cli.command(short_help="Create or rebuild the vector index of a PgVector2 collection")
+def optimize(
+    collection: str = typer.Argument(..., help="Name of the collection table."),
+    db_url: str = typer.Option(..., "--db-url", metavar="", help="Database url."),
+    schema: str = typer.Option("ai", "--schema", metavar="", help="Schema of the collection table."),
+    index: str = typer.Option("hnsw", "--index", metavar="", help="Index type: hnsw or ivfflat."),
+    distance: str = typer.Option("cosine", "--distance", metavar="", help="cosine, l2 or max_inner_product."),
+    storage: str = typer.Option("vector", "--storage", metavar="", help="vector, halfvec or binary."),
+    rebuild_threshold: Optional[float] = typer.Option(
+        None, "--rebuild-threshold", metavar="", help="Rebuild when the table grew by more than this fraction."
+    ),
+    concurrently: bool = typer.Option(True, help="Build without blocking writes to the table."),
+    force: bool = typer.Option(False, "-f", "--force", help="Rebuild the index even if it is up to date."),
+    print_debug_log: bool = typer.Option(
+        False,
+        "-d",
+        "--debug",
+        help="Print debug logs.",
+    ),
+):
+    """
+    Create the vector index of a collection, or rebuild it when the table outgrew it.
+
+    \b
+    Examples:
+    > `phi vectordb optimize documents --db-url postgresql+psycopg://ai:ai@localhost:5532/ai`
+    > `phi vectordb optimize documents --db-url ... --index ivfflat --rebuild-threshold 0.2`
+    """
+    if print_debug_log:
+        set_log_level_to_debug()
+
+    index_manager = get_index_manager(
+        collection, db_url, schema, index, distance, storage, rebuild_threshold, concurrently
+    )
+    print_info(json.dumps(index_manager.maintain(force=force), indent=2, default=str))
+
+
+@vectordb_cli.command(short_help="Show the progress of index builds on a PgVector2 collection")
+def progress(
+    collection: str = typer.Argument(..., help="Name of the collection table."),
+    db_url: str = typer.Option(..., "--db-url", metavar="", help="Database url."),
+    schema: str = typer.Option("ai", "--schema", metavar="", help="Schema of the collection table."),
+    index: str = typer.Option("hnsw", "--index", metavar="", help="Index type: hnsw or ivfflat."),
+    print_debug_log: bool = typer.Option(
+        False,
+        "-d",
+        "--debug",
+        help="Print debug logs.",
+    ),
+):
+    """
+    Show the index builds running on a collection and the state recorded at the last build of its index.
+
+    \b
+    Examples:
+    > `phi vectordb progress documents --db-url postgresql+psycopg://ai:ai@localhost:5532/ai`
+    """
+    if print_debug_log:
+        set_log_level_to_debug()
+
+    index_manager = get_index_manager(collection, db_url, schema, index, "cosine", "vector", None, True)
+    report = {
+        "index": index_manager.get_index_name(),
+        "last_build": index_manager.get_state(),
+        "builds": index_manager.get_build_progress(),
+    }
+    print_info(json.dumps(report, indent=2, default=str))
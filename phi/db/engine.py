@@ -0,0 +1,139 @@
+import threading
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict
+
+try:
+    from sqlalchemy.engine import create_engine, Engine, URL, make_url
+    from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+    from sqlalchemy.pool import QueuePool
+except ImportError:
+    raise ImportError("`sqlalchemy` not installed")
+
+from phi.utils.log import logger
+
+
+class EngineOptions(BaseModel):
+    """Connection pool options of the engines created by `get_engine` and `get_async_engine`.
+
+    Engines are shared by every component using the same url and options, so all Postgres backed components of a
+    process use a single pool per database unless they are given different options.
+    """
+
+    # Number of connections kept open in the pool
+    pool_size: int = 5
+    # Number of connections opened on top of pool_size under load, closed when returned to the pool
+    max_overflow: int = 10
+    # Seconds to wait for a connection before raising an error when the pool is exhausted
+    pool_timeout: float = 30
+    # Seconds after which connections are replaced, e.g. to stay under a server or load balancer idle timeout
+    pool_recycle: Optional[int] = None
+    # Test connections when they are checked out and transparently replace stale ones
+    pool_pre_ping: bool = True
+    # Postgres statement_timeout of the connections in milliseconds
+    statement_timeout: Optional[int] = None
+    # Additional arguments passed to the DBAPI connect function
+    connect_args: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(frozen=True)
+
+    def get_engine_kwargs(self, url: URL) -> Dict[str, Any]:
+        connect_args: Dict[str, Any] = dict(self.connect_args or {})
+        if self.statement_timeout is not None and url.get_backend_name() == "postgresql":
+            if url.get_driver_name() == "asyncpg":
+                server_settings = dict(connect_args.get("server_settings") or {})
+                server_settings["statement_timeout"] = str(self.statement_timeout)
+                connect_args["server_settings"] = server_settings
+            else:
+                options = connect_args.get("options")
+                timeout_option = f"-c statement_timeout={self.statement_timeout}"
+                connect_args["options"] = f"{options} {timeout_option}" if options else timeout_option
+
+        kwargs: Dict[str, Any] = {"pool_pre_ping": self.pool_pre_ping}
+        # sqlite uses a single connection pool which does not take the sizing options
+        if url.get_backend_name() != "sqlite":
+            kwargs["pool_size"] = self.pool_size
+            kwargs["max_overflow"] = self.max_overflow
+            kwargs["pool_timeout"] = self.pool_timeout
+        if self.pool_recycle is not None:
+            kwargs["pool_recycle"] = self.pool_recycle
+        if connect_args:
+            kwargs["connect_args"] = connect_args
+        return kwargs
+
+
+_engines: Dict[Tuple[str, str], Engine] = {}
+_async_engines: Dict[Tuple[str, str], AsyncEngine] = {}
+_lock = threading.Lock()
+
+
+def _get_key(url: URL, options: EngineOptions) -> Tuple[str, str]:
+    return url.render_as_string(hide_password=False), options.model_dump_json()
+
+
+def get_engine(db_url: Union[str, URL], options: Optional[EngineOptions] = None) -> Engine:
+    """Returns the engine of the process for the url and options, creating it on first use"""
+    url = make_url(db_url)
+    _options = options or EngineOptions()
+    key = _get_key(url, _options)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            logger.debug(f"Creating engine for {url}")
+            engine = create_engine(url, **_options.get_engine_kwargs(url))
+            _engines[key] = engine
+    return engine
+
+
+def get_async_engine(db_url: Union[str, URL], options: Optional[EngineOptions] = None) -> AsyncEngine:
+    """Returns the async engine of the process for the url and options, creating it on first use"""
+    url = make_url(db_url)
+    _options = options or EngineOptions()
+    key = _get_key(url, _options)
+    with _lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            logger.debug(f"Creating async engine for {url}")
+            engine = create_async_engine(url, **_options.get_engine_kwargs(url))
+            _async_engines[key] = engine
+    return engine
+
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    """Returns the connection pool utilisation of the engines in the registry"""
+    with _lock:
+        engines: List[Tuple[Engine, bool]] = [(engine, False) for engine in _engines.values()]
+        engines.extend((engine.sync_engine, True) for engine in _async_engines.values())
+
+    stats: List[Dict[str, Any]] = []
+    for engine, is_async in engines:
+        pool = engine.pool
+        pool_stats: Dict[str, Any] = {"url": str(engine.url), "async": is_async, "pool": pool.__class__.__name__}
+        if isinstance(pool, QueuePool):
+            # max_overflow is -1 when the overflow is unbounded
+            max_overflow: int = pool._max_overflow
+            capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+            pool_stats["pool_size"] = pool.size()
+            pool_stats["max_overflow"] = max_overflow
+            pool_stats["checked_out"] = pool.checkedout()
+            pool_stats["checked_in"] = pool.checkedin()
+            # overflow() is negative while fewer than pool_size connections have been opened
+            pool_stats["overflow"] = max(pool.overflow(), 0)
+            pool_stats["utilisation"] = round(pool.checkedout() / capacity, 4) if capacity else None
+        stats.append(pool_stats)
+    return stats
+
+
+def dispose_engines(close: bool = True) -> None:
+    """Remove the engines from the registry and dispose of their pools. After forking, call with close=False in the
+    child so that the connections of the parent are dropped without being closed. The connections of async engines
+    are always dropped without closing them, which would require their event loop."""
+    with _lock:
+        engines = list(_engines.values())
+        async_engines = list(_async_engines.values())
+        _engines.clear()
+        _async_engines.clear()
+    for engine in engines:
+        engine.dispose(close=close)
+    for async_engine in async_engines:
+        async_engine.sync_engine.dispose(close=False)
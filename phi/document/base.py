@@ -1,9 +1,28 @@
-from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import md5
+from typing import Optional, Dict, Any, List, Iterator
 
 from pydantic import BaseModel, ConfigDict
 
 from phi.embedder import Embedder
 
+# Set while writing documents the load pipeline has already embedded
+_reuse_embeddings: ContextVar[bool] = ContextVar("reuse_embeddings", default=False)
+
+
+@contextmanager
+def reuse_embeddings() -> Iterator[None]:
+    """Keep the embeddings documents already have when they are embedded in batches within the context.
+
+    Used by the load pipeline to write the documents it embedded without the vector db embedding them again.
+    """
+    token = _reuse_embeddings.set(True)
+    try:
+        yield
+    finally:
+        _reuse_embeddings.reset(token)
+
 
 class Document(BaseModel):
     """Model for managing a document"""
@@ -18,6 +37,13 @@ class Document(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    @property
+    def content_hash(self) -> str:
+        """Returns the md5 hash of the cleaned document content, as stored by the vector dbs"""
+
+        cleaned_content = self.content.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
     def embed(self, embedder: Optional[Embedder] = None) -> None:
         """Embed the document using the provided embedder"""
 
@@ -27,6 +53,90 @@ class Document(BaseModel):
 
         self.embedding, self.usage = _embedder.get_embedding_and_usage(self.content)
 
+    @classmethod
+    def embed_batch(
+        cls, documents: List["Document"], embedder: Embedder, skip_embedded: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Embed a list of documents using batched embedding requests.
+        With `skip_embedded`, or within `reuse_embeddings`, documents which already have an embedding are not
+        embedded again. Otherwise every document is embedded, so an edited document does not keep a stale embedding.
+
+        Usage is reported per request by the embedding providers, so the usage of the batch is returned and split
+        across the embedded documents by content length.
+        """
+
+        documents_to_embed = cls._get_documents_to_embed(documents, skip_embedded)
+        if len(documents_to_embed) == 0:
+            return None
+
+        embeddings, usage = embedder.get_embeddings_batch([document.content for document in documents_to_embed])
+        if len(embeddings) != len(documents_to_embed):
+            raise ValueError(f"Expected {len(documents_to_embed)} embeddings, got {len(embeddings)}")
+
+        for document, embedding, document_usage in zip(
+            documents_to_embed, embeddings, cls._split_usage(usage, documents_to_embed)
+        ):
+            document.embedding = embedding
+            document.usage = document_usage
+        return usage
+
+    @classmethod
+    async def async_embed_batch(
+        cls, documents: List["Document"], embedder: Embedder, skip_embedded: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Async version of `embed_batch`"""
+
+        documents_to_embed = cls._get_documents_to_embed(documents, skip_embedded)
+        if len(documents_to_embed) == 0:
+            return None
+
+        embeddings, usage = await embedder.async_get_embeddings_batch(
+            [document.content for document in documents_to_embed]
+        )
+        if len(embeddings) != len(documents_to_embed):
+            raise ValueError(f"Expected {len(documents_to_embed)} embeddings, got {len(embeddings)}")
+
+        for document, embedding, document_usage in zip(
+            documents_to_embed, embeddings, cls._split_usage(usage, documents_to_embed)
+        ):
+            document.embedding = embedding
+            document.usage = document_usage
+        return usage
+
+    @staticmethod
+    def _get_documents_to_embed(documents: List["Document"], skip_embedded: bool) -> List["Document"]:
+        if skip_embedded or _reuse_embeddings.get():
+            return [document for document in documents if document.embedding is None]
+        return documents
+
+    @staticmethod
+    def _split_usage(usage: Optional[Dict[str, Any]], documents: List["Document"]) -> List[Optional[Dict[str, Any]]]:
+        """Split the usage of a batch across its documents in proportion to their content length.
+        Integer counts are split so that the shares add up to the usage of the batch, other values are copied.
+        """
+
+        if usage is None:
+            return [None] * len(documents)
+
+        weights = [max(len(document.content), 1) for document in documents]
+        total_weight = sum(weights)
+        shares: List[Dict[str, Any]] = [{} for _ in documents]
+        for key, value in usage.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                for share in shares:
+                    share[key] = value
+            elif isinstance(value, int):
+                parts = [value * weight // total_weight for weight in weights]
+                # Hand out what the rounding left over, one to each of the first documents
+                for i in range(value - sum(parts)):
+                    parts[i] += 1
+                for share, part in zip(shares, parts):
+                    share[key] = part
+            else:
+                for share, weight in zip(shares, weights):
+                    share[key] = value * weight / total_weight
+        return shares
+
     def to_dict(self) -> Dict[str, Any]:
         """Returns a dictionary representation of the document"""
 
@@ -0,0 +1,4 @@
+from phi.document.chunking.base import ChunkingStrategy, clean_text, iter_clean_text
+from phi.document.chunking.fixed import FixedSizeChunking
+from phi.document.chunking.sentence import SentenceChunking
+from phi.document.chunking.token import TokenChunking
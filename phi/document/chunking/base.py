@@ -0,0 +1,83 @@
+import re
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from phi.document.base import Document
+
+# Any run of whitespace collapses to a single space
+_WHITESPACE = re.compile(r"\s+")
+
+
+def clean_text(text: str) -> str:
+    """Clean the text in a single pass by replacing runs of whitespace with a single space"""
+    return _WHITESPACE.sub(" ", text)
+
+
+def iter_clean_text(text: str, block_size: int = 1 << 20) -> Iterator[str]:
+    """Yield the cleaned text in blocks of about `block_size` characters, so large texts are never
+    cleaned in one piece. Joining the blocks gives the same result as `clean_text`.
+    """
+    text_length = len(text)
+    start = 0
+    while start < text_length:
+        end = min(start + block_size, text_length)
+        # Extend the block to the end of a whitespace run crossing the block boundary
+        match = _WHITESPACE.match(text, end)
+        if match is not None:
+            end = match.end()
+        yield _WHITESPACE.sub(" ", text[start:end])
+        start = end
+
+
+def iter_split(pattern: "re.Pattern[str]", text: str) -> Iterator[str]:
+    """Lazy version of `pattern.split(text)`"""
+    start = 0
+    for match in pattern.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+class ChunkingStrategy(BaseModel):
+    """Base class for chunking strategies.
+
+    Strategies split text lazily: `split` and `chunk` are generators, so chunks can be consumed
+    (embedded, written) before the rest of the document is chunked.
+    """
+
+    # Maximum size of a chunk, in characters unless the strategy says otherwise
+    chunk_size: int = 3000
+    # Size of the overlap between consecutive chunks
+    overlap: int = 0
+    # Collapse whitespace before chunking
+    clean: bool = True
+
+    def split(self, text: str) -> Iterator[str]:
+        """Yield the chunks of a text"""
+        raise NotImplementedError
+
+    def chunk(self, document: Document) -> Iterator[Document]:
+        """Yield the chunks of a document as documents, numbering them and copying the document meta data"""
+        chunk_number = 1
+        for chunk in self.split(document.content):
+            meta_data = document.meta_data.copy()
+            meta_data["chunk"] = chunk_number
+            meta_data["chunk_size"] = len(chunk)
+            chunk_id: Optional[str] = None
+            if document.id:
+                chunk_id = f"{document.id}_{chunk_number}"
+            elif document.name:
+                chunk_id = f"{document.name}_{chunk_number}"
+            yield Document(
+                id=chunk_id,
+                name=document.name,
+                meta_data=meta_data,
+                content=chunk,
+            )
+            chunk_number += 1
+
+    def chunk_documents(self, documents: List[Document]) -> Iterator[Document]:
+        """Yield the chunks of a list of documents"""
+        for document in documents:
+            yield from self.chunk(document)
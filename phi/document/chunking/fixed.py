@@ -0,0 +1,68 @@
+from typing import Generator, Iterator
+
+from phi.document.chunking.base import ChunkingStrategy, iter_clean_text
+
+
+class FixedSizeChunking(ChunkingStrategy):
+    """Splits text into chunks of at most `chunk_size` characters, ending chunks on whitespace where possible.
+
+    With the default `overlap` of 0 this produces the same chunks as the original `Reader.chunk_document`.
+    Text is cleaned block by block while chunking, so memory use does not grow with the size of the text.
+    """
+
+    def split(self, text: str) -> Iterator[str]:
+        if not self.clean:
+            yield from self._split(text, 0, final=True)
+            return
+
+        buffer = ""
+        start = 0
+        for block in iter_clean_text(text):
+            # Keep the unchunked tail of the buffer and append the next cleaned block
+            buffer = buffer[start:] + block
+            start = yield from self._split(buffer, 0, final=False)
+        yield from self._split(buffer, start, final=True)
+
+    def _split(self, content: str, start: int, final: bool) -> Generator[str, None, int]:
+        """Yield the chunks of `content` from `start` and return where the next chunk starts.
+        Unless `final`, stops when the next chunk could depend on content not yet in the buffer.
+        """
+        content_length = len(content)
+        overlap = min(max(self.overlap, 0), self.chunk_size - 1)
+
+        while start < content_length:
+            end = start + self.chunk_size
+            if not final and end >= content_length:
+                break
+
+            # Ensure we're not splitting a word in half: end at the last whitespace in (start, end]
+            if end < content_length:
+                if self.clean:
+                    # Cleaned text only contains single spaces
+                    boundary = content.rfind(" ", start + 1, end + 1)
+                else:
+                    boundary = max(content.rfind(ws, start + 1, end + 1) for ws in (" ", "\n", "\r", "\t"))
+                # If the entire chunk is a word, then just split it at self.chunk_size
+                if boundary != -1:
+                    end = boundary
+
+            # If the end is greater than the content length, then set it to the content length
+            if end > content_length:
+                end = content_length
+
+            yield content[start:end]
+            if end >= content_length:
+                return content_length
+            if overlap > 0:
+                # Step back by the overlap, always moving forward, and start the next chunk on a word.
+                # Without a word start in the overlap, continue from the end of the chunk as without overlap.
+                overlap_start = max(end - overlap, start + 1)
+                if self.clean:
+                    space = content.find(" ", overlap_start, end)
+                else:
+                    spaces = [content.find(ws, overlap_start, end) for ws in (" ", "\n", "\r", "\t")]
+                    space = min((i for i in spaces if i != -1), default=-1)
+                start = space + 1 if space != -1 else end
+            else:
+                start = end
+        return start
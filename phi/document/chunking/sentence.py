@@ -0,0 +1,73 @@
+import re
+from typing import Iterator, List, Tuple
+
+from phi.document.chunking.base import ChunkingStrategy, clean_text, iter_split
+from phi.document.chunking.fixed import FixedSizeChunking
+
+# Paragraphs are separated by blank lines
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Sentences end with terminal punctuation followed by whitespace
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+class SentenceChunking(ChunkingStrategy):
+    """Packs whole sentences into chunks of at most `chunk_size` characters.
+
+    Chunks end on sentence boundaries and, when `respect_paragraphs` is True, a new chunk starts at a paragraph
+    break once the current chunk is at least half full. Sentences longer than `chunk_size` are split on whitespace.
+    `overlap` repeats the trailing sentences of a chunk, up to `overlap` characters, at the start of the next one.
+    """
+
+    respect_paragraphs: bool = True
+
+    def split(self, text: str) -> Iterator[str]:
+        fallback = FixedSizeChunking(chunk_size=self.chunk_size, clean=self.clean)
+        chunk: List[str] = []
+        chunk_length = 0
+
+        for paragraph in iter_split(_PARAGRAPH_BREAK, text) if self.respect_paragraphs else [text]:
+            # Start a new chunk at the paragraph break if the current chunk is at least half full
+            if chunk_length >= self.chunk_size // 2:
+                yield " ".join(chunk)
+                chunk, chunk_length = self._overlap(chunk)
+
+            for sentence in iter_split(_SENTENCE_BREAK, paragraph):
+                sentence = clean_text(sentence).strip() if self.clean else sentence.strip()
+                if not sentence:
+                    continue
+
+                if len(sentence) > self.chunk_size:
+                    if chunk:
+                        yield " ".join(chunk)
+                        chunk, chunk_length = [], 0
+                    yield from fallback.split(sentence)
+                    continue
+
+                # Account for the space joining the sentence to the chunk
+                sentence_length = len(sentence) + (1 if chunk else 0)
+                if chunk_length + sentence_length > self.chunk_size:
+                    yield " ".join(chunk)
+                    chunk, chunk_length = self._overlap(chunk)
+                    # Drop the overlap if the sentence does not fit after it
+                    if chunk_length + len(sentence) + 1 > self.chunk_size:
+                        chunk, chunk_length = [], 0
+                    sentence_length = len(sentence) + (1 if chunk else 0)
+                chunk.append(sentence)
+                chunk_length += sentence_length
+
+        if chunk:
+            yield " ".join(chunk)
+
+    def _overlap(self, chunk: List[str]) -> Tuple[List[str], int]:
+        """Returns the trailing sentences of a chunk which fit in the overlap, and their joined length"""
+        if self.overlap <= 0:
+            return [], 0
+        tail: List[str] = []
+        tail_length = 0
+        for sentence in reversed(chunk):
+            sentence_length = len(sentence) + (1 if tail else 0)
+            if tail_length + sentence_length > self.overlap:
+                break
+            tail.insert(0, sentence)
+            tail_length += sentence_length
+        return tail, tail_length
@@ -0,0 +1,36 @@
+from typing import Any, Iterator
+
+from pydantic import PrivateAttr
+
+from phi.document.chunking.base import ChunkingStrategy, clean_text
+
+
+class TokenChunking(ChunkingStrategy):
+    """Splits text into chunks of at most `chunk_size` tokens, with `overlap` tokens shared between chunks.
+    Useful to keep chunks within the input limit of an embedding model.
+    """
+
+    chunk_size: int = 500
+    # tiktoken encoding used to count tokens
+    encoding: str = "cl100k_base"
+
+    _tokenizer: Any = PrivateAttr(default=None)
+
+    @property
+    def tokenizer(self) -> Any:
+        if self._tokenizer is None:
+            try:
+                import tiktoken
+            except ImportError:
+                raise ImportError("`tiktoken` not installed")
+            self._tokenizer = tiktoken.get_encoding(self.encoding)
+        return self._tokenizer
+
+    def split(self, text: str) -> Iterator[str]:
+        content = clean_text(text) if self.clean else text
+        tokens = self.tokenizer.encode(content)
+        step = self.chunk_size - min(max(self.overlap, 0), self.chunk_size - 1)
+        for start in range(0, len(tokens), step):
+            yield self.tokenizer.decode(tokens[start : start + self.chunk_size])
+            if start + self.chunk_size >= len(tokens):
+                break
@@ -35,7 +35,7 @@ class DocxReader(Reader):
             if self.chunk:
                 chunked_documents = []
                 for document in documents:
-                    chunked_documents.extend(self.chunk_document(document))
+                    chunked_documents.extend(self.iter_chunks(document))
                 return chunked_documents
             return documents
         except Exception as e:
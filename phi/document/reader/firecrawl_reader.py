@@ -32,7 +32,7 @@ class FirecrawlReader(Reader):
 
         documents = []
         if self.chunk:
-            documents.extend(self.chunk_document(Document(name=url, id=url, meta_data=metadata, content=content)))
+            documents.extend(self.iter_chunks(Document(name=url, id=url, meta_data=metadata, content=content)))
         else:
             documents.append(Document(name=url, id=url, meta_data=metadata, content=content))
         return documents
@@ -58,7 +58,7 @@ class FirecrawlReader(Reader):
             metadata = result.get("metadata")
 
             if self.chunk:
-                documents.extend(self.chunk_document(Document(name=url, id=url, meta_data=metadata, content=content)))
+                documents.extend(self.iter_chunks(Document(name=url, id=url, meta_data=metadata, content=content)))
             else:
                 documents.append(Document(name=url, id=url, meta_data=metadata, content=content))
         return documents
@@ -40,7 +40,7 @@ class JSONReader(Reader):
                 logger.debug("Chunking documents not yet supported for JSONReader")
                 # chunked_documents = []
                 # for document in documents:
-                #     chunked_documents.extend(self.chunk_document(document))
+                #     chunked_documents.extend(self.iter_chunks(document))
                 # return chunked_documents
             return documents
         except Exception:
@@ -1,95 +1,161 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from pathlib import Path
-from typing import List, Union, IO, Any
+from typing import List, Union, IO, Any, Dict, Optional
 
 from phi.document.base import Document
 from phi.document.reader.base import Reader
 from phi.utils.log import logger
 
+# RapidOCR instance shared by all reads in this process, so the OCR model is loaded once per worker process
+_ocr: Optional[Any] = None
+# Process pools shared by all PDF readers, keyed by the number of workers
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pools_lock = threading.Lock()
 
-class PDFReader(Reader):
-    """Reader for PDF files"""
 
-    def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
-        if not pdf:
-            raise ValueError("No pdf provided")
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Returns the process pool with `workers` processes, creating it on first use"""
+    with _process_pools_lock:
+        if workers not in _process_pools:
+            _process_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _process_pools[workers]
+
 
+def _get_ocr() -> Any:
+    global _ocr
+    if _ocr is None:
         try:
-            from pypdf import PdfReader as DocumentReader  # noqa: F401
+            import rapidocr_onnxruntime as rapidocr
         except ImportError:
-            raise ImportError("`pypdf` not installed")
+            raise ImportError("`rapidocr_onnxruntime` not installed")
+
+        # Initialize RapidOCR
+        _ocr = rapidocr.RapidOCR()
+    return _ocr
+
+
+def _extract_page_text(page: Any, ocr: bool) -> str:
+    if not ocr:
+        return page.extract_text()
 
-        doc_name = ""
+    page_text = page.extract_text() or ""
+    images_text_list: List = []
+    for image_object in page.images:
+        image_data = image_object.data
+
+        # Perform OCR on the image
+        ocr_result, elapse = _get_ocr()(image_data)
+
+        # Extract text from OCR result
+        if ocr_result:
+            images_text_list += [item[1] for item in ocr_result]
+
+    images_text: str = "\n".join(images_text_list)
+    return page_text + "\n" + images_text
+
+
+def _extract_pages(pdf: Union[str, Path, bytes], start: int, end: int, ocr: bool) -> List[str]:
+    """Extract the text of pages [start, end). Defined at module level so it can be sent to a process pool."""
+    from pypdf import PdfReader as DocumentReader
+
+    doc_reader = DocumentReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+    return [_extract_page_text(doc_reader.pages[i], ocr) for i in range(start, end)]
+
+
+class BasePDFReader(Reader):
+    """Base class for PDF readers, extracts pages in worker processes when `workers` > 1"""
+
+    # Number of processes used to extract pages. With 1, pages are extracted in the calling process.
+    workers: int = 1
+
+    def get_doc_name(self, pdf: Union[str, Path, IO[Any]]) -> str:
         try:
             if isinstance(pdf, str):
-                doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
-            else:
-                doc_name = pdf.name.split(".")[0]
+                return pdf.split("/")[-1].split(".")[0].replace(" ", "_")
+            return pdf.name.split(".")[0]
         except Exception:
-            doc_name = "pdf"
+            return "pdf"
 
-        logger.info(f"Reading: {doc_name}")
-        doc_reader = DocumentReader(pdf)
+    def read_pdf(self, doc_name: str, pdf: Union[str, Path, IO[Any], bytes], ocr: bool = False) -> List[Document]:
+        """Read a pdf file, path or bytes and return its pages, in page order, as (chunked) documents"""
+        try:
+            from pypdf import PdfReader as DocumentReader  # noqa: F401
+        except ImportError:
+            raise ImportError("`pypdf` not installed")
+
+        doc_reader = DocumentReader(BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+        num_pages = len(doc_reader.pages)
+        if self.workers > 1 and num_pages > 1:
+            # Send the path (or bytes) to the workers, each worker opens the pdf and extracts a range of pages
+            source: Union[str, Path, bytes]
+            if isinstance(pdf, (str, Path, bytes)):
+                source = pdf
+            else:
+                pdf.seek(0)
+                source = pdf.read()
+            pages_per_task = max(1, -(-num_pages // (self.workers * 2)))
+            starts = range(0, num_pages, pages_per_task)
+            futures = [
+                get_process_pool(self.workers).submit(
+                    _extract_pages, source, start, min(start + pages_per_task, num_pages), ocr
+                )
+                for start in starts
+            ]
+            page_texts = [text for future in futures for text in future.result()]
+        else:
+            page_texts = [_extract_page_text(page, ocr) for page in doc_reader.pages]
 
         documents = [
             Document(
                 name=doc_name,
                 id=f"{doc_name}_{page_number}",
                 meta_data={"page": page_number},
-                content=page.extract_text(),
+                content=page_text,
             )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
+            for page_number, page_text in enumerate(page_texts, start=1)
         ]
         if self.chunk:
             chunked_documents = []
             for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
+                chunked_documents.extend(self.iter_chunks(document))
             return chunked_documents
         return documents
 
 
-class PDFUrlReader(Reader):
+class PDFReader(BasePDFReader):
+    """Reader for PDF files"""
+
+    def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
+        if not pdf:
+            raise ValueError("No pdf provided")
+
+        doc_name = self.get_doc_name(pdf)
+        logger.info(f"Reading: {doc_name}")
+        return self.read_pdf(doc_name, pdf)
+
+
+class PDFUrlReader(BasePDFReader):
     """Reader for PDF files from URL"""
 
     def read(self, url: str) -> List[Document]:
         if not url:
             raise ValueError("No url provided")
 
-        from io import BytesIO
-
         try:
             import httpx
         except ImportError:
             raise ImportError("`httpx` not installed")
 
-        try:
-            from pypdf import PdfReader as DocumentReader  # noqa: F401
-        except ImportError:
-            raise ImportError("`pypdf` not installed")
-
         logger.info(f"Reading: {url}")
         response = httpx.get(url)
 
         doc_name = url.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
-
-        documents = [
-            Document(
-                name=doc_name,
-                id=f"{doc_name}_{page_number}",
-                meta_data={"page": page_number},
-                content=page.extract_text(),
-            )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
-        ]
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-        return documents
+        return self.read_pdf(doc_name, response.content)
 
 
-class PDFImageReader(Reader):
+class PDFImageReader(BasePDFReader):
     """Reader for PDF files with text and images extraction"""
 
     def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
@@ -97,75 +163,27 @@ class PDFImageReader(Reader):
             raise ValueError("No pdf provided")
 
         try:
-            import rapidocr_onnxruntime as rapidocr
+            import rapidocr_onnxruntime as rapidocr  # noqa: F401
             from pypdf import PdfReader as DocumentReader  # noqa: F401
         except ImportError:
             raise ImportError("`pypdf` or `rapidocr_onnxruntime` not installed")
 
-        doc_name = ""
-        try:
-            if isinstance(pdf, str):
-                doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
-            else:
-                doc_name = pdf.name.split(".")[0]
-        except Exception:
-            doc_name = "pdf"
-
+        doc_name = self.get_doc_name(pdf)
         logger.info(f"Reading: {doc_name}")
-        doc_reader = DocumentReader(pdf)
-
-        # Initialize RapidOCR
-        ocr = rapidocr.RapidOCR()
-
-        documents = []
-        for page_number, page in enumerate(doc_reader.pages, start=1):
-            page_text = page.extract_text() or ""
-            images_text_list: List = []
-
-            for image_object in page.images:
-                image_data = image_object.data
-
-                # Perform OCR on the image
-                ocr_result, elapse = ocr(image_data)
-
-                # Extract text from OCR result
-                if ocr_result:
-                    images_text_list += [item[1] for item in ocr_result]
-
-            images_text: str = "\n".join(images_text_list)
-            content = page_text + "\n" + images_text
+        return self.read_pdf(doc_name, pdf, ocr=True)
 
-            documents.append(
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=content,
-                )
-            )
-
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-
-        return documents
 
-
-class PDFUrlImageReader(Reader):
+class PDFUrlImageReader(BasePDFReader):
     """Reader for PDF files from URL with text and images extraction"""
 
     def read(self, url: str) -> List[Document]:
         if not url:
             raise ValueError("No url provided")
 
-        from io import BytesIO
-
         try:
             import httpx
-            from pypdf import PdfReader as DocumentReader
-            import rapidocr_onnxruntime as rapidocr
+            from pypdf import PdfReader as DocumentReader  # noqa: F401
+            import rapidocr_onnxruntime as rapidocr  # noqa: F401
         except ImportError:
             raise ImportError("`httpx`, `pypdf` or `rapidocr_onnxruntime` not installed")
 
@@ -174,46 +192,4 @@ class PDFUrlImageReader(Reader):
         response = httpx.get(url)
 
         doc_name = url.split("/")[-1].split(".")[0].replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
-
-        # Initialize RapidOCR
-        ocr = rapidocr.RapidOCR()
-
-        # Process each page of the PDF
-        documents = []
-        for page_number, page in enumerate(doc_reader.pages, start=1):
-            page_text = page.extract_text() or ""
-            images_text_list = []
-
-            # Extract and process images
-            for image_object in page.images:
-                image_data = image_object.data
-
-                # Perform OCR on the image
-                ocr_result, elapse = ocr(image_data)
-
-                # Extract text from OCR result
-                if ocr_result:
-                    images_text_list += [item[1] for item in ocr_result]
-
-            images_text = "\n".join(images_text_list)
-            content = page_text + "\n" + images_text
-
-            # Append the document
-            documents.append(
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=content,
-                )
-            )
-
-        # Optionally chunk documents
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-
-        return documents
+        return self.read_pdf(doc_name, response.content, ocr=True)
@@ -39,7 +39,7 @@ class S3TextReader(Reader):
             if self.chunk:
                 chunked_documents = []
                 for document in documents:
-                    chunked_documents.extend(self.chunk_document(document))
+                    chunked_documents.extend(self.iter_chunks(document))
                 return chunked_documents
 
             logger.debug(f"Deleting: {temporary_file}")
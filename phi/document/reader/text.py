@@ -30,7 +30,7 @@ class TextReader(Reader):
             if self.chunk:
                 chunked_documents = []
                 for document in documents:
-                    chunked_documents.extend(self.chunk_document(document))
+                    chunked_documents.extend(self.iter_chunks(document))
                 return chunked_documents
             return documents
         except Exception as e:
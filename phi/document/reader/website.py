@@ -1,7 +1,10 @@
+import asyncio
 import time
 import random
-from typing import Set, Dict, List, Tuple
+from collections import deque
+from typing import Set, Dict, List, Tuple, Deque, Optional
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 
 from phi.document.base import Document
 from phi.document.reader.base import Reader
@@ -20,9 +23,25 @@ class WebsiteReader(Reader):
 
     max_depth: int = 3
     max_links: int = 10
+    # Request timeout in seconds
+    timeout: float = 10
+
+    # Crawl using asyncio, fetching pages concurrently over a shared connection pool
+    use_async: bool = False
+    # Maximum number of concurrent requests when crawling with asyncio
+    max_concurrency: int = 10
+    # Maximum number of concurrent requests to a single host when crawling with asyncio
+    max_concurrency_per_host: int = 2
+    # Maximum number of requests per second to a single host when crawling with asyncio
+    requests_per_second_per_host: Optional[float] = 5.0
+    # Skip urls disallowed by robots.txt and honour its crawl delay when crawling with asyncio
+    use_robots: bool = False
+    # Seed the crawl with the urls listed in the sitemap when crawling with asyncio
+    use_sitemap: bool = False
 
     _visited: Set[str] = set()
-    _urls_to_crawl: List[Tuple[str, int]] = []
+    _urls_to_crawl: Deque[Tuple[str, int]] = deque()
+    _queued: Set[str] = set()
 
     def delay(self, min_seconds=1, max_seconds=3):
         """
@@ -86,11 +105,12 @@ class WebsiteReader(Reader):
         num_links = 0
         crawler_result: Dict[str, str] = {}
         primary_domain = self._get_primary_domain(url)
-        # Add starting URL with its depth to the global list
-        self._urls_to_crawl.append((url, starting_depth))
+        # Add starting URL with its depth to the list of urls to crawl
+        self._reset(url, starting_depth)
+        client = httpx.Client(timeout=self.timeout)
         while self._urls_to_crawl:
-            # Unpack URL and depth from the global list
-            current_url, current_depth = self._urls_to_crawl.pop(0)
+            # Unpack URL and depth from the list of urls to crawl
+            current_url, current_depth = self._urls_to_crawl.popleft()
 
             # Skip if
             # - URL is already visited
@@ -110,31 +130,199 @@ class WebsiteReader(Reader):
 
             try:
                 logger.debug(f"Crawling: {current_url}")
-                response = httpx.get(current_url, timeout=10)
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Extract main content
-                main_content = self._extract_main_content(soup)
+                response = client.get(current_url)
+                main_content, links = self._parse_page(current_url, response.content, primary_domain)
                 if main_content:
                     crawler_result[current_url] = main_content
                     num_links += 1
 
-                # Add found URLs to the global list, with incremented depth
-                for link in soup.find_all("a", href=True):
-                    full_url = urljoin(current_url, link["href"])
-                    parsed_url = urlparse(full_url)
-                    if parsed_url.netloc.endswith(primary_domain) and not any(
-                        parsed_url.path.endswith(ext) for ext in [".pdf", ".jpg", ".png"]
-                    ):
-                        if full_url not in self._visited and (full_url, current_depth + 1) not in self._urls_to_crawl:
-                            self._urls_to_crawl.append((full_url, current_depth + 1))
+                # Add found URLs to the list of urls to crawl, with incremented depth
+                self._enqueue(links, current_depth + 1)
 
             except Exception as e:
                 logger.debug(f"Failed to crawl: {current_url}: {e}")
                 pass
 
+        client.close()
+        return crawler_result
+
+    def _reset(self, url: str, starting_depth: int) -> None:
+        """Reset the crawl state, so each crawl starts from a clean frontier"""
+        self._visited = set()
+        self._urls_to_crawl = deque([(url, starting_depth)])
+        self._queued = {url}
+
+    def _enqueue(self, urls: List[str], depth: int) -> None:
+        for full_url in urls:
+            if full_url not in self._visited and full_url not in self._queued:
+                self._queued.add(full_url)
+                self._urls_to_crawl.append((full_url, depth))
+
+    def _parse_page(self, url: str, content: bytes, primary_domain: str) -> Tuple[str, List[str]]:
+        """
+        Parses a page and returns its main content and the links to crawl next.
+
+        :param url: The URL of the page.
+        :param content: The content of the page.
+        :param primary_domain: Only links ending with this domain are returned.
+        :return: The main content and the links on the page.
+        """
+        soup = BeautifulSoup(content, "html.parser")
+
+        # Extract main content
+        main_content = self._extract_main_content(soup)
+
+        links: List[str] = []
+        for link in soup.find_all("a", href=True):
+            full_url = urljoin(url, link["href"])
+            parsed_url = urlparse(full_url)
+            if parsed_url.netloc.endswith(primary_domain) and not any(
+                parsed_url.path.endswith(ext) for ext in [".pdf", ".jpg", ".png"]
+            ):
+                links.append(full_url)
+        return main_content, links
+
+    async def async_crawl(self, url: str, starting_depth: int = 1) -> Dict[str, str]:
+        """
+        Crawls a website using asyncio and returns a dictionary of URLs and their corresponding content.
+
+        Pages are fetched concurrently over a shared `httpx.AsyncClient`, bounded by `max_concurrency`
+        in total and by `max_concurrency_per_host` and `requests_per_second_per_host` per host.
+        The same urls are skipped and the same limits apply as in `crawl`.
+
+        Parameters:
+        - url (str): The starting URL to begin the crawl.
+        - starting_depth (int, optional): The starting depth level for the crawl. Defaults to 1.
+
+        Returns:
+        - Dict[str, str]: A dictionary where each key is a URL and the corresponding value is the main
+                          content extracted from that URL.
+        """
+        num_links = 0
+        crawler_result: Dict[str, str] = {}
+        primary_domain = self._get_primary_domain(url)
+        self._reset(url, starting_depth)
+
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True) as client:
+            host_limiter = _HostLimiter(self.max_concurrency_per_host, self.requests_per_second_per_host)
+
+            robots: Optional[RobotFileParser] = None
+            if self.use_robots or self.use_sitemap:
+                robots = await self._fetch_robots(client, url)
+                if robots is not None:
+                    crawl_delay = robots.crawl_delay("*")
+                    if crawl_delay is not None:
+                        host_limiter.min_interval = max(host_limiter.min_interval, float(crawl_delay))
+            if self.use_sitemap:
+                sitemap_urls = await self._fetch_sitemap_urls(client, url, robots)
+                logger.debug(f"Found {len(sitemap_urls)} urls in the sitemap")
+                self._enqueue(
+                    [u for u in sitemap_urls if urlparse(u).netloc.endswith(primary_domain)], starting_depth + 1
+                )
+            if not self.use_robots:
+                robots = None
+
+            in_flight: Set[asyncio.Task] = set()
+            while self._urls_to_crawl or in_flight:
+                # Schedule urls until the concurrency limit is reached
+                while self._urls_to_crawl and len(in_flight) < self.max_concurrency and num_links < self.max_links:
+                    current_url, current_depth = self._urls_to_crawl.popleft()
+                    if (
+                        current_url in self._visited
+                        or not urlparse(current_url).netloc.endswith(primary_domain)
+                        or current_depth > self.max_depth
+                        or (robots is not None and not robots.can_fetch("*", current_url))
+                    ):
+                        continue
+                    self._visited.add(current_url)
+                    in_flight.add(
+                        asyncio.ensure_future(
+                            self._async_fetch(client, host_limiter, current_url, current_depth, primary_domain)
+                        )
+                    )
+
+                if not in_flight:
+                    break
+
+                done, pending = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight = set(pending)
+                for task in done:
+                    current_url, current_depth, main_content, links = task.result()
+                    if main_content and num_links < self.max_links:
+                        crawler_result[current_url] = main_content
+                        num_links += 1
+                    self._enqueue(links, current_depth + 1)
+
+                if num_links >= self.max_links:
+                    for task in in_flight:
+                        task.cancel()
+                    if in_flight:
+                        await asyncio.wait(in_flight)
+                    break
+
         return crawler_result
 
+    async def _async_fetch(
+        self, client: httpx.AsyncClient, host_limiter: "_HostLimiter", url: str, depth: int, primary_domain: str
+    ) -> Tuple[str, int, str, List[str]]:
+        try:
+            logger.debug(f"Crawling: {url}")
+            async with host_limiter.limit(urlparse(url).netloc):
+                response = await client.get(url)
+            main_content, links = self._parse_page(url, response.content, primary_domain)
+            return url, depth, main_content, links
+        except Exception as e:
+            logger.debug(f"Failed to crawl: {url}: {e}")
+            return url, depth, "", []
+
+    async def _fetch_robots(self, client: httpx.AsyncClient, url: str) -> Optional[RobotFileParser]:
+        parsed_url = urlparse(url)
+        robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+        try:
+            response = await client.get(robots_url)
+            if response.status_code != 200:
+                return None
+            robots = RobotFileParser(robots_url)
+            robots.parse(response.text.splitlines())
+            return robots
+        except Exception as e:
+            logger.debug(f"Failed to read robots.txt: {robots_url}: {e}")
+            return None
+
+    async def _fetch_sitemap_urls(
+        self, client: httpx.AsyncClient, url: str, robots: Optional[RobotFileParser]
+    ) -> List[str]:
+        """Returns the page urls listed in the sitemaps of the website, following one level of sitemap indexes"""
+        from xml.etree import ElementTree
+
+        parsed_url = urlparse(url)
+        sitemaps: List[str] = []
+        if robots is not None and getattr(robots, "site_maps", None) is not None:
+            sitemaps = robots.site_maps() or []
+        if len(sitemaps) == 0:
+            sitemaps = [f"{parsed_url.scheme}://{parsed_url.netloc}/sitemap.xml"]
+
+        page_urls: List[str] = []
+        for _ in range(2):
+            nested_sitemaps: List[str] = []
+            for sitemap_url in sitemaps:
+                try:
+                    response = await client.get(sitemap_url)
+                    if response.status_code != 200:
+                        continue
+                    root = ElementTree.fromstring(response.content)
+                except Exception as e:
+                    logger.debug(f"Failed to read sitemap: {sitemap_url}: {e}")
+                    continue
+                locations = [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+                if root.tag.endswith("sitemapindex"):
+                    nested_sitemaps.extend(locations)
+                else:
+                    page_urls.extend(locations)
+            sitemaps = nested_sitemaps
+        return page_urls
+
     def read(self, url: str) -> List[Document]:
         """
         Reads a website and returns a list of documents.
@@ -147,12 +335,31 @@ class WebsiteReader(Reader):
         """
 
         logger.debug(f"Reading: {url}")
-        crawler_result = self.crawl(url)
+        if self.use_async:
+            crawler_result = asyncio.run(self.async_crawl(url))
+        else:
+            crawler_result = self.crawl(url)
+        return self._to_documents(url, crawler_result)
+
+    async def async_read(self, url: str) -> List[Document]:
+        """
+        Reads a website using the asyncio crawler and returns a list of documents.
+        Use this instead of `read` when an event loop is already running.
+
+        :param url: The URL of the website to read.
+        :return: A list of documents.
+        """
+
+        logger.debug(f"Reading: {url}")
+        crawler_result = await self.async_crawl(url)
+        return self._to_documents(url, crawler_result)
+
+    def _to_documents(self, url: str, crawler_result: Dict[str, str]) -> List[Document]:
         documents = []
         for crawled_url, crawled_content in crawler_result.items():
             if self.chunk:
                 documents.extend(
-                    self.chunk_document(
+                    self.iter_chunks(
                         Document(
                             name=url, id=str(crawled_url), meta_data={"url": str(crawled_url)}, content=crawled_content
                         )
@@ -168,3 +375,40 @@ class WebsiteReader(Reader):
                     )
                 )
         return documents
+
+
+class _HostLimiter:
+    """Limits the number of concurrent requests and the request rate to each host"""
+
+    def __init__(self, max_concurrency: int, requests_per_second: Optional[float]):
+        self.max_concurrency = max_concurrency
+        self.min_interval: float = 1 / requests_per_second if requests_per_second else 0.0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_request_at: Dict[str, float] = {}
+
+    def limit(self, host: str) -> "_HostSlot":
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+        return _HostSlot(self, host)
+
+    async def wait(self, host: str) -> None:
+        # Reserve the next request slot for the host, then sleep until it starts
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start_at = max(now, self._next_request_at.get(host, now))
+        self._next_request_at[host] = start_at + self.min_interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+class _HostSlot:
+    def __init__(self, limiter: _HostLimiter, host: str):
+        self.limiter = limiter
+        self.host = host
+
+    async def __aenter__(self) -> None:
+        await self.limiter._semaphores[self.host].acquire()
+        await self.limiter.wait(self.host)
+
+    async def __aexit__(self, *args) -> None:
+        self.limiter._semaphores[self.host].release()
@@ -1,4 +1,5 @@
-from typing import Optional, Dict, List, Tuple
+import asyncio
+from typing import Optional, Dict, List, Tuple, Iterator
 
 from pydantic import BaseModel, ConfigDict
 
@@ -7,6 +8,10 @@ class Embedder(BaseModel):
     """Base class for managing embedders"""
 
     dimensions: int = 1536
+    # Maximum number of texts to embed in a single request
+    batch_size: int = 100
+    # Maximum number of (estimated) tokens to embed in a single request
+    max_tokens_per_batch: Optional[int] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -15,3 +20,86 @@ class Embedder(BaseModel):
 
     def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
         raise NotImplementedError
+
+    def get_embeddings_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Returns the embeddings for a list of texts, in order, along with the combined usage.
+
+        The texts are split into batches bounded by `batch_size` and `max_tokens_per_batch`,
+        and each batch is embedded using a single request where the provider supports it.
+        """
+        embeddings: List[List[float]] = []
+        usage: Optional[Dict] = None
+        for batch in self.get_batches(texts):
+            batch_embeddings, batch_usage = self._embed_batch(batch)
+            embeddings.extend(batch_embeddings)
+            usage = self.merge_usage(usage, batch_usage)
+        return embeddings, usage
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        """Async version of `get_embedding`, runs the sync method in a thread unless overridden with an async client"""
+        return await asyncio.to_thread(self.get_embedding, text)
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return await asyncio.to_thread(self.get_embedding_and_usage, text)
+
+    async def async_get_embeddings_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Async version of `get_embeddings_batch`"""
+        embeddings: List[List[float]] = []
+        usage: Optional[Dict] = None
+        for batch in self.get_batches(texts):
+            batch_embeddings, batch_usage = await self._async_embed_batch(batch)
+            embeddings.extend(batch_embeddings)
+            usage = self.merge_usage(usage, batch_usage)
+        return embeddings, usage
+
+    def get_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts into batches bounded by `batch_size` and `max_tokens_per_batch`"""
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            text_tokens = self.estimate_tokens(text)
+            if len(batch) > 0 and (
+                len(batch) >= self.batch_size
+                or (self.max_tokens_per_batch is not None and batch_tokens + text_tokens > self.max_tokens_per_batch)
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += text_tokens
+        if len(batch) > 0:
+            yield batch
+
+    def estimate_tokens(self, text: str) -> int:
+        """Rough token estimate (~4 characters per token) used to size batches"""
+        return len(text) // 4 + 1
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Embed a single batch of texts. Embedders that support batch requests override this method,
+        the default implementation embeds the texts one at a time."""
+        embeddings: List[List[float]] = []
+        usage: Optional[Dict] = None
+        for text in texts:
+            embedding, text_usage = self.get_embedding_and_usage(text)
+            embeddings.append(embedding)
+            usage = self.merge_usage(usage, text_usage)
+        return embeddings, usage
+
+    async def _async_embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Async version of `_embed_batch`, the default implementation runs `_embed_batch` in a thread"""
+        return await asyncio.to_thread(self._embed_batch, texts)
+
+    @staticmethod
+    def merge_usage(usage: Optional[Dict], other: Optional[Dict]) -> Optional[Dict]:
+        """Add up the numeric values of two usage dictionaries"""
+        if other is None:
+            return usage
+        if usage is None:
+            return dict(other)
+        merged = dict(usage)
+        for key, value in other.items():
+            if isinstance(value, (int, float)) and isinstance(merged.get(key), (int, float)):
+                merged[key] += value
+            elif key not in merged:
+                merged[key] = value
+        return merged
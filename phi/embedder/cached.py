@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from hashlib import md5
+from pathlib import Path
+from time import time
+from typing import Optional, Dict, List, Tuple
+
+from pydantic import PrivateAttr, model_validator
+
+from phi.embedder.base import Embedder
+from phi.utils.log import logger
+
+
+class CachedEmbedder(Embedder):
+    """Embedder that caches the embeddings of another embedder.
+
+    Embeddings are keyed on the model, dimensions and the md5 hash of the cleaned content (the same hash the
+    vector dbs store), kept in an in-process LRU and persisted to a local sqlite file.
+    """
+
+    # The embedder to cache
+    embedder: Embedder
+    # Sqlite file used to persist the cache. If None, embeddings are only cached in memory.
+    db_file: Optional[str] = "tmp/embedder_cache.db"
+    # Maximum number of embeddings to keep in memory
+    max_memory_entries: int = 10000
+    # Maximum number of embeddings to keep in the sqlite file, the least recently used are evicted first
+    max_disk_entries: Optional[int] = 1000000
+
+    _memory: "OrderedDict[str, List[float]]" = PrivateAttr(default_factory=OrderedDict)
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _disk_entries: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    @model_validator(mode="after")  # type: ignore
+    def set_embedder_attributes(self) -> "CachedEmbedder":
+        self.dimensions = self.embedder.dimensions
+        self.batch_size = self.embedder.batch_size
+        self.max_tokens_per_batch = self.embedder.max_tokens_per_batch
+        return self  # type: ignore
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total > 0 else 0.0
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        if self._connection is None and self.db_file is not None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            logger.debug(f"Opening embedder cache: {self.db_file}")
+            self._connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB, accessed_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+            self._connection.commit()
+            self._disk_entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._connection
+
+    def get_key(self, text: str) -> str:
+        """Returns the cache key for a text: the model, dimensions and md5 hash of the cleaned content"""
+        model = getattr(self.embedder, "model", self.embedder.__class__.__name__)
+        content_hash = md5(text.replace("\x00", "\ufffd").encode()).hexdigest()
+        return f"{model}:{self.embedder.dimensions}:{content_hash}"
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self.get_key(text)
+        cached = self._get_cached([key])
+        if key in cached:
+            return cached[key], None
+
+        embedding, usage = self.embedder.get_embedding_and_usage(text)
+        self._set_cached({key: embedding})
+        return embedding, usage
+
+    def get_embeddings_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        keys = [self.get_key(text) for text in texts]
+        cached = self._get_cached(keys)
+
+        # Embed each uncached text once, even if it appears multiple times in the batch
+        texts_to_embed: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in texts_to_embed:
+                texts_to_embed[key] = text
+
+        usage: Optional[Dict] = None
+        if len(texts_to_embed) > 0:
+            embeddings, usage = self.embedder.get_embeddings_batch(list(texts_to_embed.values()))
+            new_embeddings = dict(zip(texts_to_embed.keys(), embeddings))
+            self._set_cached(new_embeddings)
+            cached.update(new_embeddings)
+        return [cached[key] for key in keys], usage
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self.get_key(text)
+        cached = self._get_cached([key])
+        if key in cached:
+            return cached[key], None
+
+        embedding, usage = await self.embedder.async_get_embedding_and_usage(text)
+        self._set_cached({key: embedding})
+        return embedding, usage
+
+    async def async_get_embeddings_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        keys = [self.get_key(text) for text in texts]
+        cached = self._get_cached(keys)
+
+        texts_to_embed: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in texts_to_embed:
+                texts_to_embed[key] = text
+
+        usage: Optional[Dict] = None
+        if len(texts_to_embed) > 0:
+            embeddings, usage = await self.embedder.async_get_embeddings_batch(list(texts_to_embed.values()))
+            new_embeddings = dict(zip(texts_to_embed.keys(), embeddings))
+            self._set_cached(new_embeddings)
+            cached.update(new_embeddings)
+        return [cached[key] for key in keys], usage
+
+    def clear(self) -> None:
+        """Clear the cache and reset the hit/miss counters"""
+        with self._lock:
+            self._memory.clear()
+            if self.connection is not None:
+                self.connection.execute("DELETE FROM embeddings")
+                self.connection.commit()
+                self._disk_entries = 0
+            self._hits = 0
+            self._misses = 0
+
+    def _get_cached(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            missing = [key for key in set(keys) if key not in found]
+            if len(missing) > 0 and self.connection is not None:
+                for i in range(0, len(missing), 500):
+                    batch = missing[i : i + 500]
+                    placeholders = ", ".join("?" for _ in batch)
+                    rows = self.connection.execute(
+                        f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        embedding = array("f")
+                        embedding.frombytes(blob)
+                        found[key] = embedding.tolist()
+                        self._remember(key, found[key])
+                    if len(rows) > 0:
+                        self.connection.execute(
+                            f"UPDATE embeddings SET accessed_at = ? WHERE key IN ({placeholders})",
+                            [time(), *[row[0] for row in rows]],
+                        )
+                self.connection.commit()
+
+            num_hits = sum(1 for key in keys if key in found)
+            self._hits += num_hits
+            self._misses += len(keys) - num_hits
+        return found
+
+    def _set_cached(self, embeddings: Dict[str, List[float]]) -> None:
+        # Do not cache failed embeddings
+        embeddings = {key: embedding for key, embedding in embeddings.items() if embedding}
+        if len(embeddings) == 0:
+            return
+
+        with self._lock:
+            for key, embedding in embeddings.items():
+                self._remember(key, embedding)
+
+            if self.connection is not None:
+                now = time()
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding, accessed_at) VALUES (?, ?, ?)",
+                    [(key, array("f", embedding).tobytes(), now) for key, embedding in embeddings.items()],
+                )
+                self._disk_entries += len(embeddings)
+                if self.max_disk_entries is not None and self._disk_entries > self.max_disk_entries:
+                    self._evict()
+                self.connection.commit()
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        if self.connection is None or self.max_disk_entries is None:
+            return
+        self._disk_entries = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        # Evict down to 90% of the limit so that eviction does not run on every insert
+        num_to_evict = self._disk_entries - int(self.max_disk_entries * 0.9)
+        if num_to_evict <= 0:
+            return
+        logger.debug(f"Evicting {num_to_evict} embeddings from the cache")
+        self.connection.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY accessed_at LIMIT ?)",
+            (num_to_evict,),
+        )
+        self._disk_entries -= num_to_evict
+
+    def close(self) -> None:
+        """Close the sqlite connection, it is reopened on the next lookup"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Union
 
 from phi.embedder.base import Embedder
 from phi.utils.log import logger
@@ -13,6 +13,8 @@ except ImportError:
 class MistralEmbedder(Embedder):
     model: str = "mistral-embed"
     dimensions: int = 1024
+    # Mistral limits the number of tokens per embeddings request
+    max_tokens_per_batch: Optional[int] = 16000
     # -*- Request parameters
     request_params: Optional[Dict[str, Any]] = None
     # -*- Client parameters
@@ -42,7 +44,7 @@ class MistralEmbedder(Embedder):
             _client_params.update(self.client_params)
         return MistralClient(**_client_params)
 
-    def _response(self, text: str) -> EmbeddingResponse:
+    def _response(self, text: Union[str, List[str]]) -> EmbeddingResponse:
         _request_params: Dict[str, Any] = {
             "input": text,
             "model": self.model,
@@ -65,3 +67,10 @@ class MistralEmbedder(Embedder):
         embedding = response.data[0].embedding
         usage = response.usage
         return embedding, usage.model_dump()
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response: EmbeddingResponse = self._response(text=texts)
+
+        embeddings = [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+        usage = response.usage
+        return embeddings, usage.model_dump()
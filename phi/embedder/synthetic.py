@@ -0,0 +1,61 @@
+from hashlib import md5
+from typing import Optional, Dict, List, Tuple
+
+from pydantic import PrivateAttr
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from phi.embedder.base import Embedder
+
+
+class SyntheticEmbedder(Embedder):
+    """Deterministic embedder for offline tests and benchmarks, which makes no requests.
+
+    Each text is mapped to a vector drawn from a generator seeded with `seed` and the md5 of the text, so the same
+    text gets the same embedding in every process. Vectors are uniformly random directions, or with `num_clusters`
+    scattered around one of `num_clusters` random centers, which is closer to the distribution of real embeddings
+    and harder for approximate indexes.
+    """
+
+    seed: int = 0
+    # Number of cluster centers the vectors are drawn around, 0 for uniformly random directions
+    num_clusters: int = 0
+    # Length of the offset of the vectors from their (unit length) cluster center
+    cluster_spread: float = 0.5
+    # Return unit length vectors
+    normalize: bool = True
+
+    _centers: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    def _get_rng(self, text: str) -> np.random.Generator:
+        digest = md5(text.encode()).digest()
+        return np.random.default_rng([self.seed, int.from_bytes(digest[:8], "little")])
+
+    def get_centers(self) -> np.ndarray:
+        if self._centers is None:
+            centers = np.random.default_rng([self.seed, self.num_clusters]).standard_normal(
+                (self.num_clusters, self.dimensions)
+            )
+            self._centers = centers / np.linalg.norm(centers, axis=1, keepdims=True)
+        return self._centers
+
+    def get_vector(self, text: str) -> np.ndarray:
+        rng = self._get_rng(text)
+        if self.num_clusters > 0:
+            center = self.get_centers()[rng.integers(self.num_clusters)]
+            offset = rng.standard_normal(self.dimensions)
+            vector = center + self.cluster_spread * offset / np.linalg.norm(offset)
+        else:
+            vector = rng.standard_normal(self.dimensions)
+        if self.normalize:
+            vector = vector / np.linalg.norm(vector)
+        return vector.astype(np.float32)
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_vector(text).tolist()
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from phi.embedder.base import Embedder
 from phi.utils.log import logger
@@ -13,6 +13,9 @@ except ImportError:
 class VoyageAIEmbedder(Embedder):
     model: str = "voyage-2"
     dimensions: int = 1024
+    # VoyageAI limits the number of texts and tokens per embeddings request
+    batch_size: int = 128
+    max_tokens_per_batch: Optional[int] = 120000
     request_params: Optional[Dict[str, Any]] = None
     api_key: Optional[str] = None
     base_url: str = "https://api.voyageai.com/v1/embeddings"
@@ -37,9 +40,9 @@ class VoyageAIEmbedder(Embedder):
             _client_params.update(self.client_params)
         return Client(**_client_params)
 
-    def _response(self, text: str) -> EmbeddingsObject:
+    def _response(self, text: Union[str, List[str]]) -> EmbeddingsObject:
         _request_params: Dict[str, Any] = {
-            "texts": [text],
+            "texts": text if isinstance(text, list) else [text],
             "model": self.model,
         }
         if self.request_params:
@@ -60,3 +63,10 @@ class VoyageAIEmbedder(Embedder):
         embedding = response.embeddings[0]
         usage = {"total_tokens": response.total_tokens}
         return embedding, usage
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response: EmbeddingsObject = self._response(text=texts)
+
+        embeddings = response.embeddings
+        usage = {"total_tokens": response.total_tokens}
+        return embeddings, usage
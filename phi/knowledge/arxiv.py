@@ -1,4 +1,5 @@
-from typing import Iterator, List
+from functools import partial
+from typing import Iterator, List, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.arxiv import ArxivReader
@@ -9,6 +10,17 @@ class ArxivKnowledgeBase(AssistantKnowledge):
     queries: List[str] = []
     reader: ArxivReader = ArxivReader()
 
+    @property
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over queries and yield a function reading the articles for each query.
+
+        Returns:
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (query, read function) pairs
+        """
+
+        for _query in self.queries:
+            yield _query, partial(self.reader.read, query=_query)
+
     @property
     def document_lists(self) -> Iterator[List[Document]]:
         """Iterate over urls and yield lists of documents.
@@ -18,5 +30,5 @@ class ArxivKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
-        for _query in self.queries:
-            yield self.reader.read(query=_query)
+        for _, read_query in self.document_sources:
+            yield read_query()
@@ -1,10 +1,17 @@
-from typing import List, Optional, Iterator, Dict, Any
+import asyncio
+from time import perf_counter
+from typing import List, Optional, Iterator, Dict, Any, Callable, Tuple, Union
 
 from pydantic import BaseModel, ConfigDict
 
 from phi.document import Document
 from phi.document.reader.base import Reader
+from phi.knowledge.cache import RetrievalCache
+from phi.reranker import Reranker
+from phi.knowledge.manifest import LoadManifest, ManifestLoad
+from phi.knowledge.pipeline import LoadPipeline
 from phi.vectordb import VectorDb
+from phi.vectordb.search import SearchType
 from phi.utils.log import logger
 
 
@@ -17,8 +24,19 @@ class AssistantKnowledge(BaseModel):
     vector_db: Optional[VectorDb] = None
     # Number of relevant documents to return on search
     num_documents: int = 2
+    # Search mode used when `search` is called without one, defaults to the search type of the vector db
+    search_mode: Optional[SearchType] = None
     # Number of documents to optimize the vector db on
     optimize_on: Optional[int] = 1000
+    # Pipeline used when loading with `pipeline=True`
+    load_pipeline: Optional[LoadPipeline] = None
+    # Manifest of the loaded files, used to skip unchanged files and remove documents of changed or removed files
+    manifest: Optional[LoadManifest] = None
+    # Cache of search results, invalidated by writes to the vector db
+    cache: Optional[RetrievalCache] = None
+    # Re-ranks `num_documents * rerank_oversample` search candidates and keeps the best `num_documents`
+    reranker: Optional[Reranker] = None
+    rerank_oversample: int = 3
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -29,27 +47,245 @@ class AssistantKnowledge(BaseModel):
         """
         raise NotImplementedError
 
-    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
-        """Returns relevant documents matching the query"""
+    @property
+    def document_sources(self) -> Optional[Iterator[Tuple[str, Callable[[], List[Document]]]]]:
+        """Iterator that yields (source, read function) pairs, one for each file or url in the knowledge base.
+        Each read function returns the list of documents for its source and can be called independently,
+        which lets the load pipeline read sources concurrently.
+
+        Returns None if the knowledge base can only be read through `document_lists`.
+        """
+        return None
+
+    def search(
+        self,
+        query: str,
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[Union[SearchType, str]] = None,
+    ) -> List[Document]:
+        """Returns relevant documents matching the query
+
+        Args:
+            query (str): The search query.
+            num_documents (Optional[int]): Number of documents to return. Defaults to `num_documents`.
+            filters (Optional[Dict[str, Any]]): Filters passed to the vector db.
+            mode (Optional[Union[SearchType, str]]): "vector", "keyword" or "hybrid". Defaults to `search_mode`.
+        """
         try:
             if self.vector_db is None:
                 logger.warning("No vector db provided")
                 return []
 
             _num_documents = num_documents or self.num_documents
+            _mode = SearchType(mode) if mode is not None else self.search_mode
+            cache_key = self.get_cache_key(query, _num_documents, filters, _mode)
+            if cache_key is not None and self.cache is not None:
+                cached_documents = self.cache.get(cache_key)
+                if cached_documents is not None:
+                    logger.debug(f"Found {len(cached_documents)} cached documents for query: {query}")
+                    return cached_documents
+
+            logger.debug(f"Getting {_num_documents} relevant documents for query: {query} (mode: {_mode})")
+            start = perf_counter()
+            _num_candidates = self.get_num_candidates(_num_documents)
+            if _mode == SearchType.hybrid:
+                documents = self.vector_db.hybrid_search(
+                    query=query, limit=_num_candidates, filters=filters, include_embeddings=self.needs_embeddings
+                )
+            elif _mode == SearchType.keyword:
+                documents = self.vector_db.keyword_search(
+                    query=query, limit=_num_candidates, filters=filters, include_embeddings=self.needs_embeddings
+                )
+            elif _mode == SearchType.vector:
+                documents = self.vector_db.vector_search(
+                    query=query, limit=_num_candidates, filters=filters, include_embeddings=self.needs_embeddings
+                )
+            else:
+                documents = self.vector_db.search(
+                    query=query, limit=_num_candidates, filters=filters, include_embeddings=self.needs_embeddings
+                )
+            documents = self.rerank(query, documents, _num_documents)
+            if cache_key is not None and self.cache is not None:
+                self.cache.set(cache_key, documents, perf_counter() - start)
+            return documents
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            return []
+
+    async def async_search(
+        self,
+        query: str,
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[Union[SearchType, str]] = None,
+    ) -> List[Document]:
+        """Async version of `search`. Without a `mode` (or `search_mode`), awaits the vector db's `async_search`,
+        explicit modes run `search` in a thread. Knowledge bases which override `search`, like the LangChain and
+        LlamaIndex ones, run their `search` in a thread."""
+        if not self.searches_vector_db:
+            return await asyncio.to_thread(self.search, query=query, num_documents=num_documents)
+
+        _mode = SearchType(mode) if mode is not None else self.search_mode
+        if _mode is not None:
+            return await asyncio.to_thread(self.search, query, num_documents, filters, _mode)
+
+        try:
+            if self.vector_db is None:
+                logger.warning("No vector db provided")
+                return []
+
+            _num_documents = num_documents or self.num_documents
+            cache_key = self.get_cache_key(query, _num_documents, filters, _mode)
+            if cache_key is not None and self.cache is not None:
+                cached_documents = self.cache.get(cache_key)
+                if cached_documents is not None:
+                    logger.debug(f"Found {len(cached_documents)} cached documents for query: {query}")
+                    return cached_documents
+
             logger.debug(f"Getting {_num_documents} relevant documents for query: {query}")
-            return self.vector_db.search(query=query, limit=_num_documents)
+            start = perf_counter()
+            documents = await self.vector_db.async_search(
+                query=query,
+                limit=self.get_num_candidates(_num_documents),
+                filters=filters,
+                include_embeddings=self.needs_embeddings,
+            )
+            documents = await self.async_rerank(query, documents, _num_documents)
+            if cache_key is not None and self.cache is not None:
+                self.cache.set(cache_key, documents, perf_counter() - start)
+            return documents
         except Exception as e:
             logger.error(f"Error searching for documents: {e}")
             return []
 
-    def load(self, recreate: bool = False, upsert: bool = False, skip_existing: bool = True) -> None:
+    def search_many(
+        self,
+        queries: List[str],
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[Union[SearchType, str]] = None,
+    ) -> List[List[Document]]:
+        """Returns the relevant documents for each query, in the order of the queries.
+
+        Without a `mode` (or `search_mode`), the queries go through the vector db's `search_batch`, which embeds them
+        in one request and searches them in one round trip where the vector db supports it. With a mode, or for
+        knowledge bases which override `search`, the queries are searched concurrently.
+        """
+        if len(queries) == 0:
+            return []
+        _mode = SearchType(mode) if mode is not None else self.search_mode
+        overrides_search = type(self).search is not AssistantKnowledge.search
+        try:
+            if self.vector_db is None and not overrides_search:
+                logger.warning("No vector db provided")
+                return [[] for _ in queries]
+
+            _num_documents = num_documents or self.num_documents
+            logger.debug(f"Getting {_num_documents} relevant documents for {len(queries)} queries (mode: {_mode})")
+            if _mode is None and self.vector_db is not None and not overrides_search:
+                # Only search the queries which are not cached
+                search_results: List[Optional[List[Document]]] = [None for _ in queries]
+                cache_keys = [self.get_cache_key(query, _num_documents, filters, _mode) for query in queries]
+                if self.cache is not None:
+                    for i, cache_key in enumerate(cache_keys):
+                        if cache_key is not None:
+                            search_results[i] = self.cache.get(cache_key)
+
+                to_search = [i for i, documents in enumerate(search_results) if documents is None]
+                if len(to_search) > 0:
+                    start = perf_counter()
+                    batch_results = self.vector_db.search_batch(
+                        queries=[queries[i] for i in to_search],
+                        limit=self.get_num_candidates(_num_documents),
+                        filters=filters,
+                        include_embeddings=self.needs_embeddings,
+                    )
+                    for i, documents in zip(to_search, batch_results):
+                        search_results[i] = self.rerank(queries[i], documents, _num_documents)
+                    search_time = (perf_counter() - start) / len(to_search)
+                    for i in to_search:
+                        documents = search_results[i] or []
+                        cache_key = cache_keys[i]
+                        if cache_key is not None and self.cache is not None:
+                            self.cache.set(cache_key, documents, search_time)
+                return [documents or [] for documents in search_results]
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            return [[] for _ in queries]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def search(query: str) -> List[Document]:
+            if overrides_search:
+                # Overridden searches only take the query and number of documents
+                return self.search(query=query, num_documents=num_documents)
+            return self.search(query=query, num_documents=num_documents, filters=filters, mode=_mode)
+
+        with ThreadPoolExecutor(max_workers=min(len(queries), 8)) as executor:
+            return list(executor.map(search, queries))
+
+    @property
+    def searches_vector_db(self) -> bool:
+        """False for knowledge bases which override `search` to search elsewhere, or have no vector db"""
+        return type(self).search is AssistantKnowledge.search and self.vector_db is not None
+
+    @property
+    def needs_embeddings(self) -> bool:
+        """Search results only include embeddings when the reranker uses them"""
+        return self.reranker is not None and self.reranker.needs_embeddings
+
+    def get_num_candidates(self, num_documents: int) -> int:
+        """Returns the number of candidates to search for: oversampled when re-ranking"""
+        if self.reranker is None:
+            return num_documents
+        return num_documents * max(self.rerank_oversample, 1)
+
+    def rerank(self, query: str, documents: List[Document], num_documents: int) -> List[Document]:
+        """Returns the best `num_documents` candidates, in search order if there is no reranker or it fails"""
+        if self.reranker is None:
+            return documents[:num_documents]
+        try:
+            return self.reranker.rerank(query=query, documents=documents, top_n=num_documents)
+        except Exception as e:
+            logger.warning(f"Error re-ranking documents, using search order: {e}")
+            return documents[:num_documents]
+
+    async def async_rerank(self, query: str, documents: List[Document], num_documents: int) -> List[Document]:
+        if self.reranker is None:
+            return documents[:num_documents]
+        try:
+            return await self.reranker.async_rerank(query=query, documents=documents, top_n=num_documents)
+        except Exception as e:
+            logger.warning(f"Error re-ranking documents, using search order: {e}")
+            return documents[:num_documents]
+
+    def get_cache_key(
+        self, query: str, num_documents: int, filters: Optional[Dict[str, Any]], mode: Optional[SearchType]
+    ) -> Optional[Tuple]:
+        """Returns the retrieval cache key of a search, or None if there is no cache"""
+        if self.cache is None or self.vector_db is None:
+            return None
+        return self.cache.get_key(
+            self.vector_db, query, num_documents, filters, mode.value if mode is not None else None
+        )
+
+    def load(
+        self,
+        recreate: bool = False,
+        upsert: bool = False,
+        skip_existing: bool = True,
+        pipeline: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> None:
         """Load the knowledge base to the vector db
 
         Args:
             recreate (bool): If True, recreates the collection in the vector db. Defaults to False.
             upsert (bool): If True, upserts documents to the vector db. Defaults to False.
             skip_existing (bool): If True, skips documents which already exist in the vector db when inserting. Defaults to True.
+            pipeline (bool): If True, reads, embeds and writes documents concurrently using the `load_pipeline`. Defaults to False.
+            concurrency (Optional[int]): Number of concurrent readers and embedding requests when `pipeline` is True.
         """
 
         if self.vector_db is None:
@@ -59,32 +295,80 @@ class AssistantKnowledge(BaseModel):
         if recreate:
             logger.info("Deleting collection")
             self.vector_db.delete()
+            if self.manifest is not None:
+                self.manifest.clear(self.get_manifest_namespace())
 
         logger.info("Creating collection")
         self.vector_db.create()
 
         logger.info("Loading knowledge base")
         num_documents = 0
-        for document_list in self.document_lists:
-            documents_to_load = document_list
-            # Upsert documents if upsert is True and vector db supports upsert
-            if upsert and self.vector_db.upsert_available():
-                self.vector_db.upsert(documents=documents_to_load)
-            # Insert documents
-            else:
-                # Filter out documents which already exist in the vector db
-                if skip_existing:
-                    documents_to_load = [
-                        document for document in document_list if not self.vector_db.doc_exists(document)
-                    ]
-                self.vector_db.insert(documents=documents_to_load)
-            num_documents += len(documents_to_load)
-            logger.info(f"Added {len(documents_to_load)} documents to knowledge base")
+        document_sources = self.document_sources
+        # Only read the new or modified files listed by the manifest
+        manifest_load: Optional[ManifestLoad] = None
+        if self.manifest is not None and document_sources is not None:
+            manifest_load = self.manifest.plan(self.get_manifest_namespace(), document_sources)
+            self.manifest.delete_stale(manifest_load, self.vector_db)
+            document_sources = iter(manifest_load.sources)
+
+        if pipeline:
+            stats = self.get_load_pipeline(concurrency=concurrency).run(
+                vector_db=self.vector_db,
+                document_lists=self.document_lists if document_sources is None else None,
+                document_sources=document_sources,
+                upsert=upsert,
+                skip_existing=skip_existing,
+                on_read=manifest_load.record_read if manifest_load is not None else None,
+            )
+            num_documents = stats["write"].documents
+        else:
+            document_lists = self.document_lists
+            if manifest_load is not None:
+                document_lists = self._read_manifest_sources(manifest_load)
+            for document_list in document_lists:
+                documents_to_load = document_list
+                # Upsert documents if upsert is True and vector db supports upsert
+                if upsert and self.vector_db.upsert_available():
+                    self.vector_db.upsert(documents=documents_to_load)
+                # Insert documents
+                else:
+                    # Filter out documents which already exist in the vector db
+                    if skip_existing:
+                        existing_hashes = self.vector_db.docs_exist(document_list)
+                        documents_to_load = [
+                            document for document in document_list if document.content_hash not in existing_hashes
+                        ]
+                    self.vector_db.insert(documents=documents_to_load)
+                num_documents += len(documents_to_load)
+                logger.info(f"Added {len(documents_to_load)} documents to knowledge base")
+
+        if self.manifest is not None and manifest_load is not None:
+            self.manifest.commit(manifest_load)
 
         if self.optimize_on is not None and num_documents > self.optimize_on:
             logger.info("Optimizing Vector DB")
             self.vector_db.optimize()
 
+    def _read_manifest_sources(self, manifest_load: ManifestLoad) -> Iterator[List[Document]]:
+        for source, read_source in manifest_load.sources:
+            documents = read_source()
+            manifest_load.record_read(source, documents)
+            yield documents
+
+    def get_manifest_namespace(self) -> str:
+        """Returns the manifest namespace, defaults to the vector db collection"""
+        if self.manifest is not None and self.manifest.namespace is not None:
+            return self.manifest.namespace
+        collection = getattr(self.vector_db, "collection", None) or getattr(self.vector_db, "table_name", None)
+        return f"{self.vector_db.__class__.__name__}:{collection}"
+
+    def get_load_pipeline(self, concurrency: Optional[int] = None) -> LoadPipeline:
+        """Returns the load pipeline, with the concurrency overridden if provided"""
+        _pipeline = self.load_pipeline or LoadPipeline()
+        if concurrency is not None:
+            _pipeline = _pipeline.model_copy(update={"concurrency": concurrency})
+        return _pipeline
+
     def load_documents(self, documents: List[Document], upsert: bool = False, skip_existing: bool = True) -> None:
         """Load documents to the knowledge base
 
@@ -109,11 +393,10 @@ class AssistantKnowledge(BaseModel):
             return
 
         # Filter out documents which already exist in the vector db
-        documents_to_load = (
-            [document for document in documents if not self.vector_db.doc_exists(document)]
-            if skip_existing
-            else documents
-        )
+        documents_to_load = documents
+        if skip_existing:
+            existing_hashes = self.vector_db.docs_exist(documents)
+            documents_to_load = [document for document in documents if document.content_hash not in existing_hashes]
 
         # Insert documents
         if len(documents_to_load) > 0:
@@ -175,4 +458,7 @@ class AssistantKnowledge(BaseModel):
             logger.warning("No vector db available")
             return True
 
-        return self.vector_db.clear()
+        cleared = self.vector_db.clear()
+        if cleared and self.manifest is not None:
+            self.manifest.clear(self.get_manifest_namespace())
+        return cleared
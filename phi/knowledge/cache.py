@@ -0,0 +1,126 @@
+import json
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, PrivateAttr
+
+from phi.document import Document
+from phi.vectordb import VectorDb
+
+
+class RetrievalCacheEntry(BaseModel):
+    """Search results cached by `RetrievalCache`"""
+
+    documents: List[Document]
+    # Time taken by the search which produced the documents, in seconds
+    search_time: float
+    created_at: float
+
+
+class RetrievalCache(BaseModel):
+    """In-process LRU cache of knowledge base search results.
+
+    Results are keyed on the normalised query, filters, limit, search mode, collection and the version of the
+    vector db, which is bumped by every write to it, so results are never served after the collection changed
+    through the same vector db. `ttl` bounds the staleness of results when other processes write to the collection.
+    """
+
+    # Seconds after which a cached result expires. If None, results only expire on writes and LRU eviction.
+    ttl: Optional[float] = 300
+    # Maximum number of cached results, the least recently used are evicted first
+    max_entries: int = 1000
+
+    _entries: "OrderedDict[Tuple, RetrievalCacheEntry]" = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+    _saved_time: float = PrivateAttr(default=0.0)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total > 0 else 0.0
+
+    @property
+    def saved_time(self) -> float:
+        """Total search time saved by cache hits, in seconds"""
+        return self._saved_time
+
+    def normalize_query(self, query: str) -> str:
+        """Queries differing only in case or whitespace share a cache entry"""
+        return " ".join(query.lower().split())
+
+    def get_key(
+        self,
+        vector_db: VectorDb,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> Tuple:
+        """Returns the cache key of a search. Take the key before searching: if the collection is written to
+        during the search, the result is stored under the previous version and never served."""
+        return (
+            self.normalize_query(query),
+            json.dumps(filters, sort_keys=True, default=str) if filters is not None else None,
+            limit,
+            mode,
+            vector_db.__class__.__name__,
+            getattr(vector_db, "collection", None),
+            id(vector_db),
+            vector_db.version,
+        )
+
+    def get(self, key: Tuple) -> Optional[List[Document]]:
+        """Returns copies of the cached documents for the key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and monotonic() - entry.created_at > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._saved_time += entry.search_time
+            documents = entry.documents
+        return [document.model_copy() for document in documents]
+
+    def set(self, key: Tuple, documents: List[Document], search_time: float) -> None:
+        with self._lock:
+            self._entries[key] = RetrievalCacheEntry(
+                documents=[document.model_copy() for document in documents],
+                search_time=search_time,
+                created_at=monotonic(),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "cache_hits": self._hits,
+            "cache_misses": self._misses,
+            "cache_hit_rate": round(self.hit_rate, 4),
+            "cache_saved_time": round(self._saved_time, 4),
+        }
+
+    def clear(self) -> None:
+        """Clear the cached results and reset the metrics"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._saved_time = 0.0
@@ -1,4 +1,4 @@
-from typing import List, Iterator
+from typing import List, Iterator, Optional, Callable, Tuple
 
 from phi.document import Document
 from phi.knowledge.base import AssistantKnowledge
@@ -20,3 +20,17 @@ class CombinedKnowledgeBase(AssistantKnowledge):
         for kb in self.sources:
             logger.debug(f"Loading documents from {kb.__class__.__name__}")
             yield from kb.document_lists
+
+    @property
+    def document_sources(self) -> Optional[Iterator[Tuple[str, Callable[[], List[Document]]]]]:
+        """Chain the document sources of all knowledge bases.
+
+        Returns:
+            Optional[Iterator[Tuple[str, Callable[[], List[Document]]]]]: Iterator yielding (source, read function)
+                pairs, or None if any of the knowledge bases can only be read through `document_lists`
+        """
+
+        sources = [kb.document_sources for kb in self.sources]
+        if any(kb_sources is None for kb_sources in sources):
+            return None
+        return (source for kb_sources in sources if kb_sources is not None for source in kb_sources)
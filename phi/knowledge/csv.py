@@ -1,5 +1,6 @@
+from functools import partial
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.csv_reader import CSVReader
@@ -11,18 +12,29 @@ class CSVKnowledgeBase(AssistantKnowledge):
     reader: CSVReader = CSVReader()
 
     @property
-    def document_lists(self) -> Iterator[List[Document]]:
-        """Iterate over CSVs and yield lists of documents.
-        Each object yielded by the iterator is a list of documents.
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over CSVs and yield a function reading each CSV.
 
         Returns:
-            Iterator[List[Document]]: Iterator yielding list of documents
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (path, read function) pairs
         """
 
         _csv_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _csv_path.exists() and _csv_path.is_dir():
             for _csv in _csv_path.glob("**/*.csv"):
-                yield self.reader.read(path=_csv)
+                yield str(_csv), partial(self.reader.read, path=_csv)
         elif _csv_path.exists() and _csv_path.is_file() and _csv_path.suffix == ".csv":
-            yield self.reader.read(path=_csv_path)
+            yield str(_csv_path), partial(self.reader.read, path=_csv_path)
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Iterate over CSVs and yield lists of documents.
+        Each object yielded by the iterator is a list of documents.
+
+        Returns:
+            Iterator[List[Document]]: Iterator yielding list of documents
+        """
+
+        for _, read_csv in self.document_sources:
+            yield read_csv()
@@ -1,5 +1,6 @@
+from functools import partial
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.json import JSONReader
@@ -11,18 +12,29 @@ class JSONKnowledgeBase(AssistantKnowledge):
     reader: JSONReader = JSONReader()
 
     @property
-    def document_lists(self) -> Iterator[List[Document]]:
-        """Iterate over Json files and yield lists of documents.
-        Each object yielded by the iterator is a list of documents.
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over Json files and yield a function reading each file.
 
         Returns:
-            Iterator[List[Document]]: Iterator yielding list of documents
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (path, read function) pairs
         """
 
         _json_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _json_path.exists() and _json_path.is_dir():
-            for _pdf in _json_path.glob("*.json"):
-                yield self.reader.read(path=_pdf)
+            for _json in _json_path.glob("*.json"):
+                yield str(_json), partial(self.reader.read, path=_json)
         elif _json_path.exists() and _json_path.is_file() and _json_path.suffix == ".json":
-            yield self.reader.read(path=_json_path)
+            yield str(_json_path), partial(self.reader.read, path=_json_path)
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Iterate over Json files and yield lists of documents.
+        Each object yielded by the iterator is a list of documents.
+
+        Returns:
+            Iterator[List[Document]]: Iterator yielding list of documents
+        """
+
+        for _, read_json in self.document_sources:
+            yield read_json()
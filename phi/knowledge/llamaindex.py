@@ -46,7 +46,14 @@ class LlamaIndexKnowledgeBase(AssistantKnowledge):
             )
         return documents
 
-    def load(self, recreate: bool = False, upsert: bool = True, skip_existing: bool = True) -> None:
+    def load(
+        self,
+        recreate: bool = False,
+        upsert: bool = True,
+        skip_existing: bool = True,
+        pipeline: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> None:
         if self.loader is None:
             logger.error("No loader provided for LlamaIndexKnowledgeBase")
             return
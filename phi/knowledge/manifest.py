@@ -0,0 +1,227 @@
+import json
+import sqlite3
+import threading
+from hashlib import md5
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from phi.document import Document
+from phi.vectordb import VectorDb
+from phi.utils.log import logger
+
+
+class ManifestEntry(BaseModel):
+    """A file recorded in the load manifest"""
+
+    path: str
+    size: int
+    mtime: float
+    file_hash: str
+    # Content hashes of the documents produced by the file
+    content_hashes: List[str] = []
+
+
+class ManifestLoad(BaseModel):
+    """The files to load, as planned by `LoadManifest.plan`"""
+
+    namespace: str
+    # Entries recorded before the load, keyed by path
+    entries: Dict[str, ManifestEntry] = {}
+    # Sources to read: new or modified files and sources which are not local files
+    sources: List[Tuple[str, Callable[[], List[Document]]]] = []
+    # Stats of the new or modified files, recorded once the load succeeds
+    pending: Dict[str, ManifestEntry] = {}
+    # Entries of files which were touched but not modified
+    touched: List[ManifestEntry] = []
+    # Paths of files which no longer exist
+    removed: List[str] = []
+    # Content hashes of the documents read from each source
+    read_hashes: Dict[str, List[str]] = {}
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def record_read(self, source: str, documents: List[Document]) -> None:
+        self.read_hashes[source] = [document.content_hash for document in documents]
+
+
+class LoadManifest(BaseModel):
+    """Records the files loaded into a vector db and the documents each file produced.
+
+    Lets file-based knowledge bases skip unchanged files without reading them, re-load modified files and
+    delete the documents of files which were changed or removed since the last load.
+    A file is unchanged if its size and mtime match, or if its md5 hash matches when they do not.
+    """
+
+    # Sqlite file used to store the manifest
+    db_file: str = "tmp/knowledge_manifest.db"
+    # Namespace for the manifest entries, defaults to the vector db collection.
+    # Knowledge bases sharing a collection should use different namespaces.
+    namespace: Optional[str] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            logger.debug(f"Opening load manifest: {self.db_file}")
+            self._connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "namespace TEXT, path TEXT, size INTEGER, mtime REAL, file_hash TEXT, content_hashes TEXT, "
+                "PRIMARY KEY (namespace, path))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get_entries(self, namespace: str) -> Dict[str, ManifestEntry]:
+        """Returns the entries in the namespace, keyed by path"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT path, size, mtime, file_hash, content_hashes FROM files WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        return {
+            row[0]: ManifestEntry(
+                path=row[0], size=row[1], mtime=row[2], file_hash=row[3], content_hashes=json.loads(row[4])
+            )
+            for row in rows
+        }
+
+    def get_file_stats(self, path: str, entry: Optional[ManifestEntry] = None) -> Tuple[bool, ManifestEntry]:
+        """Returns whether the file changed since it was recorded in `entry`, and its current stats.
+        The file is only hashed if its size or mtime changed.
+        """
+        stat = Path(path).stat()
+        if entry is not None and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+            return False, entry
+
+        file_hash = self.hash_file(path)
+        current = ManifestEntry(path=path, size=stat.st_size, mtime=stat.st_mtime, file_hash=file_hash)
+        if entry is not None and entry.file_hash == file_hash:
+            # Touched but not modified: keep the documents, record the new mtime
+            current.content_hashes = entry.content_hashes
+            return False, current
+        return True, current
+
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+        file_hash = md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def upsert_entries(self, namespace: str, entries: List[ManifestEntry]) -> None:
+        if len(entries) == 0:
+            return
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files (namespace, path, size, mtime, file_hash, content_hashes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(namespace, e.path, e.size, e.mtime, e.file_hash, json.dumps(e.content_hashes)) for e in entries],
+            )
+            self.connection.commit()
+
+    def delete_entries(self, namespace: str, paths: List[str]) -> None:
+        if len(paths) == 0:
+            return
+        with self._lock:
+            self.connection.executemany(
+                "DELETE FROM files WHERE namespace = ? AND path = ?", [(namespace, path) for path in paths]
+            )
+            self.connection.commit()
+
+    def clear(self, namespace: str) -> None:
+        """Delete all entries in the namespace"""
+        with self._lock:
+            self.connection.execute("DELETE FROM files WHERE namespace = ?", (namespace,))
+            self.connection.commit()
+
+    @staticmethod
+    def get_stale_hashes(entries: Dict[str, ManifestEntry], paths: List[str]) -> Set[str]:
+        """Returns the content hashes of the documents produced by `paths` and by no other file.
+
+        Args:
+            entries (Dict[str, ManifestEntry]): Entries recorded before the load, keyed by path
+            paths (List[str]): Paths of the files which were modified or removed
+        """
+        candidates: Set[str] = set()
+        for path in paths:
+            if path in entries:
+                candidates.update(entries[path].content_hashes)
+
+        # Documents can be produced by more than one file, keep the ones still referenced
+        _paths = set(paths)
+        referenced: Set[str] = set()
+        for path, entry in entries.items():
+            if path not in _paths:
+                referenced.update(entry.content_hashes)
+        return candidates - referenced
+
+    def plan(
+        self, namespace: str, document_sources: Iterator[Tuple[str, Callable[[], List[Document]]]]
+    ) -> ManifestLoad:
+        """Compare the sources with the manifest and return the sources which need to be read.
+        Sources which are not local files (e.g. urls) are always read.
+        """
+        entries = self.get_entries(namespace)
+        load = ManifestLoad(namespace=namespace, entries=entries)
+        seen_paths: Set[str] = set()
+        for source, read_source in document_sources:
+            if not Path(source).is_file():
+                load.sources.append((source, read_source))
+                continue
+
+            seen_paths.add(source)
+            entry = entries.get(source)
+            changed, current = self.get_file_stats(source, entry)
+            if changed:
+                load.sources.append((source, read_source))
+                load.pending[source] = current
+            elif current is not entry:
+                load.touched.append(current)
+        load.removed = [path for path in entries if path not in seen_paths]
+        logger.info(
+            f"Manifest: {len(load.pending)} new or modified files, {len(load.removed)} removed files, "
+            f"{len(seen_paths) - len(load.pending)} unchanged files"
+        )
+        return load
+
+    def delete_stale(self, load: ManifestLoad, vector_db: VectorDb) -> None:
+        """Delete the documents of modified and removed files before the load.
+        Documents are deleted up front because vector dbs which key documents on their id (e.g. `name_chunk`)
+        would otherwise reject the new documents of a modified file.
+        """
+        stale_hashes = self.get_stale_hashes(load.entries, list(load.pending.keys()) + load.removed)
+        if len(stale_hashes) == 0:
+            return
+
+        logger.info(f"Deleting {len(stale_hashes)} documents from modified or removed files")
+        try:
+            vector_db.delete_docs(list(stale_hashes))
+        except NotImplementedError:
+            logger.warning(f"{vector_db.__class__.__name__} does not support deleting documents")
+
+    def commit(self, load: ManifestLoad) -> None:
+        """Record the loaded files. Called after the documents were written, so a failed load is retried."""
+        loaded: List[ManifestEntry] = []
+        for path, entry in load.pending.items():
+            content_hashes = load.read_hashes.get(path, [])
+            # Files which produced no documents (e.g. failed reads) are read again on the next load
+            if len(content_hashes) == 0:
+                continue
+            entry.content_hashes = content_hashes
+            loaded.append(entry)
+        self.upsert_entries(load.namespace, loaded + load.touched)
+        self.delete_entries(load.namespace, load.removed)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
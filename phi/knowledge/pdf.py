@@ -1,8 +1,11 @@
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Callable, Tuple, Deque
 
 from phi.document import Document
-from phi.document.reader.pdf import PDFReader, PDFUrlReader, PDFImageReader, PDFUrlImageReader
+from phi.document.reader.pdf import PDFReader, PDFUrlReader, PDFImageReader, PDFUrlImageReader, get_process_pool
 from phi.knowledge.base import AssistantKnowledge
 
 
@@ -11,27 +14,67 @@ class PDFKnowledgeBase(AssistantKnowledge):
     reader: Union[PDFReader, PDFImageReader] = PDFReader()
 
     @property
-    def document_lists(self) -> Iterator[List[Document]]:
-        """Iterate over PDFs and yield lists of documents.
-        Each object yielded by the iterator is a list of documents.
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over PDFs and yield a function reading each PDF.
 
         Returns:
-            Iterator[List[Document]]: Iterator yielding list of documents
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (path, read function) pairs
         """
 
         _pdf_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _pdf_path.exists() and _pdf_path.is_dir():
             for _pdf in _pdf_path.glob("**/*.pdf"):
-                yield self.reader.read(pdf=_pdf)
+                yield str(_pdf), partial(self.reader.read, pdf=_pdf)
         elif _pdf_path.exists() and _pdf_path.is_file() and _pdf_path.suffix == ".pdf":
-            yield self.reader.read(pdf=_pdf_path)
+            yield str(_pdf_path), partial(self.reader.read, pdf=_pdf_path)
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Iterate over PDFs and yield lists of documents.
+        Each object yielded by the iterator is a list of documents.
+
+        Returns:
+            Iterator[List[Document]]: Iterator yielding list of documents
+        """
+
+        if self.reader.workers > 1:
+            yield from self._read_in_processes()
+            return
+
+        for _, read_pdf in self.document_sources:
+            yield read_pdf()
+
+    def _read_in_processes(self) -> Iterator[List[Document]]:
+        """Read whole PDFs in the reader's process pool, yielding the documents in file order"""
+        # Each worker process reads a file sequentially
+        file_reader = self.reader.model_copy(update={"workers": 1})
+        pool = get_process_pool(self.reader.workers)
+        in_flight: Deque[Future] = deque()
+        for pdf_path, _ in self.document_sources:
+            in_flight.append(pool.submit(file_reader.read, pdf=Path(pdf_path)))
+            # Limit the number of reads in flight, so finished reads do not pile up in memory
+            if len(in_flight) >= 2 * self.reader.workers:
+                yield in_flight.popleft().result()
+        while len(in_flight) > 0:
+            yield in_flight.popleft().result()
 
 
 class PDFUrlKnowledgeBase(AssistantKnowledge):
     urls: List[str] = []
     reader: Union[PDFUrlReader, PDFUrlImageReader] = PDFUrlReader()
 
+    @property
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over PDF urls and yield a function reading each PDF.
+
+        Returns:
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (url, read function) pairs
+        """
+
+        for url in self.urls:
+            yield url, partial(self.reader.read, url=url)
+
     @property
     def document_lists(self) -> Iterator[List[Document]]:
         """Iterate over PDF urls and yield lists of documents.
@@ -41,5 +84,5 @@ class PDFUrlKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
-        for url in self.urls:
-            yield self.reader.read(url=url)
+        for _, read_pdf in self.document_sources:
+            yield read_pdf()
@@ -0,0 +1,307 @@
+import queue
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from phi.document import Document
+from phi.document.base import reuse_embeddings
+from phi.embedder import Embedder
+from phi.vectordb import VectorDb
+from phi.utils.log import logger
+
+# Marks the end of the items produced by a stage
+_DONE = object()
+
+
+class StageStats(BaseModel):
+    """Throughput statistics for a single stage of the load pipeline"""
+
+    name: str
+    # Number of documents processed by the stage
+    documents: int = 0
+    # Number of batches (or document lists) processed by the stage
+    batches: int = 0
+    # Time spent doing work in the stage, summed over all workers of the stage
+    busy_time: float = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.busy_time if self.busy_time > 0 else 0.0
+
+    def add(self, documents: int, busy_time: float, lock: threading.Lock) -> None:
+        with lock:
+            self.documents += documents
+            self.batches += 1
+            self.busy_time += busy_time
+
+
+class LoadPipeline(BaseModel):
+    """Loads documents into a vector db using concurrent stages: read -> filter -> embed -> write.
+
+    The stages are connected by bounded queues so that a slow stage applies backpressure to the stages
+    before it and the number of documents held in memory stays bounded.
+    Embedding batches are formed across sources, so small files are embedded together.
+    """
+
+    # Number of concurrent embedding requests
+    concurrency: int = 4
+    # Number of concurrent readers, defaults to `concurrency`
+    num_readers: Optional[int] = None
+    # Read sources in a process pool instead of a thread pool, useful for CPU heavy readers like PDF
+    use_processes: bool = False
+    # Number of documents per embedding batch
+    embed_batch_size: int = 100
+    # Number of documents per vector db write
+    write_batch_size: int = 500
+    # Maximum number of items waiting between two stages
+    queue_size: int = 8
+
+    def run(
+        self,
+        vector_db: VectorDb,
+        document_lists: Optional[Iterator[List[Document]]] = None,
+        document_sources: Optional[Iterator[Tuple[str, Callable[[], List[Document]]]]] = None,
+        upsert: bool = False,
+        skip_existing: bool = True,
+        on_read: Optional[Callable[[str, List[Document]], None]] = None,
+    ) -> Dict[str, StageStats]:
+        """Run the pipeline and return the statistics for each stage.
+
+        Args:
+            vector_db (VectorDb): Vector db to load the documents to.
+            document_lists (Optional[Iterator[List[Document]]]): Lists of documents, read by a single reader.
+            document_sources (Optional[Iterator[Tuple[str, Callable[[], List[Document]]]]]): Sources that can be
+                read independently, read concurrently by the reader pool. Takes precedence over `document_lists`.
+            upsert (bool): If True, upserts documents to the vector db. Defaults to False.
+            skip_existing (bool): If True, skips documents which already exist in the vector db when inserting.
+            on_read (Optional[Callable[[str, List[Document]], None]]): Called with each source and its documents
+                once the source is read.
+        """
+        if document_lists is None and document_sources is None:
+            raise ValueError("Provide either document_lists or document_sources")
+
+        _upsert = upsert and vector_db.upsert_available()
+        _skip_existing = skip_existing and not _upsert
+        embedder: Optional[Embedder] = getattr(vector_db, "embedder", None)
+        num_embedders = max(1, self.concurrency)
+
+        stats: Dict[str, StageStats] = {
+            "read": StageStats(name="read"),
+            "filter": StageStats(name="filter"),
+            "embed": StageStats(name="embed"),
+            "write": StageStats(name="write"),
+        }
+        stats_lock = threading.Lock()
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        read_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            # Block while the queue is full, unless the pipeline is stopping
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue) -> Any:
+            # Block while the queue is empty, unless the pipeline is stopping
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def fail(e: BaseException) -> None:
+            logger.error(f"Load pipeline failed: {e}")
+            errors.append(e)
+            stop.set()
+
+        def read() -> None:
+            try:
+                if document_sources is not None:
+                    self._read_sources(document_sources, read_queue, put, stop, stats["read"], stats_lock, on_read)
+                elif document_lists is not None:
+                    start = perf_counter()
+                    for document_list in document_lists:
+                        stats["read"].add(len(document_list), perf_counter() - start, stats_lock)
+                        if not put(read_queue, document_list):
+                            return
+                        start = perf_counter()
+            except BaseException as e:
+                fail(e)
+            finally:
+                put(read_queue, _DONE)
+
+        def filter_and_batch() -> None:
+            seen: Set[str] = set()
+            batch: List[Document] = []
+            try:
+                while True:
+                    document_list = get(read_queue)
+                    if document_list is _DONE:
+                        break
+                    start = perf_counter()
+                    documents = document_list
+                    if _skip_existing:
+                        # Drop documents already in the vector db and duplicates of documents in this load
+                        documents = []
+                        existing_hashes = vector_db.docs_exist(document_list)
+                        for document in document_list:
+                            content_hash = document.content_hash
+                            if content_hash in seen or content_hash in existing_hashes:
+                                continue
+                            seen.add(content_hash)
+                            documents.append(document)
+                    stats["filter"].add(len(document_list), perf_counter() - start, stats_lock)
+
+                    batch.extend(documents)
+                    while len(batch) >= self.embed_batch_size:
+                        if not put(embed_queue, batch[: self.embed_batch_size]):
+                            return
+                        batch = batch[self.embed_batch_size :]
+                if len(batch) > 0:
+                    put(embed_queue, batch)
+            except BaseException as e:
+                fail(e)
+            finally:
+                for _ in range(num_embedders):
+                    put(embed_queue, _DONE)
+
+        def embed() -> None:
+            try:
+                while True:
+                    batch = get(embed_queue)
+                    if batch is _DONE:
+                        break
+                    start = perf_counter()
+                    if embedder is not None:
+                        Document.embed_batch(batch, embedder=embedder, skip_embedded=True)
+                    stats["embed"].add(len(batch), perf_counter() - start, stats_lock)
+                    if not put(write_queue, batch):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                put(write_queue, _DONE)
+
+        threads = [threading.Thread(target=read, name="phi-load-read", daemon=True)]
+        threads.append(threading.Thread(target=filter_and_batch, name="phi-load-filter", daemon=True))
+        threads.extend(
+            threading.Thread(target=embed, name=f"phi-load-embed-{i}", daemon=True) for i in range(num_embedders)
+        )
+        for thread in threads:
+            thread.start()
+
+        # Write in the calling thread so that vector db writes are never run concurrently
+        pipeline_start = perf_counter()
+        pending: List[Document] = []
+        embedders_done = 0
+        try:
+            while embedders_done < num_embedders:
+                batch = get(write_queue)
+                if batch is _DONE:
+                    if stop.is_set():
+                        break
+                    embedders_done += 1
+                    continue
+                pending.extend(batch)
+                if len(pending) >= self.write_batch_size:
+                    self._write(vector_db, pending, _upsert, stats["write"], stats_lock)
+                    pending = []
+            if len(pending) > 0 and not stop.is_set():
+                self._write(vector_db, pending, _upsert, stats["write"], stats_lock)
+        except BaseException as e:
+            fail(e)
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if len(errors) > 0:
+            raise errors[0]
+
+        elapsed = perf_counter() - pipeline_start
+        for stage in stats.values():
+            logger.info(
+                f"Stage {stage.name}: {stage.documents} documents in {stage.batches} batches, "
+                f"busy {stage.busy_time:.2f}s ({stage.documents_per_second:.1f} documents/s)"
+            )
+        logger.info(f"Loaded {stats['write'].documents} documents in {elapsed:.2f}s")
+        return stats
+
+    def _read_sources(
+        self,
+        document_sources: Iterator[Tuple[str, Callable[[], List[Document]]]],
+        read_queue: queue.Queue,
+        put: Callable[[queue.Queue, Any], bool],
+        stop: threading.Event,
+        stage: StageStats,
+        lock: threading.Lock,
+        on_read: Optional[Callable[[str, List[Document]], None]] = None,
+    ) -> None:
+        """Read sources using a pool of workers, keeping a bounded number of reads in flight"""
+        num_readers = max(1, self.num_readers or self.concurrency)
+        executor: Executor = (
+            ProcessPoolExecutor(max_workers=num_readers)
+            if self.use_processes
+            else ThreadPoolExecutor(max_workers=num_readers, thread_name_prefix="phi-load-reader")
+        )
+        in_flight: Dict[Future, str] = {}
+
+        def drain(return_when: str) -> bool:
+            done, _ = wait(list(in_flight.keys()), return_when=return_when)
+            for future in done:
+                source = in_flight.pop(future)
+                documents, elapsed = future.result()
+                logger.debug(f"Read {len(documents)} documents from {source}")
+                stage.add(len(documents), elapsed, lock)
+                if on_read is not None:
+                    on_read(source, documents)
+                if not put(read_queue, documents):
+                    return False
+            return True
+
+        try:
+            for source, read_source in document_sources:
+                if stop.is_set():
+                    return
+                in_flight[executor.submit(_timed_read, read_source)] = source
+                # Limit the number of reads in flight, so finished reads do not pile up in memory
+                if len(in_flight) >= 2 * num_readers and not drain(FIRST_COMPLETED):
+                    return
+            while len(in_flight) > 0:
+                if not drain(FIRST_COMPLETED):
+                    return
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _write(
+        self, vector_db: VectorDb, documents: List[Document], upsert: bool, stage: StageStats, lock: threading.Lock
+    ) -> None:
+        start = perf_counter()
+        # The documents were embedded by the embed stage
+        with reuse_embeddings():
+            if upsert:
+                vector_db.upsert(documents=documents)
+            else:
+                vector_db.insert(documents=documents)
+        stage.add(len(documents), perf_counter() - start, lock)
+        logger.info(f"Added {len(documents)} documents to knowledge base")
+
+
+def _timed_read(read_source: Callable[[], List[Document]]) -> Tuple[List[Document], float]:
+    # Defined at module level so it can be sent to a process pool
+    start = perf_counter()
+    documents = read_source()
+    return documents, perf_counter() - start
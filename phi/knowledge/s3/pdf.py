@@ -1,4 +1,5 @@
-from typing import List, Iterator
+from functools import partial
+from typing import List, Iterator, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.s3.pdf import S3PDFReader
@@ -8,6 +9,18 @@ from phi.knowledge.s3.base import S3KnowledgeBase
 class S3PDFKnowledgeBase(S3KnowledgeBase):
     reader: S3PDFReader = S3PDFReader()
 
+    @property
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over PDFs in a s3 bucket and yield a function reading each object.
+
+        Returns:
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (uri, read function) pairs
+        """
+
+        for s3_object in self.s3_objects:
+            if s3_object.name.endswith(".pdf"):
+                yield s3_object.uri, partial(self.reader.read, s3_object=s3_object)
+
     @property
     def document_lists(self) -> Iterator[List[Document]]:
         """Iterate over PDFs in a s3 bucket and yield lists of documents.
@@ -16,6 +29,6 @@ class S3PDFKnowledgeBase(S3KnowledgeBase):
         Returns:
             Iterator[List[Document]]: Iterator yielding list of documents
         """
-        for s3_object in self.s3_objects:
-            if s3_object.name.endswith(".pdf"):
-                yield self.reader.read(s3_object=s3_object)
+
+        for _, read_object in self.document_sources:
+            yield read_object()
@@ -1,4 +1,5 @@
-from typing import List, Iterator
+from functools import partial
+from typing import List, Iterator, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.s3.text import S3TextReader
@@ -9,6 +10,18 @@ class S3TextKnowledgeBase(S3KnowledgeBase):
     formats: List[str] = [".doc", ".docx"]
     reader: S3TextReader = S3TextReader()
 
+    @property
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over text files in a s3 bucket and yield a function reading each object.
+
+        Returns:
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (uri, read function) pairs
+        """
+
+        for s3_object in self.s3_objects:
+            if s3_object.name.endswith(tuple(self.formats)):
+                yield s3_object.uri, partial(self.reader.read, s3_object=s3_object)
+
     @property
     def document_lists(self) -> Iterator[List[Document]]:
         """Iterate over text files in a s3 bucket and yield lists of documents.
@@ -18,6 +31,5 @@ class S3TextKnowledgeBase(S3KnowledgeBase):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
-        for s3_object in self.s3_objects:
-            if s3_object.name.endswith(tuple(self.formats)):
-                yield self.reader.read(s3_object=s3_object)
+        for _, read_object in self.document_sources:
+            yield read_object()
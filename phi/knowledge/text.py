@@ -1,5 +1,6 @@
+from functools import partial
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Callable, Tuple
 
 from phi.document import Document
 from phi.document.reader.text import TextReader
@@ -12,12 +13,11 @@ class TextKnowledgeBase(AssistantKnowledge):
     reader: TextReader = TextReader()
 
     @property
-    def document_lists(self) -> Iterator[List[Document]]:
-        """Iterate over text files and yield lists of documents.
-        Each object yielded by the iterator is a list of documents.
+    def document_sources(self) -> Iterator[Tuple[str, Callable[[], List[Document]]]]:
+        """Iterate over text files and yield a function reading each file.
 
         Returns:
-            Iterator[List[Document]]: Iterator yielding list of documents
+            Iterator[Tuple[str, Callable[[], List[Document]]]]: Iterator yielding (path, read function) pairs
         """
 
         _file_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
@@ -25,6 +25,18 @@ class TextKnowledgeBase(AssistantKnowledge):
         if _file_path.exists() and _file_path.is_dir():
             for _file in _file_path.glob("**/*"):
                 if _file.suffix in self.formats:
-                    yield self.reader.read(path=_file)
+                    yield str(_file), partial(self.reader.read, path=_file)
         elif _file_path.exists() and _file_path.is_file() and _file_path.suffix in self.formats:
-            yield self.reader.read(path=_file_path)
+            yield str(_file_path), partial(self.reader.read, path=_file_path)
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Iterate over text files and yield lists of documents.
+        Each object yielded by the iterator is a list of documents.
+
+        Returns:
+            Iterator[List[Document]]: Iterator yielding list of documents
+        """
+
+        for _, read_file in self.document_sources:
+            yield read_file()
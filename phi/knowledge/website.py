@@ -15,11 +15,12 @@ class WebsiteKnowledgeBase(AssistantKnowledge):
     # WebsiteReader parameters
     max_depth: int = 3
     max_links: int = 10
+    use_async: bool = False
 
     @model_validator(mode="after")  # type: ignore
     def set_reader(self) -> "WebsiteKnowledgeBase":
         if self.reader is None:
-            self.reader = WebsiteReader(max_depth=self.max_depth, max_links=self.max_links)
+            self.reader = WebsiteReader(max_depth=self.max_depth, max_links=self.max_links, use_async=self.use_async)
         return self  # type: ignore
 
     @property
@@ -34,7 +35,14 @@ class WebsiteKnowledgeBase(AssistantKnowledge):
             for _url in self.urls:
                 yield self.reader.read(url=_url)
 
-    def load(self, recreate: bool = False, upsert: bool = True, skip_existing: bool = True) -> None:
+    def load(
+        self,
+        recreate: bool = False,
+        upsert: bool = True,
+        skip_existing: bool = True,
+        pipeline: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> None:
         """Load the website contents to the vector db"""
 
         if self.vector_db is None:
@@ -59,23 +67,37 @@ class WebsiteKnowledgeBase(AssistantKnowledge):
         # We check if the website url exists in the vector db if recreate is False
         urls_to_read = self.urls.copy()
         if not recreate:
-            for url in urls_to_read:
+            for url in self.urls:
                 logger.debug(f"Checking if {url} exists in the vector db")
                 if self.vector_db.name_exists(name=url):
                     logger.debug(f"Skipping {url} as it exists in the vector db")
                     urls_to_read.remove(url)
 
-        for url in urls_to_read:
-            document_list = self.reader.read(url=url)
-            # Filter out documents which already exist in the vector db
-            if not recreate:
-                document_list = [document for document in document_list if not self.vector_db.doc_exists(document)]
-            if upsert and self.vector_db.upsert_available():
-                self.vector_db.upsert(documents=document_list)
-            else:
-                self.vector_db.insert(documents=document_list)
-            num_documents += len(document_list)
-            logger.info(f"Loaded {num_documents} documents to knowledge base")
+        if pipeline:
+            # The crawler keeps state while reading a url, so urls are read one at a time
+            reader = self.reader
+            stats = self.get_load_pipeline(concurrency=concurrency).run(
+                vector_db=self.vector_db,
+                document_lists=(reader.read(url=url) for url in urls_to_read),
+                upsert=upsert,
+                skip_existing=not recreate,
+            )
+            num_documents = stats["write"].documents
+        else:
+            for url in urls_to_read:
+                document_list = self.reader.read(url=url)
+                # Filter out documents which already exist in the vector db
+                if not recreate:
+                    existing_hashes = self.vector_db.docs_exist(document_list)
+                    document_list = [
+                        document for document in document_list if document.content_hash not in existing_hashes
+                    ]
+                if upsert and self.vector_db.upsert_available():
+                    self.vector_db.upsert(documents=document_list)
+                else:
+                    self.vector_db.insert(documents=document_list)
+                num_documents += len(document_list)
+                logger.info(f"Loaded {num_documents} documents to knowledge base")
 
         if self.optimize_on is not None and num_documents > self.optimize_on:
             logger.debug("Optimizing Vector DB")
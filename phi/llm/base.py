@@ -154,38 +154,67 @@ class LLM(BaseModel):
     def run_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
         function_call_results: List[Message] = []
         for function_call in function_calls:
-            if self.function_call_stack is None:
-                self.function_call_stack = []
-
             # -*- Run function call
             _function_call_timer = Timer()
             _function_call_timer.start()
             function_call_success = function_call.execute()
             _function_call_timer.stop()
 
-            _function_call_result = Message(
-                role=role,
-                content=function_call.result if function_call_success else function_call.error,
-                tool_call_id=function_call.call_id,
-                tool_call_name=function_call.function.name,
-                tool_call_error=not function_call_success,
-                metrics={"time": _function_call_timer.elapsed},
+            function_call_results.append(
+                self._add_function_call_result(function_call, function_call_success, _function_call_timer, role)
             )
-            if "tool_call_times" not in self.metrics:
-                self.metrics["tool_call_times"] = {}
-            if function_call.function.name not in self.metrics["tool_call_times"]:
-                self.metrics["tool_call_times"][function_call.function.name] = []
-            self.metrics["tool_call_times"][function_call.function.name].append(_function_call_timer.elapsed)
-            function_call_results.append(_function_call_result)
-            self.function_call_stack.append(function_call)
 
             # -*- Check function call limit
-            if len(self.function_call_stack) >= self.function_call_limit:
+            if len(self.function_call_stack or []) >= self.function_call_limit:
                 self.deactivate_function_calls()
                 break  # Exit early if we reach the function call limit
 
         return function_call_results
 
+    async def arun_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        """Async version of `run_function_calls`: coroutine tools are awaited, other tools run in a thread"""
+        function_call_results: List[Message] = []
+        for function_call in function_calls:
+            # -*- Run function call
+            _function_call_timer = Timer()
+            _function_call_timer.start()
+            function_call_success = await function_call.aexecute()
+            _function_call_timer.stop()
+
+            function_call_results.append(
+                self._add_function_call_result(function_call, function_call_success, _function_call_timer, role)
+            )
+
+            # -*- Check function call limit
+            if len(self.function_call_stack or []) >= self.function_call_limit:
+                self.deactivate_function_calls()
+                break  # Exit early if we reach the function call limit
+
+        return function_call_results
+
+    def _add_function_call_result(
+        self, function_call: FunctionCall, function_call_success: bool, timer: Timer, role: str
+    ) -> Message:
+        """Record the function call in the stack and metrics, and return its result message"""
+        if self.function_call_stack is None:
+            self.function_call_stack = []
+
+        _function_call_result = Message(
+            role=role,
+            content=function_call.result if function_call_success else function_call.error,
+            tool_call_id=function_call.call_id,
+            tool_call_name=function_call.function.name,
+            tool_call_error=not function_call_success,
+            metrics={"time": timer.elapsed},
+        )
+        if "tool_call_times" not in self.metrics:
+            self.metrics["tool_call_times"] = {}
+        if function_call.function.name not in self.metrics["tool_call_times"]:
+            self.metrics["tool_call_times"][function_call.function.name] = []
+        self.metrics["tool_call_times"][function_call.function.name].append(timer.elapsed)
+        self.function_call_stack.append(function_call)
+        return _function_call_result
+
     def get_system_prompt_from_llm(self) -> Optional[str]:
         return self.system_prompt
 
@@ -515,7 +515,7 @@ class OpenAIChat(LLM):
                             final_response += f"\n - {_f.get_call_str()}"
                         final_response += "\n\n"
 
-                function_call_results = self.run_function_calls(function_calls_to_run)
+                function_call_results = await self.arun_function_calls(function_calls_to_run)
                 if len(function_call_results) > 0:
                     messages.extend(function_call_results)
                 # -*- Get new response using result of tool call
@@ -1011,7 +1011,7 @@ class OpenAIChat(LLM):
                             yield f"\n - {_f.get_call_str()}"
                         yield "\n\n"
 
-                function_call_results = self.run_function_calls(function_calls_to_run)
+                function_call_results = await self.arun_function_calls(function_calls_to_run)
                 if len(function_call_results) > 0:
                     messages.extend(function_call_results)
                     # Code to show function call results
@@ -11,3 +11,9 @@ class References(BaseModel):
     references: Optional[str] = None
     # Performance in seconds.
     time: Optional[float] = None
+    # Retrieval cache metrics of the knowledge base at the time of the query, if it has a cache.
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+    cache_hit_rate: Optional[float] = None
+    # Total search time saved by cache hits, in seconds.
+    cache_saved_time: Optional[float] = None
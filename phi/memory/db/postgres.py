@@ -2,7 +2,7 @@ from typing import Optional, List
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
@@ -13,6 +13,7 @@ except ImportError:
 
 from phi.memory.db import MemoryDb
 from phi.memory.row import MemoryRow
+from phi.db.engine import EngineOptions, get_engine
 from phi.utils.log import logger
 
 
@@ -23,23 +24,26 @@ class PgMemoryDb(MemoryDb):
         schema: Optional[str] = "ai",
         db_url: Optional[str] = None,
         db_engine: Optional[Engine] = None,
+        engine_options: Optional[EngineOptions] = None,
     ):
         """
         This class provides a memory store backed by a postgres table.
 
         The following order is used to determine the database connection:
             1. Use the db_engine if provided
-            2. Use the db_url to create the engine
+            2. Use the db_url to get the shared engine for the url and engine_options
 
         Args:
             table_name (str): The name of the table to store memory rows.
             schema (Optional[str]): The schema to store the table in. Defaults to "ai".
             db_url (Optional[str]): The database URL to connect to. Defaults to None.
             db_engine (Optional[Engine]): The database engine to use. Defaults to None.
+            engine_options (Optional[EngineOptions]): Connection pool options of the engine used with db_url.
+                Defaults to None.
         """
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url, engine_options)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
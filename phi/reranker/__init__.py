@@ -0,0 +1 @@
+from phi.reranker.base import Reranker
@@ -0,0 +1,22 @@
+import asyncio
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from phi.document import Document
+
+
+class Reranker(BaseModel):
+    """Base class for re-ranking the candidates returned by a knowledge base search"""
+
+    # Whether the candidates must be returned with their embeddings
+    needs_embeddings: bool = False
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def rerank(self, query: str, documents: List[Document], top_n: int) -> List[Document]:
+        """Returns the `top_n` best documents for the query, best first"""
+        raise NotImplementedError
+
+    async def async_rerank(self, query: str, documents: List[Document], top_n: int) -> List[Document]:
+        return await asyncio.to_thread(self.rerank, query, documents, top_n)
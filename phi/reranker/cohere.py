@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Optional
+
+from phi.document import Document
+from phi.reranker.base import Reranker
+
+try:
+    from cohere import Client as CohereClient
+except ImportError:
+    raise ImportError("`cohere` not installed")
+
+
+class CohereReranker(Reranker):
+    """Re-rank with the Cohere rerank API"""
+
+    model: str = "rerank-english-v3.0"
+    request_params: Optional[Dict[str, Any]] = None
+    # -*- Client parameters
+    api_key: Optional[str] = None
+    client_params: Optional[Dict[str, Any]] = None
+    # -*- Provide the Cohere client manually
+    cohere_client: Optional[CohereClient] = None
+
+    @property
+    def client(self) -> CohereClient:
+        if self.cohere_client:
+            return self.cohere_client
+
+        _client_params: Dict[str, Any] = {}
+        if self.api_key:
+            _client_params["api_key"] = self.api_key
+        if self.client_params:
+            _client_params.update(self.client_params)
+        return CohereClient(**_client_params)
+
+    def rerank(self, query: str, documents: List[Document], top_n: int) -> List[Document]:
+        if len(documents) == 0 or top_n <= 0:
+            return []
+
+        _request_params: Dict[str, Any] = {
+            "model": self.model,
+            "query": query,
+            "documents": [document.content for document in documents],
+            "top_n": min(top_n, len(documents)),
+        }
+        if self.request_params:
+            _request_params.update(self.request_params)
+        response = self.client.rerank(**_request_params)
+        return [documents[result.index] for result in response.results]
@@ -0,0 +1,40 @@
+from typing import Any, Callable, List, Optional
+
+from pydantic import PrivateAttr
+
+from phi.document import Document
+from phi.reranker.base import Reranker
+
+
+class CrossEncoderReranker(Reranker):
+    """Re-rank with a cross-encoder scoring each (query, document) pair.
+
+    Runs a local sentence-transformers `CrossEncoder` by default, or any injected `scorer`.
+    """
+
+    model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    # Returns a relevance score for each text, given the query and the texts. Overrides the local model.
+    scorer: Optional[Callable[[str, List[str]], List[float]]] = None
+    batch_size: int = 32
+
+    _cross_encoder: Optional[Any] = PrivateAttr(default=None)
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        if self.scorer is not None:
+            return list(self.scorer(query, texts))
+
+        if self._cross_encoder is None:
+            try:
+                from sentence_transformers import CrossEncoder
+            except ImportError:
+                raise ImportError("`sentence-transformers` not installed")
+            self._cross_encoder = CrossEncoder(self.model)
+        return [float(s) for s in self._cross_encoder.predict([(query, t) for t in texts], batch_size=self.batch_size)]
+
+    def rerank(self, query: str, documents: List[Document], top_n: int) -> List[Document]:
+        if len(documents) == 0 or top_n <= 0:
+            return []
+
+        scores = self.score(query, [document.content for document in documents])
+        ranked = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return [documents[i] for i in ranked[:top_n]]
@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from phi.document import Document
+from phi.embedder import Embedder
+from phi.reranker.base import Reranker
+from phi.utils.log import logger
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+
+class MMRReranker(Reranker):
+    """Maximal marginal relevance: picks documents relevant to the query which are not similar to the documents
+    already picked, so that the references cover more of the candidates with fewer documents.
+
+    Uses the embeddings returned with the candidates, documents returned without one are embedded.
+    """
+
+    # Embedder for the query, must be the embedder of the vector db. Defaults to the embedder of the documents.
+    embedder: Optional[Embedder] = None
+    # Trade-off between relevance (1.0) and diversity (0.0)
+    lambda_mult: float = 0.5
+    needs_embeddings: bool = True
+
+    def rerank(self, query: str, documents: List[Document], top_n: int) -> List[Document]:
+        if len(documents) <= 1 or top_n <= 0:
+            return documents[:top_n]
+
+        embedder = self.embedder or next((d.embedder for d in documents if d.embedder is not None), None)
+        if embedder is None:
+            logger.warning("No embedder for MMR re-ranking, returning the documents in search order")
+            return documents[:top_n]
+
+        Document.embed_batch([document for document in documents if not document.embedding], embedder=embedder)
+        query_embedding = embedder.get_embedding(query)
+        if not query_embedding:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return documents[:top_n]
+
+        selected = self.select(np.asarray(query_embedding), np.asarray([d.embedding for d in documents]), top_n)
+        return [documents[i] for i in selected]
+
+    def select(self, query_embedding: "np.ndarray", embeddings: "np.ndarray", top_n: int) -> List[int]:
+        """Returns the indices of the `top_n` embeddings picked by maximal marginal relevance, in order"""
+        embeddings = embeddings.astype(np.float32)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        query_embedding = query_embedding.astype(np.float32)
+        query_embedding /= max(float(np.linalg.norm(query_embedding)), 1e-12)
+
+        relevance = embeddings @ query_embedding
+        similarity = embeddings @ embeddings.T
+
+        selected: List[int] = [int(np.argmax(relevance))]
+        # Highest similarity of each candidate to the documents selected so far
+        max_similarity = similarity[selected[0]].copy()
+        available = np.ones(len(embeddings), dtype=bool)
+        available[selected[0]] = False
+        while len(selected) < min(top_n, len(embeddings)):
+            scores = self.lambda_mult * relevance - (1 - self.lambda_mult) * max_similarity
+            scores[~available] = -np.inf
+            i = int(np.argmax(scores))
+            selected.append(i)
+            available[i] = False
+            np.maximum(max_similarity, similarity[i], out=max_similarity)
+        return selected
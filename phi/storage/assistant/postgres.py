@@ -2,7 +2,7 @@ from typing import Optional, Any, List
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.engine.row import Row
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
@@ -14,6 +14,7 @@ except ImportError:
 
 from phi.assistant.run import AssistantRun
 from phi.storage.assistant.base import AssistantStorage
+from phi.db.engine import EngineOptions, get_engine
 from phi.utils.log import logger
 
 
@@ -24,22 +25,24 @@ class PgAssistantStorage(AssistantStorage):
         schema: Optional[str] = "ai",
         db_url: Optional[str] = None,
         db_engine: Optional[Engine] = None,
+        engine_options: Optional[EngineOptions] = None,
     ):
         """
         This class provides assistant storage using a postgres table.
 
         The following order is used to determine the database connection:
             1. Use the db_engine if provided
-            2. Use the db_url
+            2. Use the db_url to get the shared engine for the url and engine_options
 
         :param table_name: The name of the table to store assistant runs.
         :param schema: The schema to store the table in.
         :param db_url: The database URL to connect to.
         :param db_engine: The database engine to use.
+        :param engine_options: Connection pool options of the engine used with db_url.
         """
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url, engine_options)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
@@ -1,3 +1,5 @@
+import asyncio
+from inspect import iscoroutinefunction
 from typing import Any, Dict, Optional, Callable, get_type_hints
 from pydantic import BaseModel, validate_call
 
@@ -154,3 +156,26 @@ class FunctionCall(BaseModel):
             logger.exception(e)
             self.error = str(e)
             return False
+
+    async def aexecute(self) -> bool:
+        """Runs the function call without blocking the event loop: coroutine functions are awaited,
+        other functions run in a thread.
+
+        @return: True if the function call was successful, False otherwise.
+        """
+        if self.function.entrypoint is None:
+            return False
+
+        entrypoint = getattr(self.function.entrypoint, "raw_function", self.function.entrypoint)
+        if not iscoroutinefunction(entrypoint):
+            return await asyncio.to_thread(self.execute)
+
+        logger.debug(f"Running: {self.get_call_str()}")
+        try:
+            self.result = await self.function.entrypoint(**(self.arguments or {}))
+            return True
+        except Exception as e:
+            logger.warning(f"Could not run function {self.get_call_str()}")
+            logger.exception(e)
+            self.error = str(e)
+            return False
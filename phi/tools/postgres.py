@@ -1,10 +1,16 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Any, List, Tuple
 
 try:
     import psycopg2
 except ImportError:
     raise ImportError("`psycopg2` not installed. Please install using `pip install psycopg2`.")
 
+try:
+    from sqlalchemy.engine import Engine, URL
+except ImportError:
+    raise ImportError("`sqlalchemy` not installed")
+
+from phi.db.engine import EngineOptions, get_engine
 from phi.tools import Toolkit
 from phi.utils.log import logger
 
@@ -20,18 +26,27 @@ class PostgresTools(Toolkit):
         password: Optional[str] = None,
         host: Optional[str] = None,
         port: Optional[int] = None,
+        db_url: Optional[str] = None,
+        db_engine: Optional[Engine] = None,
+        engine_options: Optional[EngineOptions] = None,
         run_queries: bool = True,
         inspect_queries: bool = False,
         summarize_tables: bool = True,
         export_tables: bool = False,
     ):
         super().__init__(name="postgres_tools")
+        # A connection provided by the caller is used as is, queries otherwise run on a pooled read only connection
         self._connection: Optional[psycopg2.extensions.connection] = connection
         self.db_name: Optional[str] = db_name
         self.user: Optional[str] = user
         self.password: Optional[str] = password
         self.host: Optional[str] = host
         self.port: Optional[int] = port
+        self.db_url: Optional[str] = db_url
+        self.engine_options: Optional[EngineOptions] = engine_options
+        self._db_engine: Optional[Engine] = db_engine
+        # Connection returned by `connection` when none is provided, detached from the pool of `db_engine`
+        self._detached_connection: Optional[Any] = None
 
         self.register(self.show_tables)
         self.register(self.describe_table)
@@ -44,30 +59,65 @@ class PostgresTools(Toolkit):
         if export_tables:
             self.register(self.export_table_to_path)
 
+    @property
+    def db_engine(self) -> Engine:
+        """
+        Returns the engine whose pool the queries run on, shared with the other components using the same database
+        unless a connection is provided.
+
+        :return Engine: SQLAlchemy engine
+        """
+        if self._db_engine is None:
+            db_url: Any = self.db_url
+            if db_url is None:
+                db_url = URL.create(
+                    "postgresql+psycopg2",
+                    username=self.user,
+                    password=self.password,
+                    host=self.host,
+                    port=self.port,
+                    database=self.db_name,
+                )
+            self._db_engine = get_engine(db_url, self.engine_options)
+        return self._db_engine
+
     @property
     def connection(self) -> psycopg2.extensions.connection:
         """
-        Returns the Postgres psycopg2 connection.
+        Returns the Postgres connection: the one provided, otherwise a read only connection checked out of the pool
+        of `db_engine` and detached from it, so it is kept open without holding one of the pooled connections.
+        Queries run by the tools do not use it, they check out a connection of their own.
 
         :return psycopg2.extensions.connection: psycopg2 connection
         """
-        if self._connection is None:
-            connection_kwargs: Dict[str, Any] = {}
-            if self.db_name is not None:
-                connection_kwargs["database"] = self.db_name
-            if self.user is not None:
-                connection_kwargs["user"] = self.user
-            if self.password is not None:
-                connection_kwargs["password"] = self.password
-            if self.host is not None:
-                connection_kwargs["host"] = self.host
-            if self.port is not None:
-                connection_kwargs["port"] = self.port
-
-            self._connection = psycopg2.connect(**connection_kwargs)
-            self._connection.set_session(readonly=True)
-
-        return self._connection
+        if self._connection is not None:
+            return self._connection
+
+        if self._detached_connection is None:
+            connection = self.db_engine.raw_connection()
+            connection.detach()
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+            cursor.close()
+            connection.commit()
+            self._detached_connection = connection
+        return self._detached_connection.dbapi_connection
+
+    def _execute(self, query: str) -> List[Tuple]:
+        if self._connection is not None:
+            cursor = self._connection.cursor()
+            cursor.execute(query)
+            return cursor.fetchall()
+
+        # Check out a connection for the query only, it is rolled back when returned to the pool
+        connection = self.db_engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SET TRANSACTION READ ONLY")
+            cursor.execute(query)
+            return cursor.fetchall()
+        finally:
+            connection.close()
 
     def show_tables(self) -> str:
         """Function to show tables in the database
@@ -211,9 +261,7 @@ class PostgresTools(Toolkit):
         try:
             logger.info(f"Running: {formatted_sql}")
 
-            cursor = self.connection.cursor()
-            cursor.execute(query)
-            query_result = cursor.fetchall()
+            query_result: Any = self._execute(query)
 
             result_output = "No output"
             if query_result is not None:
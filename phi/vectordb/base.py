@@ -1,12 +1,56 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from phi.document import Document
 
 
+def _bump_version_after(method: Callable) -> Callable:
+    """Wrap a write method to bump the version of the vector db once it returns or raises"""
+    if iscoroutinefunction(method):
+
+        @wraps(method)
+        async def async_wrapper(self: "VectorDb", *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                self.bump_version()
+
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(self: "VectorDb", *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.bump_version()
+
+    return wrapper
+
+
 class VectorDb(ABC):
     """Base class for managing Vector Databases"""
 
+    # Methods which change the documents in the collection. Their implementations bump `version` when they return.
+    write_methods = ("insert", "upsert", "delete_docs", "delete", "clear", "async_insert", "async_upsert")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in VectorDb.write_methods:
+            if name in cls.__dict__:
+                setattr(cls, name, _bump_version_after(cls.__dict__[name]))
+
+    @property
+    def version(self) -> int:
+        """Version of the collection, incremented after every write made through this instance.
+        Used to invalidate cached search results. Writes made by other processes are not tracked."""
+        return getattr(self, "_version", 0)
+
+    def bump_version(self) -> None:
+        self._version = self.version + 1
+
     @abstractmethod
     def create(self) -> None:
         raise NotImplementedError
@@ -15,6 +59,18 @@ class VectorDb(ABC):
     def doc_exists(self, document: Document) -> bool:
         raise NotImplementedError
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """Returns the content hashes of the documents which already exist in the vector db.
+        Vector dbs override this to check all documents in a single query.
+        """
+        return {document.content_hash for document in documents if self.doc_exists(document)}
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """Deletes the documents with the given content hashes.
+        Used to remove the chunks of files which were changed or removed since the last load.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def name_exists(self, name: str) -> bool:
         raise NotImplementedError
@@ -31,9 +87,97 @@ class VectorDb(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """Returns the documents closest to the query, restricted to those matching `filters` where supported.
+        The embeddings of the documents are only returned with `include_embeddings`."""
         raise NotImplementedError
 
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the search results of each query, in the order of the queries.
+
+        Vector dbs override this to embed the queries in one request and search them in one round trip,
+        by default the queries are searched concurrently.
+        """
+
+        def search(query: str) -> List[Document]:
+            return self.search(query=query, limit=limit, filters=filters, include_embeddings=include_embeddings)
+
+        if len(queries) <= 1:
+            return [search(query) for query in queries]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(queries), 8)) as executor:
+            return list(executor.map(search, queries))
+
+    def vector_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """Returns the documents closest to the query embedding"""
+        return self.search(query=query, limit=limit, filters=filters, include_embeddings=include_embeddings)
+
+    def keyword_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """Returns the documents best matching the query terms"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support keyword search")
+
+    def hybrid_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """Returns the documents ranked by a fusion of keyword and vector search"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support hybrid search")
+
+    async def async_create(self) -> None:
+        """Async version of `create`. Vector dbs with an async client override the async methods,
+        by default the sync method runs in a thread so that it does not block the event loop.
+        """
+        await asyncio.to_thread(self.create)
+
+    async def async_exists(self) -> bool:
+        return await asyncio.to_thread(self.exists)
+
+    async def async_insert(self, documents: List[Document]) -> None:
+        await asyncio.to_thread(self.insert, documents)
+
+    async def async_upsert(self, documents: List[Document]) -> None:
+        await asyncio.to_thread(self.upsert, documents)
+
+    async def async_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        return await asyncio.to_thread(
+            self.search, query=query, limit=limit, filters=filters, include_embeddings=include_embeddings
+        )
+
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
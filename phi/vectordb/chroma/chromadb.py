@@ -1,5 +1,7 @@
+import asyncio
+import json
 from hashlib import md5
-from typing import List, Optional
+from typing import List, Optional, Set, Dict, Any
 
 try:
     from chromadb import Client as ChromaDbClient
@@ -27,6 +29,7 @@ class ChromaDb(VectorDb):
         distance: Distance = Distance.cosine,
         path: str = "tmp/chromadb",
         persistent_client: bool = False,
+        batch_size: int = 1000,
         **kwargs,
     ):
         # Collection attributes
@@ -48,6 +51,9 @@ class ChromaDb(VectorDb):
         self.persistent_client: bool = persistent_client
         self.path: str = path
 
+        # Number of documents embedded and added per request, capped by the max batch size of the client
+        self.batch_size: int = batch_size
+
         # Chroma client kwargs
         self.kwargs = kwargs
 
@@ -72,9 +78,22 @@ class ChromaDb(VectorDb):
         if not self.exists():
             logger.debug(f"Creating collection: {self.collection}")
             self._collection = self.client.create_collection(
-                name=self.collection, metadata={"hnsw:space": self.distance.value}
+                name=self.collection, metadata={"hnsw:space": self._get_space()}
             )
 
+    def _get_space(self) -> str:
+        if self.distance == Distance.l2:
+            return "l2"
+        if self.distance == Distance.max_inner_product:
+            return "ip"
+        return "cosine"
+
+    def get_collection(self) -> Collection:
+        """Returns the collection, which may have been created by another ChromaDb instance or process."""
+        if self._collection is None:
+            self._collection = self.client.get_collection(name=self.collection)
+        return self._collection
+
     def doc_exists(self, document: Document) -> bool:
         """Check if a document exists in the collection.
         Args:
@@ -84,14 +103,40 @@ class ChromaDb(VectorDb):
         """
         if self.client:
             try:
-                collection: Collection = self.client.get_collection(name=self.collection)
-                collection_data: GetResult = collection.get(include=["documents"])
-                if collection_data.get("documents") != []:
-                    return True
+                cleaned_content = document.content.replace("\x00", "\ufffd")
+                doc_id = md5(cleaned_content.encode()).hexdigest()
+                collection_data: GetResult = self.get_collection().get(ids=[doc_id], include=[])
+                return len(collection_data.get("ids", [])) > 0
             except Exception as e:
-                logger.error(f"Document does not exist: {e}")
+                logger.error(f"Error checking if document exists: {e}")
         return False
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """Returns the content hashes of the documents which already exist in the collection.
+        Args:
+            documents (List[Document]): Documents to check.
+        Returns:
+            Set[str]: Content hashes of the documents which exist.
+        """
+        if self.client:
+            doc_ids = list({document.content_hash for document in documents})
+            if len(doc_ids) == 0:
+                return set()
+            try:
+                collection_data: GetResult = self.get_collection().get(ids=doc_ids, include=[])
+                return set(collection_data.get("ids", []))
+            except Exception as e:
+                logger.error(f"Error checking if documents exist: {e}")
+        return set()
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """Delete the documents with the given content hashes from the collection.
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete.
+        """
+        if self.client and len(content_hashes) > 0:
+            self.get_collection().delete(ids=list(content_hashes))
+
     def name_exists(self, name: str) -> bool:
         """Check if a document with a given name exists in the collection.
         Args:
@@ -100,12 +145,10 @@ class ChromaDb(VectorDb):
             bool: True if document exists, False otherwise."""
         if self.client:
             try:
-                collections: Collection = self.client.get_collection(name=self.collection)
-                for collection in collections:
-                    if name in collection:
-                        return True
+                collection_data: GetResult = self.get_collection().get(where={"name": name}, limit=1, include=[])
+                return len(collection_data.get("ids", [])) > 0
             except Exception as e:
-                logger.error(f"Document with given name does not exist: {e}")
+                logger.error(f"Error checking if document name exists: {e}")
         return False
 
     def insert(self, documents: List[Document]) -> None:
@@ -114,53 +157,91 @@ class ChromaDb(VectorDb):
             documents (List[Document]): List of documents to insert
         """
         logger.debug(f"Inserting {len(documents)} documents")
-        ids: List = []
-        docs: List = []
-        docs_embeddings: List = []
-
-        for document in documents:
-            document.embed(embedder=self.embedder)
-            cleaned_content = document.content.replace("\x00", "\ufffd")
-            doc_id = md5(cleaned_content.encode()).hexdigest()
-            docs_embeddings.append(document.embedding)
-            docs.append(cleaned_content)
-            ids.append(doc_id)
-
-        if len(docs) > 0 and self._collection is not None:
-            self._collection.add(ids=ids, embeddings=docs_embeddings, documents=docs)
-            logger.debug(f"Inserted {len(docs)} documents")
-        else:
-            logger.error("Collection does not exist")
+        self._write(documents, upsert=False)
+
+    def upsert_available(self) -> bool:
+        return True
 
     def upsert(self, documents: List[Document]) -> None:
         """Upsert documents into the collection.
         Args:
             documents (List[Document]): List of documents to upsert
         """
-        logger.debug(f"Inserting {len(documents)} documents")
-        ids: List = []
-        docs: List = []
-        docs_embeddings: List = []
-
-        for document in documents:
-            document.embed(embedder=self.embedder)
-            cleaned_content = document.content.replace("\x00", "\ufffd")
-            doc_id = md5(cleaned_content.encode()).hexdigest()
-            docs_embeddings.append(document.embedding)
-            docs.append(cleaned_content)
-            ids.append(doc_id)
-
-        if len(docs) > 0 and self._collection is not None:
-            self._collection.upsert(ids=ids, embeddings=docs_embeddings, documents=docs)
-            logger.debug(f"Inserted {len(docs)} documents")
-        else:
-            logger.error("Collection does not exist")
-
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+        logger.debug(f"Upserting {len(documents)} documents")
+        self._write(documents, upsert=True)
+
+    def _write(self, documents: List[Document], upsert: bool) -> None:
+        """Embed and write the documents in batches, each embedded with batched embedder requests"""
+        try:
+            collection = self.get_collection()
+        except Exception as e:
+            logger.error(f"Collection does not exist: {e}")
+            return
+
+        batch_size = min(self.batch_size, self.client.get_max_batch_size())
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i : i + batch_size]
+            Document.embed_batch(batch, embedder=self.embedder)
+            # Chroma rejects duplicate ids within a request, the last document with the same content wins
+            rows: Dict[str, Document] = {}
+            for document in batch:
+                cleaned_content = document.content.replace("\x00", "\ufffd")
+                rows[md5(cleaned_content.encode()).hexdigest()] = document
+
+            write = collection.upsert if upsert else collection.add
+            write(
+                ids=list(rows.keys()),
+                embeddings=[document.embedding for document in rows.values()],  # type: ignore
+                documents=[document.content.replace("\x00", "\ufffd") for document in rows.values()],
+                metadatas=[self._get_metadata(document) for document in rows.values()],  # type: ignore
+            )
+            logger.debug(f"{'Upserted' if upsert else 'Inserted'} {len(rows)} documents")
+
+    def _get_metadata(self, document: Document) -> Dict[str, Any]:
+        """Chroma metadata of a document. Scalar meta_data values are stored as keys, so `where` filters can use
+        them, and the complete meta_data is stored as JSON to be returned as is."""
+        metadata: Dict[str, Any] = {
+            key: value
+            for key, value in document.meta_data.items()
+            if isinstance(value, (str, int, float, bool)) and key not in ("meta_data", "usage")
+        }
+        metadata["meta_data"] = json.dumps(document.meta_data, default=str)
+        if document.name is not None:
+            metadata["name"] = document.name
+        if document.usage is not None:
+            metadata["usage"] = json.dumps(document.usage)
+        return metadata
+
+    def get_where(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the Chroma `where` filter for search filters, with the same format as the other vector dbs:
+            {"name": "manual", "page": {"$gte": 2, "$lt": 10}, "url": {"$in": ["https://a", "https://b"]}}
+        Plain values are compared for equality with the name or scalar meta_data values. Supported operators are
+        $eq, $ne, $in, $nin, $gt, $gte, $lt and $lte.
+        """
+        conditions: List[Dict[str, Any]] = []
+        for key, value in filters.items():
+            if isinstance(value, dict) and len(value) > 0 and all(op.startswith("$") for op in value):
+                conditions.extend({key: {op: operand}} for op, operand in value.items())
+            else:
+                conditions.append({key: value})
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
         """Search the collection for a query.
         Args:
             query (str): Query to search for.
             limit (int): Number of results to return.
+            filters (Optional[Dict[str, Any]]): Filters on the name and meta_data, see `get_where`.
+            include_embeddings (bool): Return the embedding of each document.
         Returns:
             List[Document]: List of search results.
         """
@@ -169,49 +250,115 @@ class ChromaDb(VectorDb):
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        if not self._collection:
-            self._collection = self.client.get_collection(name=self.collection)
+        result: QueryResult = self.get_collection().query(
+            query_embeddings=query_embedding,
+            n_results=limit,
+            where=self.get_where(filters) if filters else None,
+            include=self._get_include(include_embeddings),  # type: ignore
+        )
+        return self._build_search_results(result, 0)
+
+    async def async_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """Async version of `search`. The query is embedded with the embedder's async client, the in-process
+        Chroma client has no async API so the query itself runs in a thread."""
+        query_embedding = await self.embedder.async_get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
 
-        result: QueryResult = self._collection.query(
+        collection = await asyncio.to_thread(self.get_collection)
+        result: QueryResult = await asyncio.to_thread(
+            collection.query,
             query_embeddings=query_embedding,
             n_results=limit,
+            where=self.get_where(filters) if filters else None,
+            include=self._get_include(include_embeddings),  # type: ignore
         )
+        return self._build_search_results(result, 0)
 
-        # Build search results
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """Search the collection for multiple queries, embedding them in one request and querying them together.
+        Args:
+            queries (List[str]): Queries to search for.
+            limit (int): Number of results to return per query.
+            filters (Optional[Dict[str, Any]]): Filters on the name and meta_data applied to every query.
+            include_embeddings (bool): Return the embedding of each document.
+        Returns:
+            List[List[Document]]: Search results of each query, in the order of the queries.
+        """
+        if len(queries) == 0:
+            return []
+
+        query_embeddings, _ = self.embedder.get_embeddings_batch(queries)
+        if any(not query_embedding for query_embedding in query_embeddings):
+            logger.error(f"Error getting embeddings for Queries: {queries}")
+            return [[] for _ in queries]
+
+        result: QueryResult = self.get_collection().query(
+            query_embeddings=query_embeddings,
+            n_results=limit,
+            where=self.get_where(filters) if filters else None,
+            include=self._get_include(include_embeddings),  # type: ignore
+        )
+        return [self._build_search_results(result, i) for i in range(len(queries))]
+
+    def _get_include(self, include_embeddings: bool) -> List[str]:
+        # Only fetch the fields used to build the documents
+        return ["metadatas", "documents", "embeddings"] if include_embeddings else ["metadatas", "documents"]
+
+    def _build_search_results(self, result: QueryResult, query_index: int) -> List[Document]:
         search_results: List[Document] = []
 
-        ids = result.get("ids", [[]])[0]
-        distances = result.get("distances", [[]])[0]  # type: ignore
-        metadatas = result.get("metadatas", [[]])[0]  # type: ignore
-        documents = result.get("documents", [[]])[0]  # type: ignore
+        ids = result["ids"][query_index]
+        metadatas = (result.get("metadatas") or [[]])[query_index] or [None] * len(ids)
+        documents = (result.get("documents") or [[]])[query_index] or [""] * len(ids)
         embeddings = result.get("embeddings")
-        uris = result.get("uris")
-        data = result.get("data")
+        query_embeddings = embeddings[query_index] if embeddings is not None else None
 
         try:
-            # Use zip to iterate over multiple lists simultaneously
-            for id_, distance, metadata, document in zip(ids, distances, metadatas, documents):
-                search_results.append(
-                    Document(
-                        id=id_,
-                        distances=distance,
-                        metadatas=metadata,
-                        content=document,
-                        embeddings=embeddings,
-                        uris=uris,
-                        data=data,
-                    )
-                )
+            for i, (id_, metadata, document) in enumerate(zip(ids, metadatas, documents)):
+                search_result = self._get_document(id_, metadata, document)
+                if query_embeddings is not None:
+                    search_result.embedder = self.embedder
+                    search_result.embedding = list(query_embeddings[i])
+                search_results.append(search_result)
         except Exception as e:
             logger.error(f"Error building search results: {e}")
 
         return search_results
 
+    def _get_document(self, id_: str, metadata: Optional[Dict[str, Any]], content: str) -> Document:
+        metadata = dict(metadata or {})
+        name = metadata.pop("name", None)
+        usage = metadata.pop("usage", None)
+        meta_data = metadata.pop("meta_data", None)
+        return Document(
+            id=id_,
+            name=name,
+            # Documents written before the meta_data was stored as JSON only have the scalar keys, if any
+            meta_data=json.loads(meta_data) if meta_data is not None else metadata,
+            content=content,
+            usage=json.loads(usage) if usage is not None else None,
+        )
+
     def delete(self) -> None:
         """Delete the collection."""
         if self.exists():
             logger.debug(f"Deleting collection: {self.collection}")
             self.client.delete_collection(name=self.collection)
+            self._collection = None
 
     def exists(self) -> bool:
         """Check if the collection exists."""
@@ -226,8 +373,7 @@ class ChromaDb(VectorDb):
         """Get the count of documents in the collection."""
         if self.exists():
             try:
-                collection: Collection = self.client.get_collection(name=self.collection)
-                return collection.count()
+                return self.get_collection().count()
             except Exception as e:
                 logger.error(f"Error getting count: {e}")
         return 0
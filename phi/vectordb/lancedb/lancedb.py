@@ -1,5 +1,6 @@
 from hashlib import md5
-from typing import List, Optional
+from math import sqrt
+from typing import List, Optional, Set, Dict, Any
 import json
 
 try:
@@ -25,6 +26,9 @@ class LanceDb(VectorDb):
         uri: Optional[str] = "/tmp/lancedb",
         table_name: Optional[str] = "phi",
         nprobes: Optional[int] = 20,
+        refine_factor: Optional[int] = 10,
+        num_partitions: Optional[int] = None,
+        num_sub_vectors: Optional[int] = None,
         **kwargs,
     ):
         # Embedder for embedding the document contents
@@ -38,6 +42,14 @@ class LanceDb(VectorDb):
         self.uri = uri
         self.client = lancedb.connect(self.uri)
         self.nprobes = nprobes
+        # Searches of an IVF-PQ index re-rank limit * refine_factor candidates with the full vectors, as the
+        # compressed PQ distances alone miss many of the nearest neighbours. None to rank on PQ distances only.
+        self.refine_factor: Optional[int] = refine_factor
+
+        # IVF-PQ index built by optimize(). By default the table is split into sqrt(rows) partitions of at least
+        # 256 rows, and each vector into dimensions / 16 sub vectors (dimensions / 8 when not divisible by 16).
+        self.num_partitions: Optional[int] = num_partitions
+        self.num_sub_vectors: Optional[int] = num_sub_vectors
 
         if connection:
             if not isinstance(connection, lancedb.db.LanceTable):
@@ -48,7 +60,7 @@ class LanceDb(VectorDb):
             self.connection = connection
             self.table_name = self.connection.name
             self._vector_col = self.connection.schema.names[0]
-            self._id = self.tbl.schema.names[1]  # type: ignore
+            self._id = self.connection.schema.names[1]
 
         else:
             self.table_name = table_name
@@ -58,29 +70,39 @@ class LanceDb(VectorDb):
         self.kwargs = kwargs
 
     def create(self) -> lancedb.db.LanceTable:
-        return self._init_table()
+        if not self.exists():
+            self.connection = self._init_table()
+        return self.connection
 
     def _init_table(self) -> lancedb.db.LanceTable:
+        """Open the table, creating it if it does not exist"""
         self._id = "id"
         self._vector_col = "vector"
         schema = pa.schema(
             [
-                pa.field(
-                    self._vector_col,
-                    pa.list_(
-                        pa.float32(),
-                        len(self.embedder.get_embedding("test")),  # type: ignore
-                    ),
-                ),
+                pa.field(self._vector_col, pa.list_(pa.float32(), self.dimensions)),
                 pa.field(self._id, pa.string()),
                 pa.field("payload", pa.string()),
             ]
         )
 
-        logger.info(f"Creating table: {self.table_name}")
-        tbl = self.client.create_table(self.table_name, schema=schema, mode="overwrite")
+        logger.debug(f"Opening table: {self.table_name}")
+        tbl = self.client.create_table(self.table_name, schema=schema, exist_ok=True)
+        vector_type = tbl.schema.field(self._vector_col).type
+        if getattr(vector_type, "list_size", self.dimensions) != self.dimensions:
+            logger.warning(
+                f"Table {self.table_name} stores vectors of {vector_type.list_size} dimensions, "
+                f"the embedder returns {self.dimensions}"
+            )
         return tbl
 
+    def _get_metric(self) -> str:
+        if self.distance == Distance.l2:
+            return "L2"
+        if self.distance == Distance.max_inner_product:
+            return "dot"
+        return "cosine"
+
     def doc_exists(self, document: Document) -> bool:
         """
         Validating if the document exists or not
@@ -95,11 +117,75 @@ class LanceDb(VectorDb):
             return len(result) > 0
         return False
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, using a single filter per batch
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        existing: Set[str] = set()
+        if self.client:
+            doc_ids = list({document.content_hash for document in documents})
+            for i in range(0, len(doc_ids), 1000):
+                batch_ids = doc_ids[i : i + 1000]
+                id_list = ", ".join(f"'{doc_id}'" for doc_id in batch_ids)
+                result = (
+                    self.connection.search()
+                    .where(f"{self._id} IN ({id_list})")
+                    .select([self._id])
+                    .limit(len(batch_ids))
+                    .to_arrow()
+                )
+                existing.update(result[self._id].to_pylist())
+        return existing
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Deletes the rows with the given content hashes, using a single filter per batch
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        if self.client:
+            doc_ids = list(content_hashes)
+            for i in range(0, len(doc_ids), 1000):
+                id_list = ", ".join(f"'{doc_id}'" for doc_id in doc_ids[i : i + 1000])
+                self.connection.delete(f"{self._id} IN ({id_list})")
+
     def insert(self, documents: List[Document]) -> None:
         logger.debug(f"Inserting {len(documents)} documents")
-        data = []
+        data = self._get_data(documents)
+        if data.num_rows > 0:
+            self.connection.add(data)
+        logger.debug(f"Inserted {data.num_rows} documents")
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document]) -> None:
+        """
+        Upsert documents into the database, replacing the rows with the same id.
+
+        Args:
+            documents (List[Document]): List of documents to upsert
+        """
+        logger.debug(f"Upserting {len(documents)} documents")
+        data = self._get_data(documents)
+        if data.num_rows > 0:
+            (
+                self.connection.merge_insert(self._id)
+                .when_matched_update_all()
+                .when_not_matched_insert_all()
+                .execute(data)
+            )
+        logger.debug(f"Upserted {data.num_rows} documents")
+
+    def _get_data(self, documents: List[Document]) -> pa.Table:
+        """Embed the documents and build the arrow table of their rows, ids are unique within the table"""
+        Document.embed_batch(documents, embedder=self.embedder)
+        rows: Dict[str, Dict[str, Any]] = {}
         for document in documents:
-            document.embed(embedder=self.embedder)
             cleaned_content = document.content.replace("\x00", "\ufffd")
             doc_id = str(md5(cleaned_content.encode()).hexdigest())
             payload = {
@@ -108,57 +194,74 @@ class LanceDb(VectorDb):
                 "content": cleaned_content,
                 "usage": document.usage,
             }
-            data.append(
-                {
-                    "id": doc_id,
-                    "vector": document.embedding,
-                    "payload": json.dumps(payload),
-                }
-            )
-            logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
-
-        self.connection.add(data)
-        logger.debug(f"Upsert {len(data)} documents")
+            rows[doc_id] = {"vector": document.embedding, "payload": json.dumps(payload)}
 
-    def upsert(self, documents: List[Document]) -> None:
-        """
-        Upsert documents into the database.
+        return pa.table(
+            {
+                self._vector_col: pa.array(
+                    [row["vector"] for row in rows.values()], type=pa.list_(pa.float32(), self.dimensions)
+                ),
+                self._id: pa.array(list(rows.keys()), type=pa.string()),
+                "payload": pa.array([row["payload"] for row in rows.values()], type=pa.string()),
+            }
+        )
 
-        Args:
-            documents (List[Document]): List of documents to upsert
-        """
-        logger.debug("Redirecting the request to insert")
-        self.insert(documents)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        if filters is not None:
+            logger.warning("Filters are not supported by LanceDb, ignoring them")
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        results = (
+        # Only read the columns needed, as arrow columns
+        columns = ["payload", self._vector_col] if include_embeddings else ["payload"]
+        lance_query = (
             self.connection.search(
                 query=query_embedding,
                 vector_column_name=self._vector_col,
             )
+            .metric(self._get_metric())
+            .select(columns)
             .limit(limit)
             .nprobes(self.nprobes)
-            .to_pandas()
         )
+        if self.refine_factor is not None:
+            lance_query = lance_query.refine_factor(self.refine_factor)
+        results: pa.Table = lance_query.to_arrow()
 
         # Build search results
         search_results: List[Document] = []
 
         try:
-            for _, item in results.iterrows():
-                payload = json.loads(item["payload"])
+            payloads = results.column("payload").to_pylist()
+            embeddings = results.column(self._vector_col).to_pylist() if include_embeddings else None
+            for i, payload_json in enumerate(payloads):
+                payload = json.loads(payload_json)
+                if embeddings is None:
+                    search_results.append(
+                        Document(
+                            name=payload["name"],
+                            meta_data=payload["meta_data"],
+                            content=payload["content"],
+                            usage=payload["usage"],
+                        )
+                    )
+                    continue
                 search_results.append(
                     Document(
                         name=payload["name"],
                         meta_data=payload["meta_data"],
                         content=payload["content"],
                         embedder=self.embedder,
-                        embedding=item["vector"],
+                        embedding=embeddings[i],
                         usage=payload["usage"],
                     )
                 )
@@ -181,11 +284,34 @@ class LanceDb(VectorDb):
 
     def get_count(self) -> int:
         if self.exists():
-            return self.client.table(self.table_name).count_rows()
+            return self.connection.count_rows()
         return 0
 
     def optimize(self) -> None:
-        pass
+        """Build the IVF-PQ index of the table, replacing the previous one so that it covers all rows.
+        PQ training needs at least 256 rows, smaller tables are searched exhaustively.
+        Searches of the index re-rank their candidates with the full vectors, see `refine_factor`."""
+        num_rows = self.get_count()
+        if num_rows < 256:
+            logger.debug(f"Not indexing table {self.table_name} with {num_rows} rows")
+            return
+
+        # Each partition is trained on at least 256 rows
+        num_partitions = self.num_partitions or max(1, min(int(sqrt(num_rows)), num_rows // 256))
+        num_sub_vectors = self.num_sub_vectors
+        if num_sub_vectors is None:
+            num_sub_vectors = self.dimensions // 16 if self.dimensions % 16 == 0 else self.dimensions // 8
+        logger.debug(
+            f"Creating IVF-PQ index on {self.table_name} with {num_partitions} partitions "
+            f"and {num_sub_vectors} sub vectors"
+        )
+        self.connection.create_index(
+            metric=self._get_metric(),
+            num_partitions=num_partitions,
+            num_sub_vectors=max(1, num_sub_vectors),
+            vector_column_name=self._vector_col,
+            replace=True,
+        )
 
     def clear(self) -> bool:
         return False
@@ -0,0 +1 @@
+from phi.vectordb.numpy.numpydb import NumpyDb
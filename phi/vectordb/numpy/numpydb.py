@@ -0,0 +1,592 @@
+import json
+import shutil
+import sqlite3
+import threading
+from hashlib import md5
+from pathlib import Path
+from typing import Optional, List, Set, Dict, Any, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from phi.document import Document
+from phi.embedder import Embedder
+from phi.vectordb.base import VectorDb
+from phi.vectordb.distance import Distance
+from phi.utils.log import logger
+
+
+class NumpyDb(VectorDb):
+    """In-process vector db which keeps the embeddings in a float32 matrix memory-mapped from disk.
+
+    Search is exact: query embeddings are multiplied with the matrix block by block and the best rows of each
+    block are selected with `argpartition`. The name, meta_data, content and usage of each document are kept in
+    a sqlite file next to the matrix. Deleted rows are tombstoned and reclaimed by `compact`, which runs once
+    `compact_threshold` of the rows are tombstones.
+    """
+
+    def __init__(
+        self,
+        collection: str = "phi",
+        path: str = "tmp/numpydb",
+        embedder: Optional[Embedder] = None,
+        distance: Distance = Distance.cosine,
+        initial_capacity: int = 1024,
+        search_block_size: int = 65536,
+        compact_threshold: Optional[float] = 0.25,
+    ):
+        # Collection attributes, stored in the `path/collection` directory
+        self.collection: str = collection
+        self.path: Path = Path(path).joinpath(collection)
+
+        # Embedder for embedding the document contents
+        _embedder = embedder
+        if _embedder is None:
+            from phi.embedder.openai import OpenAIEmbedder
+
+            _embedder = OpenAIEmbedder()
+        self.embedder: Embedder = _embedder
+        self.dimensions: int = self.embedder.dimensions
+
+        # Distance metric
+        self.distance: Distance = distance
+
+        # Number of rows allocated when the collection is created, the matrix doubles in size when full
+        self.initial_capacity: int = max(1, initial_capacity)
+        # Number of rows multiplied with the queries at a time, bounds the memory used by a search
+        self.search_block_size: int = max(1, search_block_size)
+        # Fraction of tombstoned rows which triggers a compaction after a delete, None to only compact on optimize
+        self.compact_threshold: Optional[float] = compact_threshold
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._embeddings: Optional[np.memmap] = None
+        self._norms: Optional[np.memmap] = None
+        # Rows in use, including tombstones, and a mask of the rows holding a document
+        self._num_rows: int = 0
+        self._alive: np.ndarray = np.zeros(0, dtype=bool)
+        self._generation: int = 0
+        self._lock = threading.RLock()
+
+    @property
+    def db_file(self) -> Path:
+        return self.path.joinpath("payloads.db")
+
+    def _embeddings_file(self, generation: int) -> Path:
+        return self.path.joinpath(f"embeddings.{generation}.f32")
+
+    def _norms_file(self, generation: int) -> Path:
+        return self.path.joinpath(f"norms.{generation}.f32")
+
+    def create(self) -> None:
+        with self._lock:
+            if self.exists():
+                self._open()
+                return
+
+            logger.debug(f"Creating collection: {self.path}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, row INTEGER NOT NULL, name TEXT, "
+                "meta_data TEXT, content TEXT, usage TEXT, content_hash TEXT)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS documents_row ON documents (row)")
+            connection.execute("CREATE INDEX IF NOT EXISTS documents_content_hash ON documents (content_hash)")
+            connection.execute("CREATE INDEX IF NOT EXISTS documents_name ON documents (name)")
+            self._allocate(0, self.initial_capacity)
+            self._set_meta(
+                connection, dimensions=self.dimensions, generation=0, num_rows=0, capacity=self.initial_capacity
+            )
+            connection.commit()
+            self._connection = connection
+            self._open()
+
+    def _allocate(self, generation: int, capacity: int) -> None:
+        """Create zero filled embeddings and norms files for a generation"""
+        for file, row_size in ((self._embeddings_file(generation), self.dimensions), (self._norms_file(generation), 1)):
+            with open(file, "wb") as f:
+                f.truncate(capacity * row_size * np.dtype(np.float32).itemsize)
+
+    @staticmethod
+    def _set_meta(connection: sqlite3.Connection, **values: int) -> None:
+        connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in values.items()]
+        )
+
+    def _open(self) -> None:
+        """Open the sqlite file and memory-map the current generation of the matrix"""
+        if self._embeddings is not None:
+            return
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_file, check_same_thread=False)
+
+        meta = {key: int(value) for key, value in self._connection.execute("SELECT key, value FROM meta")}
+        if meta["dimensions"] != self.dimensions:
+            raise ValueError(
+                f"Collection {self.collection} has {meta['dimensions']} dimensions, the embedder has {self.dimensions}"
+            )
+        self._generation = meta["generation"]
+        self._num_rows = meta["num_rows"]
+        self._map(meta["capacity"])
+
+        self._alive = np.zeros(meta["capacity"], dtype=bool)
+        rows = [row for (row,) in self._connection.execute("SELECT row FROM documents")]
+        self._alive[np.asarray(rows, dtype=np.int64)] = True
+
+    def _map(self, capacity: int) -> None:
+        self._embeddings = np.memmap(
+            self._embeddings_file(self._generation), dtype=np.float32, mode="r+", shape=(capacity, self.dimensions)
+        )
+        self._norms = np.memmap(self._norms_file(self._generation), dtype=np.float32, mode="r+", shape=(capacity,))
+
+    def _unmap(self) -> None:
+        if self._embeddings is not None:
+            self._embeddings.flush()
+        if self._norms is not None:
+            self._norms.flush()
+        self._embeddings = None
+        self._norms = None
+
+    def _ensure_capacity(self, num_rows: int) -> None:
+        """Grow the matrix files, doubling their capacity, until they hold `num_rows` rows"""
+        assert self._embeddings is not None and self._connection is not None
+        capacity = self._embeddings.shape[0]
+        if num_rows <= capacity:
+            return
+
+        new_capacity = capacity
+        while new_capacity < num_rows:
+            new_capacity *= 2
+        logger.debug(f"Growing collection {self.collection} from {capacity} to {new_capacity} rows")
+        self._unmap()
+        itemsize = np.dtype(np.float32).itemsize
+        for file, row_size in (
+            (self._embeddings_file(self._generation), self.dimensions),
+            (self._norms_file(self._generation), 1),
+        ):
+            with open(file, "r+b") as f:
+                f.truncate(new_capacity * row_size * itemsize)
+        self._map(new_capacity)
+        self._alive = np.concatenate([self._alive, np.zeros(new_capacity - capacity, dtype=bool)])
+        self._set_meta(self._connection, capacity=new_capacity)
+
+    def doc_exists(self, document: Document) -> bool:
+        """
+        Validating if the document exists or not
+
+        Args:
+            document (Document): Document to validate
+        """
+        return len(self.docs_exist([document])) > 0
+
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, using a single query per batch
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        if not self.exists():
+            return set()
+        content_hashes = list({document.content_hash for document in documents})
+        return {row[0] for row in self._select_in("SELECT content_hash FROM documents", "content_hash", content_hashes)}
+
+    def name_exists(self, name: str) -> bool:
+        return self._exists_where("name", name)
+
+    def id_exists(self, id: str) -> bool:
+        return self._exists_where("id", id)
+
+    def _exists_where(self, column: str, value: str) -> bool:
+        if not self.exists():
+            return False
+        with self._lock:
+            self._open()
+            assert self._connection is not None
+            query = f"SELECT 1 FROM documents WHERE {column} = ? LIMIT 1"
+            return self._connection.execute(query, (value,)).fetchone() is not None
+
+    def _select_in(self, query: str, column: str, values: List[Any]) -> List[Tuple]:
+        rows: List[Tuple] = []
+        with self._lock:
+            self._open()
+            assert self._connection is not None
+            for i in range(0, len(values), 500):
+                batch = values[i : i + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows.extend(self._connection.execute(f"{query} WHERE {column} IN ({placeholders})", batch).fetchall())
+        return rows
+
+    def insert(self, documents: List[Document]) -> None:
+        """
+        Insert documents into the collection. Documents with the id (or content hash) of an existing document
+        replace it, so insert and upsert behave the same.
+
+        Args:
+            documents (List[Document]): List of documents to insert
+        """
+        self._write(documents)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document]) -> None:
+        """
+        Upsert documents into the collection, overwriting the rows of existing ids in place
+
+        Args:
+            documents (List[Document]): List of documents to upsert
+        """
+        self._write(documents)
+
+    def _write(self, documents: List[Document]) -> None:
+        Document.embed_batch(documents, embedder=self.embedder)
+
+        # Keep the last document for each id
+        records: Dict[str, Tuple[Document, str, str]] = {}
+        for document in documents:
+            if not document.embedding:
+                logger.warning(f"Skipping document without embedding: {document.name}")
+                continue
+            cleaned_content = document.content.replace("\x00", "\ufffd")
+            content_hash = md5(cleaned_content.encode()).hexdigest()
+            records[document.id or content_hash] = (document, cleaned_content, content_hash)
+        if len(records) == 0:
+            return
+
+        with self._lock:
+            self.create()
+            assert self._connection is not None
+
+            # Existing ids are overwritten in place, new ids are appended
+            ids = list(records.keys())
+            existing = dict(self._select_in("SELECT id, row FROM documents", "id", ids))
+            rows: List[int] = []
+            num_rows = self._num_rows
+            for _id in ids:
+                if _id in existing:
+                    rows.append(existing[_id])
+                else:
+                    rows.append(num_rows)
+                    num_rows += 1
+            self._ensure_capacity(num_rows)
+            assert self._embeddings is not None and self._norms is not None
+
+            matrix = np.asarray([record[0].embedding for record in records.values()], dtype=np.float32)
+            if matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Expected embeddings with {self.dimensions} dimensions, got {matrix.shape[1]}")
+            row_index = np.asarray(rows, dtype=np.int64)
+            self._embeddings[row_index] = matrix
+            self._norms[row_index] = np.linalg.norm(matrix, axis=1)
+            # Flush the matrix before committing the payloads, so every committed row has its embedding on disk
+            self._embeddings.flush()
+            self._norms.flush()
+
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO documents (id, row, name, meta_data, content, usage, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        _id,
+                        row,
+                        document.name,
+                        json.dumps(document.meta_data),
+                        cleaned_content,
+                        json.dumps(document.usage) if document.usage is not None else None,
+                        content_hash,
+                    )
+                    for (_id, (document, cleaned_content, content_hash)), row in zip(records.items(), rows)
+                ],
+            )
+            self._set_meta(self._connection, num_rows=num_rows)
+            self._connection.commit()
+            self._num_rows = num_rows
+            self._alive[row_index] = True
+        logger.debug(f"Upserted {len(records)} documents")
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Tombstones the rows with the given content hashes, compacting the matrix once
+        `compact_threshold` of its rows are tombstones
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        if not self.exists():
+            return
+        with self._lock:
+            hashes = list(content_hashes)
+            rows = [row for (row,) in self._select_in("SELECT row FROM documents", "content_hash", hashes)]
+            if len(rows) == 0:
+                return
+            assert self._connection is not None
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i : i + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                self._connection.execute(f"DELETE FROM documents WHERE content_hash IN ({placeholders})", batch)
+            self._connection.commit()
+            self._alive[np.asarray(rows, dtype=np.int64)] = False
+            logger.debug(f"Deleted {len(rows)} documents")
+
+            num_tombstones = self._num_rows - int(self._alive.sum())
+            if self.compact_threshold is not None and num_tombstones >= self.compact_threshold * self._num_rows:
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the matrix without its tombstoned rows, into the files of a new generation"""
+        if not self.exists():
+            return
+        with self._lock:
+            self._open()
+            assert self._connection is not None and self._embeddings is not None and self._norms is not None
+
+            ids_and_rows = self._connection.execute("SELECT id, row FROM documents ORDER BY row").fetchall()
+            old_rows = np.asarray([row for _, row in ids_and_rows], dtype=np.int64)
+            num_rows = len(old_rows)
+            capacity = max(self.initial_capacity, num_rows)
+            generation = self._generation + 1
+            logger.debug(f"Compacting collection {self.collection} from {self._num_rows} to {num_rows} rows")
+
+            self._allocate(generation, capacity)
+            embeddings = np.memmap(
+                self._embeddings_file(generation), dtype=np.float32, mode="r+", shape=(capacity, self.dimensions)
+            )
+            norms = np.memmap(self._norms_file(generation), dtype=np.float32, mode="r+", shape=(capacity,))
+            for start in range(0, num_rows, self.search_block_size):
+                end = min(start + self.search_block_size, num_rows)
+                embeddings[start:end] = self._embeddings[old_rows[start:end]]
+                norms[start:end] = self._norms[old_rows[start:end]]
+            embeddings.flush()
+            norms.flush()
+            del embeddings, norms
+
+            # Switching the generation and the rows in one transaction keeps the collection consistent on failure
+            self._connection.executemany(
+                "UPDATE documents SET row = ? WHERE id = ?", [(i, _id) for i, (_id, _) in enumerate(ids_and_rows)]
+            )
+            self._set_meta(self._connection, generation=generation, num_rows=num_rows, capacity=capacity)
+            self._connection.commit()
+
+            old_generation = self._generation
+            self._unmap()
+            self._embeddings_file(old_generation).unlink(missing_ok=True)
+            self._norms_file(old_generation).unlink(missing_ok=True)
+            self._generation = generation
+            self._num_rows = num_rows
+            self._map(capacity)
+            self._alive = np.zeros(capacity, dtype=bool)
+            self._alive[:num_rows] = True
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        return self.search_batch([query], limit, filters, include_embeddings)[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Search for multiple queries, embedding them in batches and scoring them against the matrix together
+
+        Args:
+            queries (List[str]): The search queries
+            limit (int): The maximum number of documents to return per query
+            filters (Optional[Dict[str, Any]]): Filters on id, name, content_hash and meta_data keys
+            include_embeddings (bool): Return the embedding of each document
+
+        Returns:
+            List[List[Document]]: The documents for each query, in the order of the queries
+        """
+        if len(queries) == 0:
+            return []
+        query_embeddings, _ = self.embedder.get_embeddings_batch(queries)
+        if any(not embedding for embedding in query_embeddings):
+            logger.error(f"Error getting embeddings for Queries: {queries}")
+            return [[] for _ in queries]
+        return self.search_embeddings(query_embeddings, limit, filters, include_embeddings)
+
+    def search_embeddings(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the exact nearest documents for each query embedding"""
+        if not self.exists() or limit <= 0:
+            return [[] for _ in query_embeddings]
+
+        with self._lock:
+            self._open()
+            mask = self._get_filter_mask(filters) if filters is not None else None
+            results = self._top_k(np.asarray(query_embeddings, dtype=np.float32), limit, mask)
+            payloads = self._get_payloads({row for result in results for row, _ in result})
+
+            assert self._embeddings is not None
+            search_results: List[List[Document]] = []
+            for result in results:
+                documents: List[Document] = []
+                for row, _ in result:
+                    payload = payloads[row]
+                    document = Document(
+                        name=payload[0],
+                        meta_data=json.loads(payload[1]) if payload[1] else {},
+                        content=payload[2],
+                        usage=json.loads(payload[3]) if payload[3] else None,
+                    )
+                    if include_embeddings:
+                        document.embedder = self.embedder
+                        document.embedding = self._embeddings[row].tolist()
+                    documents.append(document)
+                search_results.append(documents)
+        return search_results
+
+    def _top_k(self, queries: np.ndarray, limit: int, mask: Optional[np.ndarray]) -> List[List[Tuple[int, float]]]:
+        """Returns the (row, score) pairs of the best rows for each query, best first"""
+        assert self._embeddings is not None and self._norms is not None
+        num_queries = queries.shape[0]
+        if self.distance == Distance.cosine:
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        best_rows = np.empty((num_queries, 0), dtype=np.int64)
+        best_scores = np.empty((num_queries, 0), dtype=np.float32)
+        for start in range(0, self._num_rows, self.search_block_size):
+            end = min(start + self.search_block_size, self._num_rows)
+            valid = self._alive[start:end] if mask is None else self._alive[start:end] & mask[start:end]
+            if not valid.any():
+                continue
+
+            # Higher scores are better: cosine similarity, inner product, or -|m - q|^2 + |q|^2 for l2
+            scores = queries @ self._embeddings[start:end].T
+            if self.distance == Distance.cosine:
+                scores /= np.maximum(self._norms[start:end], 1e-12)
+            elif self.distance == Distance.l2:
+                scores = 2 * scores - np.square(self._norms[start:end])
+            scores[:, ~valid] = -np.inf
+
+            k = min(limit, end - start)
+            block_rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_rows = np.concatenate([best_rows, block_rows + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, block_rows, axis=1)], axis=1)
+            if best_rows.shape[1] > limit:
+                keep = np.argpartition(-best_scores, limit - 1, axis=1)[:, :limit]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(int(row), float(score)) for row, score in zip(rows, scores) if score != -np.inf]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+
+    def _get_payloads(self, rows: Set[int]) -> Dict[int, Tuple]:
+        results = self._select_in("SELECT row, name, meta_data, content, usage FROM documents", "row", list(rows))
+        return {result[0]: result[1:] for result in results}
+
+    def _get_filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Returns a mask of the rows matching the filters, which use the same syntax as PgVector2:
+        keys id, name and content_hash are compared for equality, other keys filter on meta_data,
+        either by equality or with a dict of $eq, $ne, $in, $nin, $gt, $gte, $lt and $lte operators.
+        """
+        assert self._connection is not None
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, value in filters.items():
+            if key in ("id", "name", "content_hash"):
+                expression, expression_params = key, []
+            else:
+                expression, expression_params = "json_extract(meta_data, ?)", [f'$."{key}"']
+
+            operators = {"$eq": value}
+            if isinstance(value, dict) and len(value) > 0 and all(op.startswith("$") for op in value):
+                operators = value
+            for op, operand in operators.items():
+                if isinstance(operand, (dict, list)) and op not in ("$in", "$nin"):
+                    operand = json.dumps(operand, separators=(",", ":"))
+                if op in ("$in", "$nin"):
+                    if not isinstance(operand, (list, tuple, set)):
+                        raise ValueError(f"Filter operator {op} expects a list, got: {operand}")
+                    values = list(operand)
+                    placeholders = ", ".join("?" for _ in values)
+                    if op == "$in":
+                        clauses.append(f"{expression} IN ({placeholders})")
+                        params.extend(expression_params + values)
+                    else:
+                        clauses.append(f"({expression} IS NULL OR {expression} NOT IN ({placeholders}))")
+                        params.extend(expression_params + expression_params + values)
+                    continue
+
+                sql_operators = {"$eq": "IS", "$ne": "IS NOT", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+                if op not in sql_operators:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                clauses.append(f"{expression} {sql_operators[op]} ?")
+                params.extend(expression_params + [operand])
+
+        query = "SELECT row FROM documents"
+        if len(clauses) > 0:
+            query += " WHERE " + " AND ".join(clauses)
+        mask = np.zeros(self._alive.shape[0], dtype=bool)
+        rows = [row for (row,) in self._connection.execute(query, params)]
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def delete(self) -> None:
+        with self._lock:
+            self.close()
+            if self.path.exists():
+                logger.debug(f"Deleting collection: {self.path}")
+                shutil.rmtree(self.path)
+
+    def exists(self) -> bool:
+        return self.db_file.exists()
+
+    def get_count(self) -> int:
+        if not self.exists():
+            return 0
+        with self._lock:
+            self._open()
+            assert self._connection is not None
+            return self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def optimize(self) -> None:
+        """Compact the matrix if it has tombstoned rows"""
+        if not self.exists():
+            return
+        with self._lock:
+            self._open()
+            if self._num_rows > int(self._alive.sum()):
+                self.compact()
+
+    def clear(self) -> bool:
+        if not self.exists():
+            return True
+        with self._lock:
+            self._open()
+            assert self._connection is not None
+            self._connection.execute("DELETE FROM documents")
+            self._connection.commit()
+            self._alive[:] = False
+            self.compact()
+        return True
+
+    def close(self) -> None:
+        """Unmap the matrix and close the sqlite file, they are reopened on the next use"""
+        with self._lock:
+            self._unmap()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,4 +1,5 @@
 from phi.vectordb.distance import Distance
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.vectordb.pgvector.storage import VectorStorage
 from phi.vectordb.pgvector.pgvector import PgVector
 from phi.vectordb.pgvector.pgvector2 import PgVector2
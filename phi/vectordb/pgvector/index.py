@@ -7,7 +7,15 @@ class Ivfflat(BaseModel):
     name: Optional[str] = None
     lists: int = 100
     probes: int = 10
+    # Calculate the lists from the number of rows when the index is built
     dynamic_lists: bool = True
+    # Set the probes to the square root of the lists calculated when the index is built
+    dynamic_probes: bool = True
+    # Rebuild the index when the table grew by more than this fraction of its rows at the last build,
+    # as the lists are trained on the rows present when the index is built. None disables rebuilds on growth.
+    rebuild_threshold: Optional[float] = 0.5
+    # Build without blocking writes to the table
+    concurrently: bool = True
     configuration: Dict[str, Any] = {
         "maintenance_work_mem": "2GB",
     }
@@ -18,6 +26,10 @@ class HNSW(BaseModel):
     m: int = 16
     ef_search: int = 5
     ef_construction: int = 200
+    # HNSW graphs are updated on every insert, so they are not rebuilt on growth by default
+    rebuild_threshold: Optional[float] = None
+    # Build without blocking writes to the table
+    concurrently: bool = True
     configuration: Dict[str, Any] = {
         "maintenance_work_mem": "2GB",
     }
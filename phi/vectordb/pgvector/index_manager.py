@@ -0,0 +1,270 @@
+import json
+from datetime import datetime, timezone
+from math import sqrt
+from time import perf_counter
+from typing import Optional, Dict, Any, List, Union, TYPE_CHECKING
+
+try:
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.sql.expression import text
+except ImportError:
+    raise ImportError("`sqlalchemy` not installed")
+
+from phi.vectordb.distance import Distance
+from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.vectordb.pgvector.storage import VectorStorage
+from phi.utils.log import logger
+
+if TYPE_CHECKING:
+    from phi.vectordb.pgvector.pgvector2 import PgVector2
+
+
+class PgVectorIndexManager:
+    """Builds and maintains the vector index of a PgVector2 collection.
+
+    The number of rows, lists and probes at the last build are stored as JSON in the comment of the index, so that
+    any process, e.g. a scheduled `phi vectordb optimize`, can tell when the index is due for a rebuild. Rebuilds
+    create a new index next to the current one and swap them by name, with CONCURRENTLY unless disabled on the index,
+    so searches and writes continue while the index is built.
+    """
+
+    def __init__(self, vector_db: "PgVector2"):
+        self.vector_db: "PgVector2" = vector_db
+
+    @property
+    def index(self) -> Union[Ivfflat, HNSW]:
+        if self.vector_db.index is None:
+            raise ValueError("The collection has no index")
+        return self.vector_db.index
+
+    def get_index_name(self) -> str:
+        if self.index.name is None:
+            _type = "ivfflat" if isinstance(self.index, Ivfflat) else "hnsw"
+            self.index.name = f"{self.vector_db.collection}_{_type}_index"
+        return self.index.name
+
+    def _qualify(self, name: str) -> str:
+        return f"{self.vector_db.schema}.{name}" if self.vector_db.schema is not None else name
+
+    def get_operator_class(self) -> str:
+        """Operator class matching the storage of the embedding column and the distance metric"""
+        operator_class = "vector_cosine_ops"
+        if self.vector_db.distance == Distance.l2:
+            operator_class = "vector_l2_ops"
+        if self.vector_db.distance == Distance.max_inner_product:
+            operator_class = "vector_ip_ops"
+        if self.vector_db.storage == VectorStorage.halfvec:
+            operator_class = operator_class.replace("vector_", "halfvec_")
+        elif self.vector_db.storage == VectorStorage.binary:
+            operator_class = "bit_hamming_ops"
+        return operator_class
+
+    def get_lists(self, num_rows: int) -> int:
+        if not isinstance(self.index, Ivfflat) or not self.index.dynamic_lists:
+            return self.index.lists
+        # pgvector recommends rows / 1000 lists up to 1M rows and sqrt(rows) above
+        if num_rows <= 1000000:
+            return max(1, num_rows // 1000)
+        return int(sqrt(num_rows))
+
+    def get_probes(self, lists: int) -> int:
+        if not isinstance(self.index, Ivfflat) or not self.index.dynamic_probes:
+            return self.index.probes
+        return max(1, round(sqrt(lists)))
+
+    def index_exists(self, name: Optional[str] = None) -> bool:
+        with self.vector_db.db_engine.connect() as conn:
+            return (
+                conn.execute(
+                    text("SELECT to_regclass(:name) IS NOT NULL"),
+                    {"name": self._qualify(name or self.get_index_name())},
+                ).scalar()
+                is True
+            )
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """Returns the state recorded at the last build of the index, None if the index or its state do not exist"""
+        with self.vector_db.db_engine.connect() as conn:
+            comment = conn.execute(
+                text("SELECT obj_description(to_regclass(:name), 'pg_class')"),
+                {"name": self._qualify(self.get_index_name())},
+            ).scalar()
+        if comment is None:
+            return None
+        try:
+            return json.loads(comment)
+        except ValueError:
+            return None
+
+    def load_search_parameters(self) -> None:
+        """Use the probes recorded at the last build of an ivfflat index for searches"""
+        if not isinstance(self.index, Ivfflat) or not self.index.dynamic_probes:
+            return
+        state = self.get_state()
+        if state is not None and state.get("probes") is not None:
+            self.index.probes = int(state["probes"])
+
+    def get_index_lists(self) -> Optional[int]:
+        """Returns the lists of the existing ivfflat index"""
+        with self.vector_db.db_engine.connect() as conn:
+            options = conn.execute(
+                text("SELECT reloptions FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": self._qualify(self.get_index_name())},
+            ).scalar()
+        for option in options or []:
+            key, _, value = option.partition("=")
+            if key == "lists":
+                return int(value)
+        return None
+
+    def needs_rebuild(self, num_rows: int, state: Optional[Dict[str, Any]]) -> bool:
+        if state is None:
+            # Index built before its state was recorded, rebuild an ivfflat index whose lists no longer fit the table
+            if isinstance(self.index, Ivfflat) and self.index.dynamic_lists:
+                return self.get_index_lists() != self.get_lists(num_rows)
+            return False
+        if self.index.rebuild_threshold is None:
+            return False
+        rows_at_build = int(state.get("rows", 0))
+        return num_rows > rows_at_build * (1 + self.index.rebuild_threshold)
+
+    def maintain(self, force: bool = False) -> Dict[str, Any]:
+        """Create the index if it does not exist and rebuild it when the table outgrew it, or when forced.
+
+        Returns a report of the action taken, the number of rows and the index parameters.
+        """
+        if self.vector_db.index is None:
+            return {"action": None}
+
+        num_rows = self.vector_db.get_count()
+        exists = self.index_exists()
+        state = self.get_state() if exists else None
+        report: Dict[str, Any] = {
+            "index": self.get_index_name(),
+            "type": self.index.__class__.__name__,
+            "rows": num_rows,
+            "rows_at_last_build": state.get("rows") if state is not None else None,
+        }
+
+        if not exists:
+            report.update(self.build(num_rows, rebuild=False))
+        elif force or self.needs_rebuild(num_rows, state):
+            report.update(self.build(num_rows, rebuild=True))
+        else:
+            report["action"] = "none"
+            self.load_search_parameters()
+        logger.debug(f"Index maintenance: {report}")
+        return report
+
+    def build(self, num_rows: int, rebuild: bool) -> Dict[str, Any]:
+        name = self.get_index_name()
+        # Rebuilds create the new index next to the current one and swap them once it is ready
+        build_name = f"{name}_rebuild" if rebuild else name
+        state: Dict[str, Any] = {"rows": num_rows, "built_at": datetime.now(timezone.utc).isoformat()}
+
+        if isinstance(self.index, Ivfflat):
+            lists = self.get_lists(num_rows)
+            state["lists"] = lists
+            state["probes"] = self.get_probes(lists)
+            using = f"USING ivfflat (embedding {self.get_operator_class()}) WITH (lists = {lists})"
+        else:
+            state["m"] = self.index.m
+            state["ef_construction"] = self.index.ef_construction
+            using = (
+                f"USING hnsw (embedding {self.get_operator_class()}) "
+                f"WITH (m = {self.index.m}, ef_construction = {self.index.ef_construction})"
+            )
+        concurrently = "CONCURRENTLY " if self.index.concurrently else ""
+
+        start = perf_counter()
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with self.vector_db.db_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            settings = self.apply_configuration(conn)
+            try:
+                if rebuild:
+                    # Drop the invalid index left behind by an interrupted concurrent build
+                    conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {self._qualify(build_name)}"))
+                logger.info(f"{'Rebuilding' if rebuild else 'Creating'} index {name}: {state}")
+                conn.execute(
+                    text(f"CREATE INDEX {concurrently}IF NOT EXISTS {build_name} ON {self.vector_db.table} {using}")
+                )
+                # COMMENT does not take bind parameters, the state only contains numbers and a timestamp
+                comment = json.dumps(state).replace("'", "''")
+                conn.execute(text(f"COMMENT ON INDEX {self._qualify(build_name)} IS '{comment}'"))
+            finally:
+                self.reset_configuration(conn, settings)
+
+        if rebuild:
+            self.swap(name, build_name, concurrently)
+
+        if isinstance(self.index, Ivfflat) and self.index.dynamic_probes:
+            self.index.probes = state["probes"]
+
+        return {
+            "action": "rebuilt" if rebuild else "created",
+            "build_time": round(perf_counter() - start, 4),
+            "settings": settings,
+            **{k: v for k, v in state.items() if k not in ("rows", "built_at")},
+        }
+
+    def swap(self, name: str, build_name: str, concurrently: str) -> None:
+        """Replace the index with the rebuilt one. Renames only lock the indexes, the old index is then dropped."""
+        old_name = f"{name}_old"
+        with self.vector_db.Session() as sess, sess.begin():
+            sess.execute(text(f"ALTER INDEX {self._qualify(name)} RENAME TO {old_name}"))
+            sess.execute(text(f"ALTER INDEX {self._qualify(build_name)} RENAME TO {name}"))
+        with self.vector_db.db_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {self._qualify(old_name)}"))
+
+    def apply_configuration(self, conn: Connection) -> Dict[str, Any]:
+        """Set the index configuration on the connection and check each setting took effect.
+
+        Returns the value of each setting in the session, settings which could not be set are logged and skipped.
+        """
+        settings: Dict[str, Any] = {}
+        for key, value in self.index.configuration.items():
+            try:
+                conn.execute(text(f"SET {key} = '{value}'"))
+            except Exception as e:
+                logger.warning(f"Could not set {key} = {value}: {e}")
+                continue
+            # A setting which is not reported as set by the session was lost, e.g. behind a transaction pooler
+            row = conn.execute(
+                text("SELECT current_setting(:key), (SELECT source FROM pg_settings WHERE name = :key)"),
+                {"key": key},
+            ).one()
+            if row[1] != "session":
+                logger.warning(f"Setting {key} = {value} did not take effect, current value: {row[0]}")
+            settings[key] = row[0]
+        return settings
+
+    def reset_configuration(self, conn: Connection, settings: Dict[str, Any]) -> None:
+        # The connection returns to a shared pool, do not leak the settings to other sessions
+        for key in settings:
+            conn.execute(text(f"RESET {key}"))
+
+    def get_build_progress(self) -> List[Dict[str, Any]]:
+        """Returns the progress of the index builds running on the table, from pg_stat_progress_create_index"""
+        with self.vector_db.db_engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT p.pid, p.command, p.phase, i.relname AS index_name, p.blocks_done, p.blocks_total, "
+                    "p.tuples_done, p.tuples_total "
+                    "FROM pg_stat_progress_create_index p LEFT JOIN pg_class i ON i.oid = p.index_relid "
+                    "WHERE p.relid = to_regclass(:table)"
+                ),
+                {"table": str(self.vector_db.table)},
+            ).all()
+
+        progress: List[Dict[str, Any]] = []
+        for row in rows:
+            build_progress = dict(row._mapping)
+            # pgvector reports the tuples loaded into the index, other phases report the blocks scanned
+            if row.tuples_total:
+                build_progress["percent"] = round(100 * row.tuples_done / row.tuples_total, 2)
+            elif row.blocks_total:
+                build_progress["percent"] = round(100 * row.blocks_done / row.blocks_total, 2)
+            else:
+                build_progress["percent"] = None
+            progress.append(build_progress)
+        return progress
@@ -1,13 +1,13 @@
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Set, Dict, Any
 from hashlib import md5
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.sql.expression import text, func, select, any_, bindparam
     from sqlalchemy.types import DateTime, String
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
@@ -22,6 +22,7 @@ from phi.embedder import Embedder
 from phi.vectordb.base import VectorDb
 from phi.vectordb.distance import Distance
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.db.engine import EngineOptions, get_engine
 from phi.utils.log import logger
 
 
@@ -32,13 +33,14 @@ class PgVector(VectorDb):
         schema: Optional[str] = "ai",
         db_url: Optional[str] = None,
         db_engine: Optional[Engine] = None,
+        engine_options: Optional[EngineOptions] = None,
         embedder: Optional[Embedder] = None,
         distance: Distance = Distance.cosine,
         index: Optional[Union[Ivfflat, HNSW]] = HNSW(),
     ):
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url, engine_options)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
@@ -123,6 +125,44 @@ class PgVector(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, using a single query
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        content_hashes = list({document.content_hash for document in documents})
+        if len(content_hashes) == 0:
+            return set()
+
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = select(self.table.c.content_hash).where(
+                    self.table.c.content_hash == any_(bindparam("content_hashes", type_=postgresql.ARRAY(String)))
+                )
+                result = sess.execute(stmt, {"content_hashes": content_hashes}).scalars().all()
+                return set(result)
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Delete the rows with the given content hashes, using a single statement
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        from sqlalchemy import delete
+
+        if len(content_hashes) == 0:
+            return
+
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = delete(self.table).where(
+                    self.table.c.content_hash == any_(bindparam("content_hashes", type_=postgresql.ARRAY(String)))
+                )
+                sess.execute(stmt, {"content_hashes": list(content_hashes)})
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -137,10 +177,10 @@ class PgVector(VectorDb):
                 return result is not None
 
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
+        Document.embed_batch(documents, embedder=self.embedder)
         with self.Session() as sess:
             counter = 0
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 stmt = postgresql.insert(self.table).values(
                     name=document.name,
@@ -172,10 +212,10 @@ class PgVector(VectorDb):
         Args:
             documents (List[Document]): List of documents to upsert
         """
+        Document.embed_batch(documents, embedder=self.embedder)
         with self.Session() as sess:
             with sess.begin():
                 for document in documents:
-                    document.embed(embedder=self.embedder)
                     cleaned_content = document.content.replace("\x00", "\ufffd")
                     stmt = postgresql.insert(self.table).values(
                         name=document.name,
@@ -197,7 +237,16 @@ class PgVector(VectorDb):
                     sess.execute(stmt)
                     logger.debug(f"Upserted document: {document.name} ({document.meta_data})")
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        if filters is not None:
+            logger.warning("Filters are not supported by PgVector, ignoring them")
+
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
@@ -207,9 +256,10 @@ class PgVector(VectorDb):
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            self.table.c.embedding,
             self.table.c.usage,
         ]
+        if include_embeddings:
+            columns.append(self.table.c.embedding)
 
         stmt = select(*columns)
         if self.distance == Distance.l2:
@@ -235,6 +285,16 @@ class PgVector(VectorDb):
         # Build search results
         search_results: List[Document] = []
         for neighbor in neighbors:
+            if not include_embeddings:
+                search_results.append(
+                    Document(
+                        name=neighbor.name,
+                        meta_data=neighbor.meta_data,
+                        content=neighbor.content,
+                        usage=neighbor.usage,
+                    )
+                )
+                continue
             search_results.append(
                 Document(
                     name=neighbor.name,
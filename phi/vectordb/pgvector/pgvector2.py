@@ -1,19 +1,24 @@
-from typing import Optional, List, Union, Dict, Any
+import asyncio
+from typing import Optional, List, Union, Set, Dict, Any, Tuple
 from hashlib import md5
+from time import perf_counter
+from statistics import mean
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
-    from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.schema import MetaData, Table, Column, Computed
+    from sqlalchemy.sql.expression import text, func, select, any_, bindparam, not_, or_, false, cast, null
+    from sqlalchemy.sql.expression import literal, union_all, ColumnElement
     from sqlalchemy.types import DateTime, String
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
 try:
-    from pgvector.sqlalchemy import Vector
+    from pgvector.sqlalchemy import Vector, HALFVEC, BIT
 except ImportError:
     raise ImportError("`pgvector` not installed")
 
@@ -21,7 +26,11 @@ from phi.document import Document
 from phi.embedder import Embedder
 from phi.vectordb.base import VectorDb
 from phi.vectordb.distance import Distance
+from phi.vectordb.search import SearchType
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.vectordb.pgvector.index_manager import PgVectorIndexManager
+from phi.vectordb.pgvector.storage import VectorStorage
+from phi.db.engine import EngineOptions, get_engine, get_async_engine
 from phi.utils.log import logger
 
 
@@ -32,13 +41,27 @@ class PgVector2(VectorDb):
         schema: Optional[str] = "ai",
         db_url: Optional[str] = None,
         db_engine: Optional[Engine] = None,
+        engine_options: Optional[EngineOptions] = None,
+        async_db_engine: Optional[AsyncEngine] = None,
         embedder: Optional[Embedder] = None,
         distance: Distance = Distance.cosine,
         index: Optional[Union[Ivfflat, HNSW]] = HNSW(),
+        meta_data_index: bool = False,
+        storage: VectorStorage = VectorStorage.vector,
+        store_full_vector: bool = False,
+        rerank_candidates: int = 4,
+        search_type: SearchType = SearchType.vector,
+        content_language: str = "english",
+        rrf_k: int = 60,
+        vector_weight: float = 1.0,
+        keyword_weight: float = 1.0,
+        hybrid_candidates: int = 4,
+        write_batch_size: int = 1000,
+        use_copy: bool = True,
     ):
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url, engine_options)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
@@ -50,6 +73,8 @@ class PgVector2(VectorDb):
         # Database attributes
         self.db_url: Optional[str] = db_url
         self.db_engine: Engine = _engine
+        # Pool options of the engines created from db_url, engines are shared by all components with the same url
+        self.engine_options: Optional[EngineOptions] = engine_options
         self.metadata: MetaData = MetaData(schema=self.schema)
 
         # Embedder for embedding the document contents
@@ -64,16 +89,59 @@ class PgVector2(VectorDb):
         # Distance metric
         self.distance: Distance = distance
 
+        # Storage of the embedding column: vector (float32), halfvec (float16) or binary quantized (1 bit per dimension)
+        self.storage: VectorStorage = storage
+        # Also keep the float32 embedding in `embedding_full`, used to re-rank the candidates of halfvec and binary
+        # searches and returned with the results
+        self.store_full_vector: bool = store_full_vector and storage != VectorStorage.vector
+        # Number of candidates re-ranked with the full precision embedding, as a multiple of the limit
+        self.rerank_candidates: int = rerank_candidates
+
         # Index for the collection
         self.index: Optional[Union[Ivfflat, HNSW]] = index
+        # Builds the index and rebuilds it as the collection grows
+        self.index_manager: PgVectorIndexManager = PgVectorIndexManager(self)
+        # Create a GIN index on meta_data for filtered searches
+        self.meta_data_index: bool = meta_data_index
+
+        # Search type used by `search`. keyword and hybrid maintain a generated tsvector column on content
+        self.search_type: SearchType = search_type
+        # Text search configuration used to parse the content and queries, e.g. "english" or "simple"
+        self.content_language: str = content_language
+        # Reciprocal rank fusion constant and the weights of the vector and keyword rankings in hybrid search
+        self.rrf_k: int = rrf_k
+        self.vector_weight: float = vector_weight
+        self.keyword_weight: float = keyword_weight
+        # Number of candidates each ranking contributes to hybrid search, as a multiple of the limit
+        self.hybrid_candidates: int = hybrid_candidates
+
+        # Number of rows written per INSERT statement and transaction
+        self.write_batch_size: int = write_batch_size
+        # Write batches with COPY into a staging table when the driver is psycopg (3)
+        self.use_copy: bool = use_copy and self.db_engine.dialect.driver == "psycopg"
 
         # Database session
         self.Session: sessionmaker[Session] = sessionmaker(bind=self.db_engine)
 
+        # Async engine used by the async methods. psycopg (3) supports asyncio with the same url, with other drivers
+        # the async methods run the sync methods in a thread unless an async_db_engine is provided.
+        _async_engine: Optional[AsyncEngine] = async_db_engine
+        if _async_engine is None and self.db_engine.dialect.driver == "psycopg":
+            _async_engine = get_async_engine(self.db_engine.url, engine_options)
+        self.async_db_engine: Optional[AsyncEngine] = _async_engine
+        self.AsyncSession: Optional[async_sessionmaker[AsyncSession]] = (
+            async_sessionmaker(bind=self.async_db_engine) if self.async_db_engine is not None else None
+        )
+
         # Database table for the collection
         self.table: Table = self.get_table()
 
     def get_table(self) -> Table:
+        columns: List[Column] = []
+        if self.store_full_vector:
+            columns.append(Column("embedding_full", Vector(self.dimensions)))
+        if self.search_type != SearchType.vector:
+            columns.append(self._get_content_tsv_column())
         return Table(
             self.collection,
             self.metadata,
@@ -81,14 +149,34 @@ class PgVector2(VectorDb):
             Column("name", String),
             Column("meta_data", postgresql.JSONB, server_default=text("'{}'::jsonb")),
             Column("content", postgresql.TEXT),
-            Column("embedding", Vector(self.dimensions)),
+            Column("embedding", self._get_embedding_type()),
             Column("usage", postgresql.JSONB),
             Column("created_at", DateTime(timezone=True), server_default=text("now()")),
             Column("updated_at", DateTime(timezone=True), onupdate=text("now()")),
             Column("content_hash", String),
+            *columns,
             extend_existing=True,
         )
 
+    def _get_embedding_type(self):
+        if self.storage == VectorStorage.halfvec:
+            return HALFVEC(self.dimensions)
+        if self.storage == VectorStorage.binary:
+            return BIT(self.dimensions)
+        return Vector(self.dimensions)
+
+    @staticmethod
+    def binary_quantize(embedding: List[float]) -> str:
+        """Returns the bit string of an embedding, 1 for positive values, as pgvector's `binary_quantize`"""
+        return "".join("1" if value > 0 else "0" for value in embedding)
+
+    def _get_content_tsv_column(self) -> Column:
+        return Column(
+            "content_tsv",
+            postgresql.TSVECTOR,
+            Computed(f"to_tsvector('{self.content_language}', coalesce(content, ''))", persisted=True),
+        )
+
     def table_exists(self) -> bool:
         logger.debug(f"Checking if table exists: {self.table.name}")
         try:
@@ -108,6 +196,40 @@ class PgVector2(VectorDb):
                         sess.execute(text(f"create schema if not exists {self.schema};"))
             logger.debug(f"Creating table: {self.collection}")
             self.table.create(self.db_engine)
+        # Indexes are created IF NOT EXISTS, so tables created before they were enabled get them as well
+        if self.meta_data_index:
+            self.create_meta_data_index()
+        if self.search_type != SearchType.vector:
+            self.create_content_tsv()
+
+    def create_content_tsv(self) -> None:
+        """Add the generated content_tsv column, if missing, and its GIN index used by keyword and hybrid search"""
+        columns = inspect(self.db_engine).get_columns(self.table.name, schema=self.schema)
+        with self.Session() as sess:
+            with sess.begin():
+                if "content_tsv" not in {column["name"] for column in columns}:
+                    logger.debug(f"Adding column content_tsv to: {self.collection}")
+                    sess.execute(
+                        text(
+                            f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS content_tsv tsvector GENERATED ALWAYS "
+                            f"AS (to_tsvector('{self.content_language}', coalesce(content, ''))) STORED;"
+                        )
+                    )
+                index_name = f"{self.collection}_content_tsv_index"
+                logger.debug(f"Creating GIN index: {index_name}")
+                sess.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} USING gin (content_tsv);"))
+
+    def create_meta_data_index(self) -> None:
+        """Create a GIN index on meta_data, used by the `meta_data @> filter` containment of filtered searches"""
+        index_name = f"{self.collection}_meta_data_index"
+        with self.Session() as sess:
+            with sess.begin():
+                logger.debug(f"Creating GIN index: {index_name}")
+                sess.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} USING gin (meta_data jsonb_path_ops);"
+                    )
+                )
 
     def doc_exists(self, document: Document) -> bool:
         """
@@ -124,6 +246,44 @@ class PgVector2(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, using a single query
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        content_hashes = list({document.content_hash for document in documents})
+        if len(content_hashes) == 0:
+            return set()
+
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = select(self.table.c.content_hash).where(
+                    self.table.c.content_hash == any_(bindparam("content_hashes", type_=postgresql.ARRAY(String)))
+                )
+                result = sess.execute(stmt, {"content_hashes": content_hashes}).scalars().all()
+                return set(result)
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Delete the rows with the given content hashes, using a single statement
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        from sqlalchemy import delete
+
+        if len(content_hashes) == 0:
+            return
+
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = delete(self.table).where(
+                    self.table.c.content_hash == any_(bindparam("content_hashes", type_=postgresql.ARRAY(String)))
+                )
+                sess.execute(stmt, {"content_hashes": list(content_hashes)})
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -150,154 +310,661 @@ class PgVector2(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
-    def insert(self, documents: List[Document], batch_size: int = 10) -> None:
-        with self.Session() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-                stmt = postgresql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=document.meta_data,
-                    content=cleaned_content,
-                    embedding=document.embedding,
-                    usage=document.usage,
-                    content_hash=content_hash,
-                )
-                sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
-
-                # Commit every `batch_size` documents
-                if counter >= batch_size:
-                    sess.commit()
-                    logger.info(f"Committed {counter} documents")
-                    counter = 0
+    def insert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        """
+        Insert documents into the database, using one multi-row INSERT and one transaction per batch.
 
-            # Commit any remaining documents
-            if counter > 0:
-                sess.commit()
-                logger.info(f"Committed {counter} documents")
+        Args:
+            documents (List[Document]): List of documents to insert
+            batch_size (Optional[int]): Number of rows per batch, defaults to `write_batch_size`
+        """
+        self._write(documents, upsert=False, batch_size=batch_size)
 
     def upsert_available(self) -> bool:
         return True
 
-    def upsert(self, documents: List[Document], batch_size: int = 20) -> None:
+    def upsert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
         """
-        Upsert documents into the database.
+        Upsert documents into the database, using one multi-row INSERT ... ON CONFLICT and one transaction per batch.
 
         Args:
             documents (List[Document]): List of documents to upsert
-            batch_size (int): Batch size for upserting documents
+            batch_size (Optional[int]): Number of rows per batch, defaults to `write_batch_size`
         """
-        with self.Session() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-                stmt = postgresql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=document.meta_data,
-                    content=cleaned_content,
-                    embedding=document.embedding,
-                    usage=document.usage,
-                    content_hash=content_hash,
-                )
-                # Update row when id matches but 'content_hash' is different
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=["id"],
-                    set_=dict(
-                        name=stmt.excluded.name,
-                        meta_data=stmt.excluded.meta_data,
-                        content=stmt.excluded.content,
-                        embedding=stmt.excluded.embedding,
-                        usage=stmt.excluded.usage,
-                        content_hash=stmt.excluded.content_hash,
-                    ),
-                )
-                sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Upserted document: {document.id} | {document.name} | {document.meta_data}")
+        self._write(documents, upsert=True, batch_size=batch_size)
+
+    def _write(
+        self, documents: List[Document], upsert: bool, batch_size: Optional[int] = None, skip_embedded: bool = False
+    ) -> None:
+        Document.embed_batch(documents, embedder=self.embedder, skip_embedded=skip_embedded)
+        _batch_size = max(1, batch_size or self.write_batch_size)
+        action = "Upserted" if upsert else "Inserted"
+        for i in range(0, len(documents), _batch_size):
+            rows = self._get_rows(documents[i : i + _batch_size])
+            if upsert:
+                # A row can only be updated once per statement, keep the last document for each id
+                rows = list({row["id"]: row for row in rows}.values())
+
+            start = perf_counter()
+            with self.Session() as sess:
+                with sess.begin():
+                    if self.use_copy:
+                        self._copy_rows(sess, rows, upsert)
+                    else:
+                        sess.execute(self._get_insert_statement(rows, upsert))
+            logger.info(f"{action} {len(rows)} documents in {perf_counter() - start:.2f}s")
+
+    def _get_insert_statement(self, rows: List[Dict[str, Any]], upsert: bool):
+        stmt = postgresql.insert(self.table).values(rows)
+        if upsert:
+            # Update row when id matches but 'content_hash' is different
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={column: stmt.excluded[column] for column in self._get_write_columns() if column != "id"},
+            )
+        return stmt
+
+    def _copy_rows(self, sess: Session, rows: List[Dict[str, Any]], upsert: bool) -> None:
+        """
+        Write rows with a binary COPY into a temporary staging table, then move them into the table
+        with a single INSERT ... SELECT. COPY skips per-row statement overhead and the text encoding
+        of the embeddings, which dominates the cost of a multi-row INSERT.
+        """
+        from psycopg.types.json import Jsonb
+        from pgvector.psycopg import register_vector
+
+        connection = sess.connection().connection.driver_connection
+        if connection.adapters.types.get("vector") is None:
+            register_vector(connection)
+
+        from pgvector import Bit, HalfVector
+
+        columns = self._get_write_columns()
+        column_list = ", ".join(columns)
+        types = {"meta_data": "jsonb", "content": "text", "embedding": "vector", "usage": "jsonb"}
+        types["embedding_full"] = "vector"
+        if self.storage == VectorStorage.halfvec:
+            types["embedding"] = "halfvec"
+        elif self.storage == VectorStorage.binary:
+            types["embedding"] = "bit"
+        # Temp tables are per connection, the schema is part of the name so that pooled connections writing to
+        # collections of the same name in different schemas do not share a staging table
+        preparer = self.db_engine.dialect.identifier_preparer
+        table_name = preparer.format_table(self.table)
+        staging_table = preparer.quote(
+            f"_phi_staging_{self.schema}_{self.collection}" if self.schema else f"_phi_staging_{self.collection}"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"create temp table if not exists {staging_table} "
+                f"(like {table_name} including defaults) on commit delete rows"
+            )
+            with cursor.copy(f"copy {staging_table} ({column_list}) from stdin (format binary)") as copy:
+                copy.set_types([types.get(column, "varchar") for column in columns])
+                for row in rows:
+                    values = dict(row, meta_data=Jsonb(row["meta_data"]))
+                    if row["usage"] is not None:
+                        values["usage"] = Jsonb(row["usage"])
+                    if self.storage == VectorStorage.halfvec:
+                        values["embedding"] = HalfVector(row["embedding"])
+                    elif self.storage == VectorStorage.binary:
+                        values["embedding"] = Bit(row["embedding"])
+                    copy.write_row([values[column] for column in columns])
+
+        merge = f"insert into {table_name} ({column_list}) select {column_list} from {staging_table}"
+        if upsert:
+            merge += " on conflict (id) do update set " + ", ".join(
+                f"{column} = excluded.{column}" for column in columns if column != "id"
+            )
+        # Run the merge through SQLAlchemy so errors surface as they do for the INSERT path
+        sess.connection().exec_driver_sql(merge)
+
+    def _get_write_columns(self) -> List[str]:
+        columns = ["id", "name", "meta_data", "content", "embedding", "usage", "content_hash"]
+        if self.store_full_vector:
+            columns.append("embedding_full")
+        return columns
+
+    def _get_rows(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for document in documents:
+            cleaned_content = document.content.replace("\x00", "\ufffd")
+            content_hash = md5(cleaned_content.encode()).hexdigest()
+            row = dict(
+                id=document.id or content_hash,
+                name=document.name,
+                meta_data=document.meta_data,
+                content=cleaned_content,
+                embedding=document.embedding,
+                usage=document.usage,
+                content_hash=content_hash,
+            )
+            if self.storage == VectorStorage.binary and document.embedding is not None:
+                row["embedding"] = self.binary_quantize(document.embedding)
+            if self.store_full_vector:
+                row["embedding_full"] = document.embedding
+            rows.append(row)
+        return rows
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """
+        Search the collection using its `search_type`.
+
+        Args:
+            query (str): The search query
+            limit (int): The maximum number of documents to return
+            filters (Optional[Dict[str, Any]]): Filters on table columns and meta_data keys, see `get_filter_clauses`
+            include_embeddings (bool): Select and return the embedding of each document
+
+        Returns:
+            List[Document]: List of documents that match the query
+        """
+        if self.search_type == SearchType.keyword:
+            return self.keyword_search(query, limit, filters, include_embeddings)
+        if self.search_type == SearchType.hybrid:
+            return self.hybrid_search(query, limit, filters, include_embeddings)
+        return self.vector_search(query, limit, filters, include_embeddings)
+
+    def vector_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """
+        Search for the documents closest to the query embedding.
+
+        Filters are applied in the nearest neighbour query itself. With an HNSW index, candidates are filtered
+        after the index scan, so selective filters can return fewer than `limit` documents unless `ef_search`
+        is raised. With `store_full_vector`, the top `rerank_candidates * limit` candidates of the halfvec or
+        binary embeddings are re-ranked by their full precision embeddings.
+        """
+        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+
+        columns = self._get_result_columns(include_embeddings)
+        return self._run_search(self._get_vector_search_statement(query_embedding, limit, filters, columns))
+
+    def _get_vector_search_statement(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        columns: List[ColumnElement],
+        exact: bool = False,
+        with_distance: bool = False,
+    ):
+        """Returns the nearest neighbour statement, selecting `columns` and the ranking `distance` if requested"""
+        filter_clauses = self.get_filter_clauses(filters) if filters is not None else []
+        if exact:
+            # Rank by the most precise embedding stored, the caller disables index scans
+            distance = self._get_full_distance(query_embedding)
+            if with_distance:
+                columns = [*columns, distance.label("distance")]
+            return select(*columns).where(*filter_clauses).order_by(distance).limit(limit)
+
+        if not self.store_full_vector:
+            distance = self._get_distance(query_embedding)
+            if with_distance:
+                columns = [*columns, distance.label("distance")]
+            return select(*columns).where(*filter_clauses).order_by(distance).limit(limit)
+
+        # Find candidates with the index on the quantized embeddings, then re-rank them at full precision
+        candidates = (
+            select(self.table.c.id)
+            .where(*filter_clauses)
+            .order_by(self._get_distance(query_embedding))
+            .limit(max(limit, 1) * self.rerank_candidates)
+            .subquery("candidates")
+        )
+        full_distance = self._get_full_distance(query_embedding)
+        if with_distance:
+            columns = [*columns, full_distance.label("distance")]
+        return (
+            select(*columns).join(candidates, candidates.c.id == self.table.c.id).order_by(full_distance).limit(limit)
+        )
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Search for multiple queries: the queries are embedded in one request and their nearest neighbour searches
+        run as a single UNION ALL statement, each branch still using the vector index. Collections with keyword
+        or hybrid `search_type` search the queries concurrently.
+
+        Args:
+            queries (List[str]): The search queries
+            limit (int): The maximum number of documents to return per query
+            filters (Optional[Dict[str, Any]]): Filters on table columns and meta_data keys, applied to every query
+            include_embeddings (bool): Select and return the embedding of each document
+
+        Returns:
+            List[List[Document]]: The documents for each query, in the order of the queries
+        """
+        if self.search_type != SearchType.vector or len(queries) <= 1:
+            return super().search_batch(queries, limit, filters, include_embeddings)
+
+        query_embeddings, _ = self.embedder.get_embeddings_batch(queries)
+        statements = []
+        for query_index, (query, query_embedding) in enumerate(zip(queries, query_embeddings)):
+            if not query_embedding:
+                logger.error(f"Error getting embedding for Query: {query}")
+                continue
+            columns = [literal(query_index).label("query_index"), *self._get_result_columns(include_embeddings)]
+            statements.append(
+                self._get_vector_search_statement(query_embedding, limit, filters, columns, with_distance=True)
+            )
+
+        search_results: List[List[Document]] = [[] for _ in queries]
+        if len(statements) == 0:
+            return search_results
 
-                # Commit every `batch_size` documents
-                if counter >= batch_size:
-                    sess.commit()
-                    logger.info(f"Committed {counter} documents")
-                    counter = 0
+        neighbors = union_all(*statements).subquery("neighbors")
+        stmt = select(neighbors).order_by(neighbors.c.query_index, neighbors.c.distance)
+        for neighbor in self._execute_search(stmt):
+            search_results[neighbor.query_index].append(self._get_document(neighbor))
+        return search_results
+
+    def recall_report(
+        self, queries: List[str], limit: int = 10, filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Measure the recall and latency of `vector_search` with the current storage, index and re-rank settings,
+        against an exact search without indexes over the most precise embeddings stored.
+
+        Args:
+            queries (List[str]): Sample queries, ideally representative of real traffic
+            limit (int): Number of documents to retrieve per query, recall is measured at this limit
+            filters (Optional[Dict[str, Any]]): Filters applied to both searches
+
+        Returns:
+            Dict[str, Any]: The settings, mean recall, and p50/p95 latencies in milliseconds of both searches
+        """
+        if self.storage == VectorStorage.binary and not self.store_full_vector:
+            logger.warning("Binary storage without store_full_vector: recall is measured against exact hamming search")
+
+        recalls: List[float] = []
+        latencies: List[float] = []
+        exact_latencies: List[float] = []
+        query_embeddings, _ = self.embedder.get_embeddings_batch(queries)
+        for query_embedding in query_embeddings:
+            columns: List[ColumnElement] = [self.table.c.id]
+            stmt = self._get_vector_search_statement(query_embedding, limit, filters, columns)
+            ids, latency = self._run_timed(stmt, exact=False)
+            exact_stmt = self._get_vector_search_statement(query_embedding, limit, filters, columns, exact=True)
+            exact_ids, exact_latency = self._run_timed(exact_stmt, exact=True)
+            if len(exact_ids) > 0:
+                recalls.append(len(set(ids) & set(exact_ids)) / len(exact_ids))
+            latencies.append(latency)
+            exact_latencies.append(exact_latency)
+
+        def percentile(values: List[float], q: float) -> float:
+            if len(values) == 0:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        report = {
+            "collection": self.collection,
+            "storage": self.storage.value,
+            "store_full_vector": self.store_full_vector,
+            "rerank_candidates": self.rerank_candidates if self.store_full_vector else None,
+            "index": self.index.__class__.__name__ if self.index is not None else None,
+            "num_queries": len(query_embeddings),
+            "limit": limit,
+            "recall": mean(recalls) if len(recalls) > 0 else None,
+            "latency_ms_p50": percentile(latencies, 0.5),
+            "latency_ms_p95": percentile(latencies, 0.95),
+            "exact_latency_ms_p50": percentile(exact_latencies, 0.5),
+            "exact_latency_ms_p95": percentile(exact_latencies, 0.95),
+        }
+        logger.info(f"Recall report: {report}")
+        return report
+
+    def _run_timed(self, stmt, exact: bool) -> Tuple[List[str], float]:
+        """Returns the ids selected by a search statement and the time taken in milliseconds"""
+        start = perf_counter()
+        with self.Session() as sess:
+            with sess.begin():
+                if exact:
+                    sess.execute(text("SET LOCAL enable_indexscan = off"))
+                else:
+                    self._set_search_parameters(sess)
+                ids = [row.id for row in sess.execute(stmt).fetchall()]
+        return ids, (perf_counter() - start) * 1000
+
+    def keyword_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """
+        Search for the documents matching the query terms, ranked by `ts_rank_cd`.
+        Requires `search_type` keyword or hybrid, which maintain the `content_tsv` column and its GIN index.
+        """
+        self._check_keyword_search()
+        return self._run_search(self._get_keyword_search_statement(query, limit, filters, include_embeddings))
 
-            # Commit any remaining documents
-            if counter > 0:
-                sess.commit()
-                logger.info(f"Committed {counter} documents")
+    def _get_keyword_search_statement(
+        self, query: str, limit: int, filters: Optional[Dict[str, Any]], include_embeddings: bool = False
+    ):
+        ts_query = self._get_ts_query(query)
+        stmt = select(*self._get_result_columns(include_embeddings)).where(self.table.c.content_tsv.op("@@")(ts_query))
+        if filters is not None:
+            stmt = stmt.where(*self.get_filter_clauses(filters))
+        return stmt.order_by(func.ts_rank_cd(self.table.c.content_tsv, ts_query).desc()).limit(limit=limit)
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+    def hybrid_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """
+        Search with full-text and nearest neighbour retrieval in a single query and fuse the two rankings with
+        weighted reciprocal rank fusion: score = sum(weight / (rrf_k + rank)) over the rankings a document is in.
+        Each retrieval contributes its top `hybrid_candidates * limit` documents.
+        """
+        self._check_keyword_search()
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        columns = [
+        stmt = self._get_hybrid_search_statement(query, query_embedding, limit, filters, include_embeddings)
+        return self._run_search(stmt)
+
+    def _get_hybrid_search_statement(
+        self,
+        query: str,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        include_embeddings: bool = False,
+    ):
+        num_candidates = max(limit, 1) * self.hybrid_candidates
+        filter_clauses = self.get_filter_clauses(filters) if filters is not None else []
+
+        # Nearest neighbours, ordered by the vector index
+        distance = self._get_distance(query_embedding).label("distance")
+        vector_candidates = (
+            select(self.table.c.id, distance)
+            .where(*filter_clauses)
+            .order_by(distance)
+            .limit(num_candidates)
+            .subquery("vector_candidates")
+        )
+        vector_ranked = select(
+            vector_candidates.c.id,
+            func.row_number().over(order_by=vector_candidates.c.distance).label("rank"),
+        ).subquery("vector_ranked")
+
+        # Full-text matches, found through the GIN index on content_tsv
+        ts_query = self._get_ts_query(query)
+        ts_rank = func.ts_rank_cd(self.table.c.content_tsv, ts_query).label("ts_rank")
+        keyword_candidates = (
+            select(self.table.c.id, ts_rank)
+            .where(self.table.c.content_tsv.op("@@")(ts_query), *filter_clauses)
+            .order_by(ts_rank.desc())
+            .limit(num_candidates)
+            .subquery("keyword_candidates")
+        )
+        keyword_ranked = select(
+            keyword_candidates.c.id,
+            func.row_number().over(order_by=keyword_candidates.c.ts_rank.desc()).label("rank"),
+        ).subquery("keyword_ranked")
+
+        # Reciprocal rank fusion over the union of both candidate lists
+        score = (
+            func.coalesce(self.vector_weight / (self.rrf_k + vector_ranked.c.rank), 0.0)
+            + func.coalesce(self.keyword_weight / (self.rrf_k + keyword_ranked.c.rank), 0.0)
+        ).label("score")
+        fused = (
+            select(func.coalesce(vector_ranked.c.id, keyword_ranked.c.id).label("id"), score)
+            .select_from(vector_ranked.join(keyword_ranked, vector_ranked.c.id == keyword_ranked.c.id, full=True))
+            .order_by(score.desc())
+            .limit(limit)
+            .subquery("fused")
+        )
+        return (
+            select(*self._get_result_columns(include_embeddings))
+            .join(fused, fused.c.id == self.table.c.id)
+            .order_by(fused.c.score.desc())
+        )
+
+    def _get_result_columns(self, include_embeddings: bool = False) -> List[ColumnElement]:
+        columns: List[ColumnElement] = [
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            self.table.c.embedding,
             self.table.c.usage,
         ]
+        if include_embeddings:
+            # Return float embeddings: the full precision copy if stored, none for binary quantized embeddings
+            if self.store_full_vector:
+                columns.append(self.table.c.embedding_full.label("embedding"))
+            elif self.storage == VectorStorage.binary:
+                columns.append(null().label("embedding"))
+            else:
+                columns.append(self.table.c.embedding)
+        return columns
+
+    def _get_distance(self, query_embedding: List[float]) -> ColumnElement:
+        """Distance on the stored embedding column, used with its index"""
+        if self.storage == VectorStorage.binary:
+            return self.table.c.embedding.hamming_distance(self.binary_quantize(query_embedding))
+        return self._get_column_distance(self.table.c.embedding, query_embedding)
+
+    def _get_full_distance(self, query_embedding: List[float]) -> ColumnElement:
+        """Distance on the most precise embedding stored"""
+        if self.store_full_vector:
+            return self._get_column_distance(self.table.c.embedding_full, query_embedding)
+        return self._get_distance(query_embedding)
+
+    def _get_column_distance(self, column: Column, query_embedding: List[float]) -> ColumnElement:
+        if self.distance == Distance.l2:
+            return column.l2_distance(query_embedding)
+        if self.distance == Distance.max_inner_product:
+            return column.max_inner_product(query_embedding)
+        return column.cosine_distance(query_embedding)
 
-        stmt = select(*columns)
+    def _get_ts_query(self, query: str) -> ColumnElement:
+        return func.websearch_to_tsquery(cast(self.content_language, postgresql.REGCONFIG), query)
 
-        if filters is not None:
-            for key, value in filters.items():
-                if hasattr(self.table.c, key):
-                    stmt = stmt.where(getattr(self.table.c, key) == value)
+    def _check_keyword_search(self) -> None:
+        if self.search_type == SearchType.vector:
+            raise ValueError(
+                "Keyword and hybrid search need the content_tsv column, "
+                "create the collection with search_type=SearchType.keyword or SearchType.hybrid"
+            )
 
-        if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
-        if self.distance == Distance.cosine:
-            stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
-        if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+    def _run_search(self, stmt) -> List[Document]:
+        return [self._get_document(neighbor) for neighbor in self._execute_search(stmt)]
 
-        stmt = stmt.limit(limit=limit)
+    def _execute_search(self, stmt) -> List[Any]:
         logger.debug(f"Query: {stmt}")
 
         # Get neighbors
         try:
             with self.Session() as sess:
                 with sess.begin():
-                    if self.index is not None:
-                        if isinstance(self.index, Ivfflat):
-                            sess.execute(text(f"SET LOCAL ivfflat.probes = {self.index.probes}"))
-                        elif isinstance(self.index, HNSW):
-                            sess.execute(text(f"SET LOCAL hnsw.ef_search  = {self.index.ef_search}"))
-                    neighbors = sess.execute(stmt).fetchall() or []
+                    self._set_search_parameters(sess)
+                    return sess.execute(stmt).fetchall() or []
         except Exception as e:
             logger.error(f"Error searching for documents: {e}")
             logger.error("Table might not exist, creating for future use")
             self.create()
             return []
 
-        # Build search results
-        search_results: List[Document] = []
-        for neighbor in neighbors:
-            search_results.append(
-                Document(
-                    name=neighbor.name,
-                    meta_data=neighbor.meta_data,
-                    content=neighbor.content,
-                    embedder=self.embedder,
-                    embedding=neighbor.embedding,
-                    usage=neighbor.usage,
-                )
+    def _get_document(self, neighbor: Any) -> Document:
+        # The embedding is only selected when requested, documents without one are built without the embedder
+        embedding = neighbor._mapping.get("embedding")
+        if embedding is None:
+            return Document(
+                name=neighbor.name, meta_data=neighbor.meta_data, content=neighbor.content, usage=neighbor.usage
             )
+        return Document(
+            name=neighbor.name,
+            meta_data=neighbor.meta_data,
+            content=neighbor.content,
+            embedder=self.embedder,
+            embedding=embedding,
+            usage=neighbor.usage,
+        )
 
-        return search_results
+    def _set_search_parameters(self, sess: Session) -> None:
+        for parameter in self._get_search_parameters():
+            sess.execute(text(parameter))
+
+    def _get_search_parameters(self) -> List[str]:
+        if isinstance(self.index, Ivfflat):
+            return [f"SET LOCAL ivfflat.probes = {self.index.probes}"]
+        if isinstance(self.index, HNSW):
+            return [f"SET LOCAL hnsw.ef_search  = {self.index.ef_search}"]
+        return []
+
+    async def async_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        """
+        Async version of `search`: the query is embedded with the embedder's async client and the search runs
+        on the async engine, so concurrent searches do not hold a thread each.
+        """
+        if self.AsyncSession is None:
+            return await super().async_search(query, limit, filters, include_embeddings)
+
+        if self.search_type == SearchType.keyword:
+            self._check_keyword_search()
+            stmt = self._get_keyword_search_statement(query, limit, filters, include_embeddings)
+        else:
+            query_embedding = await self.embedder.async_get_embedding(query)
+            if query_embedding is None:
+                logger.error(f"Error getting embedding for Query: {query}")
+                return []
+            if self.search_type == SearchType.hybrid:
+                self._check_keyword_search()
+                stmt = self._get_hybrid_search_statement(query, query_embedding, limit, filters, include_embeddings)
+            else:
+                columns = self._get_result_columns(include_embeddings)
+                stmt = self._get_vector_search_statement(query_embedding, limit, filters, columns)
+
+        logger.debug(f"Query: {stmt}")
+        try:
+            async with self.AsyncSession() as sess:
+                async with sess.begin():
+                    for parameter in self._get_search_parameters():
+                        await sess.execute(text(parameter))
+                    neighbors = (await sess.execute(stmt)).fetchall() or []
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            logger.error("Table might not exist, creating for future use")
+            await self.async_create()
+            return []
+        return [self._get_document(neighbor) for neighbor in neighbors]
+
+    async def async_exists(self) -> bool:
+        if self.async_db_engine is None:
+            return await super().async_exists()
+
+        try:
+            async with self.async_db_engine.connect() as conn:
+                return await conn.run_sync(
+                    lambda sync_conn: inspect(sync_conn).has_table(self.table.name, schema=self.schema)
+                )
+        except Exception as e:
+            logger.error(e)
+            return False
+
+    async def async_insert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        """Async version of `insert`. The documents are embedded with the embedder's async client,
+        the batched writes (COPY or multi-row INSERT) run in a thread without embedding them again."""
+        await Document.async_embed_batch(documents, embedder=self.embedder)
+        await asyncio.to_thread(self._write, documents, False, batch_size, True)
+
+    async def async_upsert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        """Async version of `upsert`, see `async_insert`"""
+        await Document.async_embed_batch(documents, embedder=self.embedder)
+        await asyncio.to_thread(self._write, documents, True, batch_size, True)
+
+    def get_filter_clauses(self, filters: Dict[str, Any]) -> List[ColumnElement]:
+        """
+        Build the WHERE clauses for search filters.
+
+        Keys matching a table column (e.g. `name`) are compared for equality, all other keys filter on meta_data.
+        Plain values are combined into a single `meta_data @> filter` containment, which the GIN index serves.
+        A dict of operators applies them to the meta_data key:
+            {"page": {"$gte": 2, "$lt": 10}, "url": {"$in": ["https://a", "https://b"]}}
+        Supported operators are $eq, $ne, $in, $nin, $gt, $gte, $lt and $lte.
+
+        Args:
+            filters (Dict[str, Any]): Filters to apply
+
+        Returns:
+            List[ColumnElement]: Clauses which must all hold
+        """
+        clauses: List[ColumnElement] = []
+        contains: Dict[str, Any] = {}
+        for key, value in filters.items():
+            if key in self.table.c:
+                clauses.append(self.table.c[key] == value)
+            elif isinstance(value, dict) and len(value) > 0 and all(op.startswith("$") for op in value):
+                for op, operand in value.items():
+                    clauses.append(self._get_meta_data_clause(key, op, operand))
+            else:
+                contains[key] = value
+
+        if len(contains) > 0:
+            clauses.insert(0, self.table.c.meta_data.contains(contains))
+        return clauses
+
+    def _get_meta_data_clause(self, key: str, op: str, operand: Any) -> ColumnElement:
+        meta_data = self.table.c.meta_data
+        if op == "$eq":
+            return meta_data.contains({key: operand})
+        if op == "$ne":
+            return not_(meta_data.contains({key: operand}))
+        if op in ("$in", "$nin"):
+            if not isinstance(operand, (list, tuple, set)):
+                raise ValueError(f"Filter operator {op} expects a list, got: {operand}")
+            # One containment per value keeps the GIN index usable
+            clause = or_(false(), *[meta_data.contains({key: value}) for value in operand])
+            return clause if op == "$in" else not_(clause)
+
+        # Range operators compare numbers numerically and everything else as text
+        if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+            element = meta_data[key].as_float()
+        else:
+            element = meta_data[key].as_string()
+        if op == "$gt":
+            return element > operand
+        if op == "$gte":
+            return element >= operand
+        if op == "$lt":
+            return element < operand
+        if op == "$lte":
+            return element <= operand
+        raise ValueError(f"Unsupported filter operator: {op}")
 
     def delete(self) -> None:
         if self.table_exists():
@@ -316,67 +983,15 @@ class PgVector2(VectorDb):
                     return int(result)
                 return 0
 
-    def optimize(self) -> None:
-        from math import sqrt
-
+    def optimize(self, force_rebuild: bool = False) -> None:
+        """Create the metadata and vector indexes, rebuilding the vector index when the table outgrew it.
+        See `PgVectorIndexManager` for scheduled maintenance and the progress of index builds."""
         logger.debug("==== Optimizing Vector DB ====")
-        if self.index is None:
-            return
-
-        if self.index.name is None:
-            _type = "ivfflat" if isinstance(self.index, Ivfflat) else "hnsw"
-            self.index.name = f"{self.collection}_{_type}_index"
-
-        index_distance = "vector_cosine_ops"
-        if self.distance == Distance.l2:
-            index_distance = "vector_l2_ops"
-        if self.distance == Distance.max_inner_product:
-            index_distance = "vector_ip_ops"
+        if self.meta_data_index:
+            self.create_meta_data_index()
 
-        if isinstance(self.index, Ivfflat):
-            num_lists = self.index.lists
-            if self.index.dynamic_lists:
-                total_records = self.get_count()
-                logger.debug(f"Number of records: {total_records}")
-                if total_records < 1000000:
-                    num_lists = int(total_records / 1000)
-                elif total_records > 1000000:
-                    num_lists = int(sqrt(total_records))
-
-            with self.Session() as sess:
-                with sess.begin():
-                    logger.debug(f"Setting configuration: {self.index.configuration}")
-                    for key, value in self.index.configuration.items():
-                        sess.execute(text(f"SET {key} = '{value}';"))
-                    logger.debug(
-                        f"Creating Ivfflat index with lists: {num_lists}, probes: {self.index.probes} "
-                        f"and distance metric: {index_distance}"
-                    )
-                    sess.execute(text(f"SET ivfflat.probes = {self.index.probes};"))
-                    sess.execute(
-                        text(
-                            f"CREATE INDEX IF NOT EXISTS {self.index.name} ON {self.table} "
-                            f"USING ivfflat (embedding {index_distance}) "
-                            f"WITH (lists = {num_lists});"
-                        )
-                    )
-        elif isinstance(self.index, HNSW):
-            with self.Session() as sess:
-                with sess.begin():
-                    logger.debug(f"Setting configuration: {self.index.configuration}")
-                    for key, value in self.index.configuration.items():
-                        sess.execute(text(f"SET {key} = '{value}';"))
-                    logger.debug(
-                        f"Creating HNSW index with m: {self.index.m}, ef_construction: {self.index.ef_construction} "
-                        f"and distance metric: {index_distance}"
-                    )
-                    sess.execute(
-                        text(
-                            f"CREATE INDEX IF NOT EXISTS {self.index.name} ON {self.table} "
-                            f"USING hnsw (embedding {index_distance}) "
-                            f"WITH (m = {self.index.m}, ef_construction = {self.index.ef_construction});"
-                        )
-                    )
+        if self.index is not None:
+            self.index_manager.maintain(force=force_rebuild)
         logger.debug("==== Optimized Vector DB ====")
 
     def clear(self) -> bool:
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class VectorStorage(str, Enum):
+    """How PgVector2 stores embeddings: full precision, half precision or binary quantized"""
+
+    vector = "vector"
+    halfvec = "halfvec"
+    binary = "binary"
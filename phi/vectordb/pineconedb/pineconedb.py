@@ -200,8 +200,8 @@ class PineconeDB(VectorDb):
         """
 
         vectors = []
+        Document.embed_batch(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             document.meta_data["text"] = document.content
             vectors.append(
                 Vector(
@@ -247,6 +247,8 @@ class PineconeDB(VectorDb):
         namespace: Optional[str] = None,
         filter: Optional[Dict[str, Union[str, float, int, bool, List, dict]]] = None,
         include_values: Optional[bool] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
     ) -> List[Document]:
         """Search for similar documents in the index.
 
@@ -257,6 +259,8 @@ class PineconeDB(VectorDb):
             filter (Optional[Dict[str, Union[str, float, int, bool, List, dict]]], optional): The filter for the search. Defaults to None.
             include_values (Optional[bool], optional): Whether to include values in the search results. Defaults to None.
             include_metadata (Optional[bool], optional): Whether to include metadata in the search results. Defaults to None.
+            filters (Optional[Dict[str, Any]], optional): Alias of `filter`, used when searching through a knowledge base. Defaults to None.
+            include_embeddings (bool, optional): Alias of `include_values`, used when searching through a knowledge base. Defaults to False.
 
         Returns:
             List[Document]: The list of matching documents.
@@ -272,15 +276,15 @@ class PineconeDB(VectorDb):
             vector=query_embedding,
             top_k=limit,
             namespace=namespace,
-            filter=filter,
-            include_values=include_values,
+            filter=filter or filters,
+            include_values=include_values if include_values is not None else include_embeddings,
             include_metadata=True,
         )
         return [
             Document(
                 content=(result.metadata.get("text", "") if result.metadata is not None else ""),
                 id=result.id,
-                embedding=result.values,
+                embedding=result.values or None,
                 meta_data=result.metadata,
             )
             for result in response.matches
@@ -1,8 +1,9 @@
+import asyncio
 from hashlib import md5
-from typing import List, Optional
+from typing import List, Optional, Set, Dict, Any, Union, Iterator
 
 try:
-    from qdrant_client import QdrantClient  # noqa: F401
+    from qdrant_client import QdrantClient, AsyncQdrantClient  # noqa: F401
     from qdrant_client.http import models
 except ImportError:
     raise ImportError(
@@ -34,6 +35,12 @@ class Qdrant(VectorDb):
         timeout: Optional[float] = None,
         host: Optional[str] = None,
         path: Optional[str] = None,
+        batch_size: int = 64,
+        parallel: int = 1,
+        upload_prefer_grpc: bool = True,
+        meta_data_indexes: Optional[Union[List[str], Dict[str, str]]] = None,
+        scalar_quantization: bool = False,
+        quantization_config: Optional[models.QuantizationConfig] = None,
         **kwargs,
     ):
         # Collection attributes
@@ -48,6 +55,8 @@ class Qdrant(VectorDb):
 
         # Qdrant client instance
         self._client: Optional[QdrantClient] = None
+        self._async_client: Optional[AsyncQdrantClient] = None
+        self._upload_client: Optional[QdrantClient] = None
 
         # Qdrant client arguments
         self.location: Optional[str] = location
@@ -65,26 +74,71 @@ class Qdrant(VectorDb):
         # Qdrant client kwargs
         self.kwargs = kwargs
 
+        # Number of points per upload request and number of parallel upload processes
+        self.batch_size: int = batch_size
+        self.parallel: int = parallel
+        # Upload points to remote servers over gRPC, which is faster for bulk loads, even if prefer_grpc is False
+        self.upload_prefer_grpc: bool = upload_prefer_grpc
+        # Keys of the document meta_data to index, as a list of keyword fields or a mapping of key to
+        # Qdrant payload schema type, e.g. {"year": "integer"}. The document name is always indexed.
+        self.meta_data_indexes: Optional[Union[List[str], Dict[str, str]]] = meta_data_indexes
+        # Quantization of the collection vectors, scalar_quantization is a shortcut for int8 scalar quantization
+        _quantization_config = quantization_config
+        if _quantization_config is None and scalar_quantization:
+            _quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        self.quantization_config: Optional[models.QuantizationConfig] = _quantization_config
+
+    @property
+    def is_remote(self) -> bool:
+        """Whether the client connects to a Qdrant server, as opposed to a local in memory or on disk collection"""
+        return self.url is not None or self.host is not None or (self.location not in (None, ":memory:"))
+
+    def _get_client_kwargs(self, prefer_grpc: bool) -> Dict[str, Any]:
+        return {
+            "location": self.location,
+            "url": self.url,
+            "port": self.port,
+            "grpc_port": self.grpc_port,
+            "prefer_grpc": prefer_grpc,
+            "https": self.https,
+            "api_key": self.api_key,
+            "prefix": self.prefix,
+            "timeout": self.timeout,
+            "host": self.host,
+            "path": self.path,
+            **self.kwargs,
+        }
+
     @property
     def client(self) -> QdrantClient:
         if self._client is None:
             logger.debug("Creating Qdrant Client")
-            self._client = QdrantClient(
-                location=self.location,
-                url=self.url,
-                port=self.port,
-                grpc_port=self.grpc_port,
-                prefer_grpc=self.prefer_grpc,
-                https=self.https,
-                api_key=self.api_key,
-                prefix=self.prefix,
-                timeout=self.timeout,
-                host=self.host,
-                path=self.path,
-                **self.kwargs,
-            )
+            self._client = QdrantClient(**self._get_client_kwargs(self.prefer_grpc))
         return self._client
 
+    @property
+    def upload_client(self) -> QdrantClient:
+        """Client used to upload points, connected over gRPC to remote servers unless upload_prefer_grpc is False"""
+        if not self.is_remote or self.prefer_grpc or not self.upload_prefer_grpc:
+            return self.client
+        if self._upload_client is None:
+            logger.debug("Creating Qdrant gRPC Client for uploads")
+            self._upload_client = QdrantClient(**self._get_client_kwargs(True))
+        return self._upload_client
+
+    @property
+    def async_client(self) -> Optional[AsyncQdrantClient]:
+        """Async client for remote Qdrant servers. Local (in memory or path) collections are only visible
+        to the client that opened them, so the async methods use the sync client in a thread instead."""
+        if not self.is_remote:
+            return None
+        if self._async_client is None:
+            logger.debug("Creating Async Qdrant Client")
+            self._async_client = AsyncQdrantClient(**self._get_client_kwargs(self.prefer_grpc))
+        return self._async_client
+
     def create(self) -> None:
         # Collection distance
         _distance = models.Distance.COSINE
@@ -98,6 +152,31 @@ class Qdrant(VectorDb):
             self.client.create_collection(
                 collection_name=self.collection,
                 vectors_config=models.VectorParams(size=self.dimensions, distance=_distance),
+                quantization_config=self.quantization_config,
+            )
+        self.create_payload_indexes()
+
+    def get_payload_indexes(self) -> Dict[str, models.PayloadSchemaType]:
+        """Returns the payload fields to index and their schema: the document name and the configured meta_data keys"""
+        payload_indexes: Dict[str, models.PayloadSchemaType] = {"name": models.PayloadSchemaType.KEYWORD}
+        if isinstance(self.meta_data_indexes, dict):
+            for key, schema in self.meta_data_indexes.items():
+                payload_indexes[f"meta_data.{key}"] = models.PayloadSchemaType(schema.lower())
+        elif self.meta_data_indexes is not None:
+            for key in self.meta_data_indexes:
+                payload_indexes[f"meta_data.{key}"] = models.PayloadSchemaType.KEYWORD
+        return payload_indexes
+
+    def create_payload_indexes(self) -> None:
+        """Index the payload fields used by filters, e.g. the name in `name_exists`. Creating an existing index is a
+        no-op, so indexes for newly configured keys are added to existing collections."""
+        if not self.is_remote:
+            # Payload indexes have no effect in local mode
+            return
+        for field_name, field_schema in self.get_payload_indexes().items():
+            logger.debug(f"Creating payload index on {field_name}: {field_schema.value}")
+            self.client.create_payload_index(
+                collection_name=self.collection, field_name=field_name, field_schema=field_schema
             )
 
     def doc_exists(self, document: Document) -> bool:
@@ -117,6 +196,40 @@ class Qdrant(VectorDb):
             return len(collection_points) > 0
         return False
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, retrieving all ids in one request
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        if self.client:
+            doc_ids = list({document.content_hash for document in documents})
+            if len(doc_ids) == 0:
+                return set()
+            collection_points = self.client.retrieve(
+                collection_name=self.collection,
+                ids=doc_ids,
+                with_payload=False,
+                with_vectors=False,
+            )
+            # Qdrant returns the md5 ids formatted as UUIDs
+            return {str(point.id).replace("-", "") for point in collection_points}
+        return set()
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Deletes the points with the given content hashes in one request
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        if self.client and len(content_hashes) > 0:
+            self.client.delete(
+                collection_name=self.collection,
+                points_selector=models.PointIdsList(points=list(content_hashes)),
+            )
+
     def name_exists(self, name: str) -> bool:
         """
         Validates if a document with the given name exists in the collection.
@@ -134,63 +247,184 @@ class Qdrant(VectorDb):
                     must=[models.FieldCondition(key="name", match=models.MatchValue(value=name))]
                 ),
                 limit=1,
+                with_payload=False,
+                with_vectors=False,
             )
             return len(scroll_result[0]) > 0
         return False
 
-    def insert(self, documents: List[Document], batch_size: int = 10) -> None:
+    def insert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        """
+        Embed the documents in batches and upload them with `upload_points`, in requests of `batch_size` points
+        sent by `parallel` processes. Point ids are the content hashes, so existing documents are overwritten.
+
+        Args:
+            documents (List[Document]): Documents to insert
+            batch_size (Optional[int]): Number of points per request. Defaults to the batch_size of the collection.
+        """
         logger.debug(f"Inserting {len(documents)} documents")
-        points = []
+        Document.embed_batch(documents, embedder=self.embedder)
+        if len(documents) > 0:
+            self.upload_client.upload_points(
+                collection_name=self.collection,
+                points=self._iter_points(documents),
+                batch_size=batch_size or self.batch_size,
+                parallel=self.parallel,
+            )
+        logger.debug(f"Inserted {len(documents)} documents")
+
+    async def async_insert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        if self.async_client is None:
+            return await super().async_insert(documents)
+
+        logger.debug(f"Inserting {len(documents)} documents")
+        await Document.async_embed_batch(documents, embedder=self.embedder)
+        if len(documents) > 0:
+            # upload_points is blocking on the async client as well, run the upload in a thread
+            await asyncio.to_thread(
+                self.upload_client.upload_points,
+                collection_name=self.collection,
+                points=self._iter_points(documents),
+                batch_size=batch_size or self.batch_size,
+                parallel=self.parallel,
+            )
+        logger.debug(f"Inserted {len(documents)} documents")
+
+    def _iter_points(self, documents: List[Document]) -> Iterator[models.PointStruct]:
         for document in documents:
-            document.embed(embedder=self.embedder)
             cleaned_content = document.content.replace("\x00", "\ufffd")
             doc_id = md5(cleaned_content.encode()).hexdigest()
-            points.append(
-                models.PointStruct(
-                    id=doc_id,
-                    vector=document.embedding,
-                    payload={
-                        "name": document.name,
-                        "meta_data": document.meta_data,
-                        "content": cleaned_content,
-                        "usage": document.usage,
-                    },
-                )
+            yield models.PointStruct(
+                id=doc_id,
+                vector=document.embedding,
+                payload={
+                    "name": document.name,
+                    "meta_data": document.meta_data,
+                    "content": cleaned_content,
+                    "usage": document.usage,
+                },
             )
-            logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
-        if len(points) > 0:
-            self.client.upsert(collection_name=self.collection, wait=False, points=points)
-        logger.debug(f"Upsert {len(points)} documents")
 
-    def upsert(self, documents: List[Document]) -> None:
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
         """
-        Upsert documents into the database.
+        Upsert documents into the database, with the same batched upload as insert.
 
         Args:
             documents (List[Document]): List of documents to upsert
+            batch_size (Optional[int]): Number of points per request. Defaults to the batch_size of the collection.
         """
-        logger.debug("Redirecting the request to insert")
-        self.insert(documents)
+        self.insert(documents, batch_size=batch_size)
+
+    async def async_upsert(self, documents: List[Document], batch_size: Optional[int] = None) -> None:
+        await self.async_insert(documents, batch_size=batch_size)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        if filters is not None:
+            logger.warning("Filters are not supported by Qdrant, ignoring them")
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        results = self.client.search(
+        results = self.client.query_points(
+            collection_name=self.collection,
+            query=query_embedding,
+            with_vectors=include_embeddings,
+            with_payload=True,
+            limit=limit,
+        )
+        return self._build_search_results(results.points)
+
+    async def async_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        if self.async_client is None:
+            return await super().async_search(query, limit, filters, include_embeddings)
+        if filters is not None:
+            logger.warning("Filters are not supported by Qdrant, ignoring them")
+
+        query_embedding = await self.embedder.async_get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+
+        results = await self.async_client.query_points(
             collection_name=self.collection,
-            query_vector=query_embedding,
-            with_vectors=True,
+            query=query_embedding,
+            with_vectors=include_embeddings,
             with_payload=True,
             limit=limit,
         )
+        return self._build_search_results(results.points)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Search for multiple queries, embedding them in one request and sending them in one `query_batch_points` call
+
+        Args:
+            queries (List[str]): The search queries
+            limit (int): The maximum number of documents to return per query
+            filters (Optional[Dict[str, Any]]): Not supported, ignored
+            include_embeddings (bool): Return the embedding of each document
+
+        Returns:
+            List[List[Document]]: The documents for each query, in the order of the queries
+        """
+        if filters is not None:
+            logger.warning("Filters are not supported by Qdrant, ignoring them")
+        if len(queries) == 0:
+            return []
+
+        query_embeddings, _ = self.embedder.get_embeddings_batch(queries)
+        requests = []
+        for query, query_embedding in zip(queries, query_embeddings):
+            if not query_embedding:
+                logger.error(f"Error getting embedding for Query: {query}")
+                return [[] for _ in queries]
+            requests.append(
+                models.QueryRequest(
+                    query=query_embedding, limit=limit, with_payload=True, with_vector=include_embeddings
+                )
+            )
 
-        # Build search results
+        batch_results = self.client.query_batch_points(collection_name=self.collection, requests=requests)
+        return [self._build_search_results(results.points) for results in batch_results]
+
+    def _build_search_results(self, results: List[models.ScoredPoint]) -> List[Document]:
         search_results: List[Document] = []
         for result in results:
             if result.payload is None:
                 continue
+            if result.vector is None:
+                search_results.append(
+                    Document(
+                        name=result.payload["name"],
+                        meta_data=result.payload["meta_data"],
+                        content=result.payload["content"],
+                        usage=result.payload["usage"],
+                    )
+                )
+                continue
             search_results.append(
                 Document(
                     name=result.payload["name"],
@@ -219,6 +453,12 @@ class Qdrant(VectorDb):
                     return True
         return False
 
+    async def async_exists(self) -> bool:
+        if self.async_client is None:
+            return await super().async_exists()
+        collections_response: models.CollectionsResponse = await self.async_client.get_collections()
+        return any(collection.name == self.collection for collection in collections_response.collections)
+
     def get_count(self) -> int:
         count_result: models.CountResult = self.client.count(collection_name=self.collection, exact=True)
         return count_result.count
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SearchType(str, Enum):
+    vector = "vector"
+    keyword = "keyword"
+    hybrid = "hybrid"
@@ -1,5 +1,5 @@
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from hashlib import md5
 
 try:
@@ -8,8 +8,8 @@ try:
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
-    from sqlalchemy.types import DateTime
+    from sqlalchemy.sql.expression import text, func, select, bindparam, ColumnElement
+    from sqlalchemy.types import DateTime, LargeBinary
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
@@ -19,6 +19,7 @@ from phi.embedder import Embedder
 from phi.embedder.openai import OpenAIEmbedder
 from phi.vectordb.base import VectorDb
 from phi.vectordb.distance import Distance
+from phi.vectordb.singlestore.vector import pack_vector, unpack_vector
 from phi.utils.log import logger
 
 
@@ -113,6 +114,38 @@ class S2VectorDb(VectorDb):
             result = sess.execute(stmt).first()
             return result is not None
 
+    def docs_exist(self, documents: List[Document]) -> Set[str]:
+        """
+        Returns the content hashes of the documents which already exist, using a single query per batch
+
+        Args:
+            documents (List[Document]): Documents to validate
+        """
+        content_hashes = list({document.content_hash for document in documents})
+        existing: Set[str] = set()
+        with self.Session.begin() as sess:
+            for i in range(0, len(content_hashes), 1000):
+                stmt = select(self.table.c.content_hash).where(
+                    self.table.c.content_hash.in_(content_hashes[i : i + 1000])
+                )
+                existing.update(sess.execute(stmt).scalars().all())
+        return existing
+
+    def delete_docs(self, content_hashes: List[str]) -> None:
+        """
+        Delete the rows with the given content hashes, using a single statement per batch
+
+        Args:
+            content_hashes (List[str]): Content hashes of the documents to delete
+        """
+        from sqlalchemy import delete
+
+        content_hashes = list(content_hashes)
+        with self.Session.begin() as sess:
+            for i in range(0, len(content_hashes), 1000):
+                stmt = delete(self.table).where(self.table.c.content_hash.in_(content_hashes[i : i + 1000]))
+                sess.execute(stmt)
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -137,86 +170,81 @@ class S2VectorDb(VectorDb):
             result = sess.execute(stmt).first()
             return result is not None
 
-    def insert(self, documents: List[Document], batch_size: int = 10) -> None:
+    def insert(self, documents: List[Document], batch_size: int = 100) -> None:
         """
-        Insert documents into the table.
+        Insert documents into the table, using one multi-row INSERT per batch.
 
         Args:
             documents (List[Document]): List of documents to insert.
             batch_size (int): Number of documents to insert in each batch.
         """
-        with self.Session.begin() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-
-                meta_data_json = json.dumps(document.meta_data)
-                usage_json = json.dumps(document.usage)
-                embedding_json = json.dumps(document.embedding)
-                json_array_pack = text("JSON_ARRAY_PACK(:embedding)").bindparams(embedding=embedding_json)
-
-                stmt = mysql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=meta_data_json,
-                    content=cleaned_content,
-                    embedding=json_array_pack,
-                    usage=usage_json,
-                    content_hash=content_hash,
-                )
-                sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
-
-            # Commit all documents
-            sess.commit()
-            logger.debug(f"Committed {counter} documents")
+        self._write(documents, upsert=False, batch_size=batch_size)
 
     def upsert_available(self) -> bool:
         return False
 
-    def upsert(self, documents: List[Document], batch_size: int = 20) -> None:
+    def upsert(self, documents: List[Document], batch_size: int = 100) -> None:
         """
-        Upsert documents into the database.
+        Upsert (insert or update) documents in the table, using one multi-row INSERT ... ON DUPLICATE KEY UPDATE
+        per batch.
 
         Args:
-            documents (List[Document]): List of documents to upsert
-            batch_size (int): Batch size for upserting documents
+            documents (List[Document]): List of documents to upsert.
+            batch_size (int): Number of documents to upsert in each batch.
         """
+        self._write(documents, upsert=True, batch_size=batch_size)
+
+    def _write(self, documents: List[Document], upsert: bool, batch_size: int) -> None:
+        Document.embed_batch(documents, embedder=self.embedder)
+        _batch_size = max(1, batch_size)
         with self.Session.begin() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-
-                meta_data_json = json.dumps(document.meta_data)
-                usage_json = json.dumps(document.usage)
-                embedding_json = json.dumps(document.embedding)
-                json_array_pack = text("JSON_ARRAY_PACK(:embedding)").bindparams(embedding=embedding_json)
-
-                stmt = mysql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=meta_data_json,
-                    content=cleaned_content,
-                    embedding=json_array_pack,
-                    usage=usage_json,
-                    content_hash=content_hash,
-                )
+            for i in range(0, len(documents), _batch_size):
+                rows = self._get_rows(documents[i : i + _batch_size])
+                stmt = mysql.insert(self.table).values(rows)
+                if upsert:
+                    stmt = stmt.on_duplicate_key_update(
+                        name=stmt.inserted.name,
+                        meta_data=stmt.inserted.meta_data,
+                        content=stmt.inserted.content,
+                        embedding=stmt.inserted.embedding,
+                        usage=stmt.inserted.usage,
+                        content_hash=stmt.inserted.content_hash,
+                    )
                 sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Inserted document: {document.id} | {document.name} | {document.meta_data}")
+                logger.debug(f"{'Upserted' if upsert else 'Inserted'} {len(rows)} documents")
 
-            # Commit all remaining documents
-            sess.commit()
-            logger.debug(f"Committed {counter} documents")
+    def _get_rows(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for document in documents:
+            cleaned_content = document.content.replace("\x00", "\ufffd")
+            content_hash = md5(cleaned_content.encode()).hexdigest()
+            rows.append(
+                {
+                    "id": document.id or content_hash,
+                    "name": document.name,
+                    "meta_data": json.dumps(document.meta_data),
+                    "content": cleaned_content,
+                    "embedding": self._get_vector_param(document.embedding or []),
+                    "usage": json.dumps(document.usage),
+                    "content_hash": content_hash,
+                }
+            )
+        return rows
+
+    def _get_vector_param(self, embedding: List[float]) -> ColumnElement:
+        """The embedding sent in the packed binary format stored in the BLOB column, as JSON_ARRAY_PACK produces"""
+        return bindparam(None, pack_vector(embedding), type_=LargeBinary)
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+    def _get_vector_column(self) -> ColumnElement:
+        return self.table.c.embedding
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
         """
         Search for documents based on a query and optional filters.
 
@@ -224,6 +252,7 @@ class S2VectorDb(VectorDb):
             query (str): The search query.
             limit (int): The maximum number of results to return.
             filters (Optional[Dict[str, Any]]): Optional filters for the search.
+            include_embeddings (bool): Return the embedding of each document, unpacked from the binary format.
 
         Returns:
             List[Document]: List of documents that match the query.
@@ -233,15 +262,14 @@ class S2VectorDb(VectorDb):
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        columns = [
+        columns: List[ColumnElement] = [
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            func.json_array_unpack(self.table.c.embedding).label(
-                "embedding"
-            ),  # Unpack embedding here # self.table.c.embedding,
             self.table.c.usage,
         ]
+        if include_embeddings:
+            columns.append(self._get_vector_column().label("embedding"))
 
         stmt = select(*columns)
 
@@ -250,50 +278,31 @@ class S2VectorDb(VectorDb):
                 if hasattr(self.table.c, key):
                     stmt = stmt.where(getattr(self.table.c, key) == value)
 
+        query_vector = self._get_vector_param(query_embedding)
         if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
-        if self.distance == Distance.cosine:
-            embedding_json = json.dumps(query_embedding)
-            dot_product_expr = func.dot_product(self.table.c.embedding, text("JSON_ARRAY_PACK(:embedding)"))
-            stmt = stmt.order_by(dot_product_expr.desc())
-            stmt = stmt.params(embedding=embedding_json)
-            # stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
-        if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+            stmt = stmt.order_by(func.euclidean_distance(self.table.c.embedding, query_vector))
+        else:
+            # Embeddings are normalized, so the dot product ranks by cosine similarity
+            stmt = stmt.order_by(func.dot_product(self.table.c.embedding, query_vector).desc())
 
         stmt = stmt.limit(limit=limit)
         logger.debug(f"Query: {stmt}")
 
         # Get neighbors
-        # This will only work if embedding column is created with `vector` data type.
         with self.Session.begin() as sess:
             neighbors = sess.execute(stmt).fetchall() or []
-            #         if self.index is not None:
-            #             if isinstance(self.index, Ivfflat):
-            #                 # Assuming 'nprobe' is a relevant parameter to be set for the session
-            #                 # Update the session settings based on the Ivfflat index configuration
-            #                 sess.execute(text(f"SET SESSION nprobe = {self.index.nprobe}"))
-            #             elif isinstance(self.index, HNSWFlat):
-            #                 # Assuming 'ef_search' is a relevant parameter to be set for the session
-            #                 # Update the session settings based on the HNSW index configuration
-            #                 sess.execute(text(f"SET SESSION ef_search = {self.index.ef_search}"))
 
         # Build search results
         search_results: List[Document] = []
         for neighbor in neighbors:
-            meta_data_dict = json.loads(neighbor.meta_data) if neighbor.meta_data else {}
-            usage_dict = json.loads(neighbor.usage) if neighbor.usage else {}
-            # Convert the embedding mysql.TEXT back into a list
-            embedding_list = json.loads(neighbor.embedding) if neighbor.embedding else []
-
             search_results.append(
                 Document(
                     name=neighbor.name,
-                    meta_data=meta_data_dict,
+                    meta_data=json.loads(neighbor.meta_data) if neighbor.meta_data else {},
                     content=neighbor.content,
                     embedder=self.embedder,
-                    embedding=embedding_list,
-                    usage=usage_dict,
+                    embedding=unpack_vector(neighbor.embedding) if include_embeddings else None,
+                    usage=json.loads(neighbor.usage) if neighbor.usage else {},
                 )
             )
 
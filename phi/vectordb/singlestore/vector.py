@@ -0,0 +1,23 @@
+import sys
+from array import array
+from typing import List, Optional
+
+
+def pack_vector(embedding: List[float]) -> bytes:
+    """Pack an embedding in SingleStore's binary vector format: little-endian float32 values,
+    as produced by JSON_ARRAY_PACK and stored by the VECTOR type"""
+    packed = array("f", embedding)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_vector(packed: Optional[bytes]) -> Optional[List[float]]:
+    """Unpack an embedding from SingleStore's binary vector format"""
+    if packed is None:
+        return None
+    embedding = array("f")
+    embedding.frombytes(packed)
+    if sys.byteorder == "big":
+        embedding.byteswap()
+    return embedding.tolist()
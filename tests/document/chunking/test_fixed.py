@@ -0,0 +1,75 @@
+from phi.document import Document
+from phi.document.chunking import FixedSizeChunking, clean_text
+from phi.document.reader.base import Reader
+
+TEXT = """Fixed size chunking splits text into chunks of at most chunk_size characters.
+
+Chunks end on whitespace where possible, so words are never split unless a single word is longer than a chunk.
+\tWhitespace runs are   collapsed before chunking."""
+
+
+def reference_chunks(text: str, chunk_size: int):
+    """The chunks produced by the original Reader.chunk_document"""
+    content = clean_text(text)
+    chunks = []
+    start = 0
+    while start < len(content):
+        end = start + chunk_size
+        if end < len(content):
+            while end > start and content[end] not in [" ", "\n", "\r", "\t"]:
+                end -= 1
+        if end == start:
+            end = start + chunk_size
+        end = min(end, len(content))
+        chunks.append(content[start:end])
+        start = end
+    return chunks
+
+
+def test_chunks_without_overlap_match_the_original_reader():
+    for chunk_size in (5, 10, 17, 40, 1000):
+        chunks = list(FixedSizeChunking(chunk_size=chunk_size).split(TEXT))
+        assert chunks == reference_chunks(TEXT, chunk_size)
+        assert "".join(chunks) == clean_text(TEXT)
+        assert all(len(chunk) <= chunk_size for chunk in chunks)
+
+
+def test_words_longer_than_a_chunk_are_split():
+    assert list(FixedSizeChunking(chunk_size=4).split("abcdefghij")) == ["abcd", "efgh", "ij"]
+
+
+def test_overlapping_chunks_start_on_a_word():
+    content = clean_text(TEXT)
+    words = set(content.split())
+    chunks = list(FixedSizeChunking(chunk_size=30, overlap=10).split(TEXT))
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        first_word = chunk.split()[0]
+        assert first_word in words
+        # Consecutive chunks share the words in the overlap
+        if not chunk.startswith(" "):
+            assert first_word in previous.split()
+    # Every word of the text is in a chunk
+    assert words == {word for chunk in chunks for word in chunk.split()}
+
+
+def test_overlap_without_a_word_start_continues_after_the_chunk():
+    chunks = list(FixedSizeChunking(chunk_size=10, overlap=4).split("hello world this is a test"))
+    assert chunks == ["hello", " world", " this is a", "a test"]
+
+
+def test_chunks_are_streamed_across_cleaned_blocks():
+    # Larger than the blocks the text is cleaned in
+    text = " \n ".join(f"word{i}" for i in range(300000))
+    chunks = list(FixedSizeChunking(chunk_size=100, overlap=20).split(text))
+    # Cleaning the text block by block does not change the chunks
+    assert chunks == list(FixedSizeChunking(chunk_size=100, overlap=20, clean=False).split(clean_text(text)))
+
+
+def test_chunk_numbers_documents_and_copies_meta_data():
+    document = Document(name="doc", content=TEXT, meta_data={"source": "test"})
+    chunks = Reader(chunk_size=40).chunk_document(document)
+    assert [chunk.meta_data["chunk"] for chunk in chunks] == list(range(1, len(chunks) + 1))
+    assert all(chunk.meta_data["source"] == "test" for chunk in chunks)
+    assert all(chunk.id == f"doc_{chunk.meta_data['chunk']}" for chunk in chunks)
+    assert [chunk.content for chunk in chunks] == reference_chunks(TEXT, 40)
@@ -0,0 +1,58 @@
+from typing import Dict, List, Optional, Tuple
+
+from phi.document import Document
+from phi.document.base import reuse_embeddings
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.vectordb.numpy import NumpyDb
+
+
+class UsageEmbedder(SyntheticEmbedder):
+    """Synthetic embedder which reports one token of usage per text"""
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), {"total_tokens": 1}
+
+
+def test_embed_batch_embeds_every_document():
+    embedder = UsageEmbedder(dimensions=8)
+    documents = [Document(content="a"), Document(content="b", embedding=[0.0] * 8)]
+    usage = Document.embed_batch(documents, embedder=embedder)
+    assert [document.embedding for document in documents] == [embedder.get_embedding("a"), embedder.get_embedding("b")]
+    assert usage == {"total_tokens": 2}
+    assert [document.usage for document in documents] == [{"total_tokens": 1}, {"total_tokens": 1}]
+
+
+def test_batch_usage_is_split_by_content_length():
+    documents = [Document(content="a" * 30), Document(content="b" * 10), Document(content="c" * 10)]
+    Document.embed_batch(documents, embedder=UsageEmbedder(dimensions=8))
+    # The three texts reported 3 tokens, the shares add up to the batch
+    assert [document.usage for document in documents] == [{"total_tokens": 2}, {"total_tokens": 1}, {"total_tokens": 0}]
+
+
+def test_stored_usage_is_the_share_of_each_document(tmp_path):
+    vector_db = NumpyDb(collection="usage", path=str(tmp_path), embedder=UsageEmbedder(dimensions=8))
+    vector_db.create()
+    vector_db.insert([Document(content=f"document {i}") for i in range(4)])
+    results = vector_db.search("query", limit=4)
+    vector_db.close()
+    assert [document.usage for document in results] == [{"total_tokens": 1}] * 4
+
+
+def test_existing_embeddings_are_kept_when_asked():
+    embedder = SyntheticEmbedder(dimensions=8)
+    documents = [Document(content="a"), Document(content="b", embedding=[0.0] * 8)]
+    Document.embed_batch(documents, embedder=embedder, skip_embedded=True)
+    assert documents[0].embedding == embedder.get_embedding("a")
+    assert documents[1].embedding == [0.0] * 8
+
+    documents[0].embedding = [1.0] * 8
+    with reuse_embeddings():
+        Document.embed_batch(documents, embedder=embedder)
+    assert documents[0].embedding == [1.0] * 8
+    # Outside the context documents are embedded again
+    Document.embed_batch(documents, embedder=embedder)
+    assert documents[0].embedding == embedder.get_embedding("a")
+
+
+def test_content_hash_replaces_null_characters():
+    assert Document(content="a\x00b").content_hash == Document(content="a\ufffdb").content_hash
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Tuple
+
+from phi.embedder.cached import CachedEmbedder
+from phi.embedder.synthetic import SyntheticEmbedder
+
+
+class CountingEmbedder(SyntheticEmbedder):
+    """Synthetic embedder which records the texts it was asked to embed"""
+
+    embedded: List[str] = []
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        self.embedded.append(text)
+        return self.get_embedding(text), {"total_tokens": 1}
+
+
+def test_batch_embeds_each_uncached_text_once(tmp_path):
+    embedder = CountingEmbedder(dimensions=8)
+    cached = CachedEmbedder(embedder=embedder, db_file=str(tmp_path.joinpath("cache.db")))
+
+    embeddings, usage = cached.get_embeddings_batch(["a", "b", "a"])
+    assert embedder.embedded == ["a", "b"]
+    assert usage == {"total_tokens": 2}
+    assert embeddings[0] == embeddings[2] == embedder.get_embedding("a")
+
+    embeddings, usage = cached.get_embeddings_batch(["b", "c"])
+    assert embedder.embedded == ["a", "b", "c"]
+    assert usage == {"total_tokens": 1}
+    assert embeddings == [embedder.get_embedding("b"), embedder.get_embedding("c")]
+    # Lookups are counted per text, the repeated "a" was not cached yet when the first batch was looked up
+    assert cached.hits == 1
+    assert cached.misses == 4
+
+
+def test_embeddings_are_persisted(tmp_path):
+    db_file = str(tmp_path.joinpath("cache.db"))
+    embedder = CountingEmbedder(dimensions=8)
+    CachedEmbedder(embedder=embedder, db_file=db_file).get_embeddings_batch(["a", "b"])
+
+    # A new cache reads the embeddings from the sqlite file instead of embedding again
+    cached = CachedEmbedder(embedder=embedder, db_file=db_file)
+    embedding, usage = cached.get_embedding_and_usage("a")
+    assert embedder.embedded == ["a", "b"]
+    assert usage is None
+    # Embeddings are stored as float32
+    assert embedding == embedder.get_vector("a").tolist()
+    assert cached.hit_rate == 1.0
+
+
+def test_memory_only_cache_evicts_least_recently_used():
+    embedder = CountingEmbedder(dimensions=8)
+    cached = CachedEmbedder(embedder=embedder, db_file=None, max_memory_entries=2)
+
+    cached.get_embeddings_batch(["a", "b"])
+    cached.get_embedding("a")
+    cached.get_embedding("c")
+    assert embedder.embedded == ["a", "b", "c"]
+
+    # "b" was the least recently used entry when "c" was added
+    cached.get_embedding("a")
+    cached.get_embedding("b")
+    assert embedder.embedded == ["a", "b", "c", "b"]
+
+
+def test_disk_entries_are_evicted_over_the_limit(tmp_path):
+    embedder = CountingEmbedder(dimensions=8)
+    cached = CachedEmbedder(
+        embedder=embedder, db_file=str(tmp_path.joinpath("cache.db")), max_memory_entries=1, max_disk_entries=10
+    )
+    cached.get_embeddings_batch([f"text {i}" for i in range(20)])
+    assert cached.connection is not None
+    num_entries = cached.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert num_entries <= 10
+
+
+def test_keys_depend_on_the_model_and_dimensions(tmp_path):
+    db_file = str(tmp_path.joinpath("cache.db"))
+    small = CachedEmbedder(embedder=CountingEmbedder(dimensions=8), db_file=db_file)
+    large = CachedEmbedder(embedder=CountingEmbedder(dimensions=16), db_file=db_file)
+    assert small.get_key("a") != large.get_key("a")
+    assert small.dimensions == 8
+    assert len(large.get_embedding("a")) == 16
+
+
+def test_clear(tmp_path):
+    embedder = CountingEmbedder(dimensions=8)
+    cached = CachedEmbedder(embedder=embedder, db_file=str(tmp_path.joinpath("cache.db")))
+    cached.get_embedding("a")
+    cached.clear()
+    assert cached.hits == cached.misses == 0
+    cached.get_embedding("a")
+    assert embedder.embedded == ["a", "a"]
@@ -0,0 +1,36 @@
+import numpy as np
+
+from phi.embedder.synthetic import SyntheticEmbedder
+
+
+def test_embeddings_are_deterministic():
+    embedder = SyntheticEmbedder(dimensions=16, seed=1)
+    assert embedder.get_embedding("a") == SyntheticEmbedder(dimensions=16, seed=1).get_embedding("a")
+    assert embedder.get_embedding("a") != embedder.get_embedding("b")
+    assert embedder.get_embedding("a") != SyntheticEmbedder(dimensions=16, seed=2).get_embedding("a")
+    assert embedder.get_embedding_and_usage("a") == (embedder.get_embedding("a"), None)
+
+
+def test_embeddings_are_normalized():
+    embedder = SyntheticEmbedder(dimensions=32, num_clusters=4)
+    vectors = np.stack([embedder.get_vector(f"text {i}") for i in range(20)])
+    assert vectors.shape == (20, 32)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert not np.allclose(np.linalg.norm(SyntheticEmbedder(normalize=False).get_vector("text")), 1.0)
+
+
+def test_clustered_embeddings_are_close_to_a_center():
+    embedder = SyntheticEmbedder(dimensions=64, num_clusters=3, cluster_spread=0.2)
+    centers = embedder.get_centers()
+    for i in range(20):
+        similarities = centers @ embedder.get_vector(f"text {i}")
+        assert similarities.max() > 0.9
+
+
+def test_batches_match_single_embeddings():
+    embedder = SyntheticEmbedder(dimensions=8, batch_size=3)
+    texts = [f"text {i}" for i in range(10)]
+    embeddings, usage = embedder.get_embeddings_batch(texts)
+    assert embeddings == [embedder.get_embedding(text) for text in texts]
+    assert usage is None
@@ -0,0 +1,74 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from phi.document import Document
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.knowledge import AssistantKnowledge
+from phi.vectordb.numpy import NumpyDb
+
+CONTENTS = ["alpha", "beta", "gamma"]
+
+
+class RetrieverKnowledgeBase(AssistantKnowledge):
+    """Knowledge base which searches without a vector db, overriding only `search` like the retriever ones"""
+
+    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
+        return [Document(content=content) for content in CONTENTS][: num_documents or self.num_documents]
+
+
+@pytest.mark.parametrize("mode", [None, "vector"])
+def test_overridden_search_runs_in_a_thread(mode):
+    knowledge_base = RetrieverKnowledgeBase(num_documents=3)
+    documents = asyncio.run(knowledge_base.async_search("query", num_documents=2, mode=mode))
+    assert [document.content for document in documents] == ["alpha", "beta"]
+
+
+def test_async_search_matches_search(tmp_path):
+    vector_db = NumpyDb(collection="async", path=str(tmp_path), embedder=SyntheticEmbedder(dimensions=16))
+    vector_db.create()
+    knowledge_base = AssistantKnowledge(vector_db=vector_db, num_documents=2)
+    knowledge_base.load_documents([Document(content=f"document {i}") for i in range(10)])
+    for mode in (None, "vector"):
+        assert asyncio.run(knowledge_base.async_search("query", mode=mode)) == knowledge_base.search("query")
+    vector_db.close()
+
+
+def test_langchain_async_search():
+    pytest.importorskip("langchain_core")
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from langchain_core.vectorstores import InMemoryVectorStore
+
+    from phi.knowledge.langchain import LangChainKnowledgeBase
+
+    vectorstore = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=16))
+    vectorstore.add_texts(CONTENTS)
+    knowledge_base = LangChainKnowledgeBase(vectorstore=vectorstore, num_documents=2)
+    documents = asyncio.run(knowledge_base.async_search("alpha"))
+    assert len(documents) == 2
+    assert documents[0].content == "alpha"
+
+
+def test_llamaindex_async_search():
+    pytest.importorskip("llama_index.core")
+    from llama_index.core import QueryBundle
+    from llama_index.core.retrievers import BaseRetriever
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    from phi.knowledge.llamaindex import LlamaIndexKnowledgeBase
+
+    class ListRetriever(BaseRetriever):
+        def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+            return [NodeWithScore(node=TextNode(text=content), score=1.0) for content in CONTENTS]
+
+    knowledge_base = LlamaIndexKnowledgeBase(retriever=ListRetriever())
+    documents = asyncio.run(knowledge_base.async_search("query", num_documents=2, mode="vector"))
+    assert [document.content for document in documents] == ["alpha", "beta"]
+
+
+def test_search_many_with_an_overridden_search():
+    knowledge_base = RetrieverKnowledgeBase(num_documents=3)
+    for mode in (None, "vector"):
+        results = knowledge_base.search_many(["a", "b"], num_documents=1, mode=mode)
+        assert [[document.content for document in documents] for documents in results] == [["alpha"], ["alpha"]]
@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from phi.document import Document
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.knowledge import AssistantKnowledge
+from phi.knowledge.cache import RetrievalCache
+from phi.vectordb.numpy import NumpyDb
+
+
+class CountingNumpyDb(NumpyDb):
+    """NumpyDb which counts the searches it runs"""
+
+    num_searches = 0
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[Document]:
+        self.num_searches += 1
+        return super().search(query, limit, filters, include_embeddings)
+
+
+@pytest.fixture
+def vector_db(tmp_path):
+    db = CountingNumpyDb(collection="cache", path=str(tmp_path), embedder=SyntheticEmbedder(dimensions=16))
+    db.create()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def knowledge_base(vector_db):
+    knowledge_base = AssistantKnowledge(vector_db=vector_db, num_documents=3, cache=RetrievalCache())
+    knowledge_base.load_documents([Document(content=f"document {i}", meta_data={"i": i}) for i in range(10)])
+    return knowledge_base
+
+
+def test_repeated_searches_are_served_from_the_cache(knowledge_base, vector_db):
+    documents = knowledge_base.search("Query  one")
+    assert vector_db.num_searches == 1
+
+    # Queries differing in case or whitespace share an entry
+    assert [d.content for d in knowledge_base.search("query one")] == [d.content for d in documents]
+    assert vector_db.num_searches == 1
+    assert knowledge_base.cache.hits == 1
+    assert knowledge_base.cache.misses == 1
+
+    # The limit and filters are part of the key
+    knowledge_base.search("query one", num_documents=2)
+    knowledge_base.search("query one", filters={"i": {"$lt": 5}})
+    assert vector_db.num_searches == 3
+
+
+def test_cached_documents_are_copies(knowledge_base):
+    knowledge_base.search("query")[0].content = "changed"
+    assert knowledge_base.search("query")[0].content != "changed"
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda db: db.insert([Document(content="query")]),
+        lambda db: db.upsert([Document(content="document 1", meta_data={"i": -1})]),
+        lambda db: db.delete_docs([Document(content="document 1").content_hash]),
+        lambda db: db.clear(),
+    ],
+)
+def test_writes_invalidate_the_cache(knowledge_base, vector_db, write):
+    knowledge_base.search("query")
+    version = vector_db.version
+    write(vector_db)
+    assert vector_db.version > version
+
+    after = knowledge_base.search("query")
+    assert vector_db.num_searches == 2
+    assert after == vector_db.search("query", limit=3)
+    assert knowledge_base.cache.hits == 0
+
+
+def test_loading_documents_invalidates_the_cache(knowledge_base, vector_db):
+    knowledge_base.search("query")
+    knowledge_base.load_text("query")
+    assert knowledge_base.search("query")[0].content == "query"
+    assert vector_db.num_searches == 2
+
+
+def test_entries_expire_after_the_ttl(knowledge_base, vector_db):
+    knowledge_base.cache = RetrievalCache(ttl=0)
+    knowledge_base.search("query")
+    knowledge_base.search("query")
+    assert vector_db.num_searches == 2
+
+
+def test_least_recently_used_entries_are_evicted(knowledge_base, vector_db):
+    knowledge_base.cache = RetrievalCache(max_entries=2)
+    for query in ("a", "b", "a", "c", "a", "b"):
+        knowledge_base.search(query)
+    # "b" was evicted when "c" was cached, "a" stayed as it was used more recently
+    assert vector_db.num_searches == 4
+    assert knowledge_base.cache.get_metrics()["cache_hits"] == 2
@@ -0,0 +1,113 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from phi.document import Document
+from phi.document.reader.text import TextReader
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.knowledge.manifest import LoadManifest
+from phi.knowledge.text import TextKnowledgeBase
+from phi.vectordb.numpy import NumpyDb
+
+
+class CountingTextReader(TextReader):
+    """Text reader which records the files it read"""
+
+    paths_read: List[str] = []
+
+    def read(self, path: Path) -> List[Document]:
+        self.paths_read.append(path.name)
+        return super().read(path)
+
+
+def write(path: Path, content: str) -> None:
+    path.write_text(content)
+
+
+def contents(vector_db: NumpyDb) -> List[str]:
+    return sorted(document.content for document in vector_db.search("query", limit=100))
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    files = tmp_path.joinpath("files")
+    files.mkdir()
+    write(files.joinpath("a.txt"), "alpha one")
+    write(files.joinpath("b.txt"), "beta two")
+    write(files.joinpath("c.txt"), "gamma three")
+
+    vector_db = NumpyDb(collection="manifest", path=str(tmp_path.joinpath("db")), embedder=SyntheticEmbedder())
+    knowledge_base = TextKnowledgeBase(
+        path=files,
+        reader=CountingTextReader(),
+        vector_db=vector_db,
+        manifest=LoadManifest(db_file=str(tmp_path.joinpath("manifest.db"))),
+    )
+    yield knowledge_base
+    vector_db.close()
+    assert knowledge_base.manifest is not None
+    knowledge_base.manifest.close()
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_reload_skips_unchanged_files(knowledge_base, pipeline):
+    reader = knowledge_base.reader
+    knowledge_base.load(pipeline=pipeline)
+    assert sorted(reader.paths_read) == ["a.txt", "b.txt", "c.txt"]
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two", "gamma three"]
+
+    version = knowledge_base.vector_db.version
+    knowledge_base.load(pipeline=pipeline)
+    assert len(reader.paths_read) == 3
+    assert knowledge_base.vector_db.version == version
+
+    # Touching a file changes its mtime but not its hash, it is not read again
+    path = Path(knowledge_base.path).joinpath("a.txt")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    knowledge_base.load(pipeline=pipeline)
+    assert len(reader.paths_read) == 3
+    entries = knowledge_base.manifest.get_entries(knowledge_base.get_manifest_namespace())
+    assert entries[str(path)].mtime == stat.st_mtime + 10
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_modified_files_replace_their_documents(knowledge_base, pipeline):
+    reader = knowledge_base.reader
+    knowledge_base.load(pipeline=pipeline)
+
+    write(Path(knowledge_base.path).joinpath("b.txt"), "beta two, edited")
+    knowledge_base.load(pipeline=pipeline)
+    assert reader.paths_read[3:] == ["b.txt"]
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two, edited", "gamma three"]
+
+
+def test_removed_files_delete_their_documents(knowledge_base):
+    knowledge_base.load()
+
+    Path(knowledge_base.path).joinpath("c.txt").unlink()
+    knowledge_base.load()
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two"]
+    entries = knowledge_base.manifest.get_entries(knowledge_base.get_manifest_namespace())
+    assert sorted(Path(path).name for path in entries) == ["a.txt", "b.txt"]
+
+
+def test_documents_shared_by_files_are_kept(knowledge_base):
+    write(Path(knowledge_base.path).joinpath("d.txt"), "alpha one")
+    knowledge_base.load()
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two", "gamma three"]
+
+    # a.txt and d.txt produce the same document, removing one of them keeps it
+    Path(knowledge_base.path).joinpath("a.txt").unlink()
+    knowledge_base.load()
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two", "gamma three"]
+
+
+def test_recreate_reloads_all_files(knowledge_base):
+    reader = knowledge_base.reader
+    knowledge_base.load()
+    knowledge_base.load(recreate=True)
+    assert len(reader.paths_read) == 6
+    assert contents(knowledge_base.vector_db) == ["alpha one", "beta two", "gamma three"]
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional, Tuple
+
+from phi.document import Document
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.knowledge.pipeline import LoadPipeline
+from phi.vectordb.numpy import NumpyDb
+
+
+class CountingEmbedder(SyntheticEmbedder):
+    """Synthetic embedder which records the texts it was asked to embed"""
+
+    embedded: List[str] = []
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        self.embedded.append(text)
+        return self.get_embedding(text), None
+
+
+def test_documents_are_embedded_once(tmp_path):
+    embedder = CountingEmbedder(dimensions=8)
+    vector_db = NumpyDb(collection="pipeline", path=str(tmp_path), embedder=embedder)
+    vector_db.create()
+    document_lists = iter([[Document(content=f"document {i}-{j}") for j in range(7)] for i in range(10)])
+
+    stats = LoadPipeline(concurrency=3, embed_batch_size=5, write_batch_size=20).run(vector_db, document_lists)
+    assert stats["write"].documents == 70
+    assert vector_db.get_count() == 70
+    # The vector db writes the embeddings of the embed stage instead of embedding the documents again
+    assert sorted(embedder.embedded) == sorted(f"document {i}-{j}" for i in range(10) for j in range(7))
+    vector_db.close()
+
+
+def test_existing_and_duplicate_documents_are_skipped(tmp_path):
+    embedder = CountingEmbedder(dimensions=8)
+    vector_db = NumpyDb(collection="pipeline", path=str(tmp_path), embedder=embedder)
+    vector_db.create()
+    vector_db.insert([Document(content="a")])
+
+    document_lists = iter([[Document(content="a"), Document(content="b")], [Document(content="b")]])
+    stats = LoadPipeline().run(vector_db, document_lists)
+    assert stats["write"].documents == 1
+    assert embedder.embedded == ["a", "b"]
+    assert vector_db.get_count() == 2
+    vector_db.close()
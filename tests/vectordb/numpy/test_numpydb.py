@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from phi.document import Document
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.vectordb.distance import Distance
+from phi.vectordb.numpy import NumpyDb
+
+
+def get_documents(num_documents: int):
+    return [
+        Document(
+            name=f"doc_{i % 3}",
+            content=f"document {i}",
+            meta_data={"i": i, "parity": "even" if i % 2 == 0 else "odd", "tags": ["a"] if i < 10 else ["b"]},
+        )
+        for i in range(num_documents)
+    ]
+
+
+def exact_neighbours(embedder: SyntheticEmbedder, documents, query: str, limit: int):
+    matrix = np.stack([embedder.get_vector(document.content) for document in documents])
+    scores = matrix @ embedder.get_vector(query)
+    return [documents[i].content for i in np.argsort(-scores)[:limit]]
+
+
+@pytest.fixture
+def embedder():
+    return SyntheticEmbedder(dimensions=32, num_clusters=4)
+
+
+@pytest.fixture
+def vector_db(tmp_path, embedder):
+    # A small initial capacity exercises the growth of the matrix
+    db = NumpyDb(collection="test", path=str(tmp_path), embedder=embedder, initial_capacity=4, search_block_size=16)
+    db.create()
+    yield db
+    db.close()
+
+
+def test_search_is_exact(vector_db, embedder):
+    documents = get_documents(100)
+    vector_db.insert(documents)
+    assert vector_db.get_count() == 100
+
+    for query in ("query 1", "query 2", "document 7"):
+        results = vector_db.search(query, limit=5)
+        assert [document.content for document in results] == exact_neighbours(embedder, documents, query, 5)
+        assert all(document.embedding is None for document in results)
+    assert vector_db.search("document 7", limit=1)[0].meta_data == {"i": 7, "parity": "odd", "tags": ["a"]}
+
+
+def test_search_batch_matches_search(vector_db):
+    vector_db.insert(get_documents(50))
+    queries = [f"query {i}" for i in range(5)]
+    batch_results = vector_db.search_batch(queries, limit=3, include_embeddings=True)
+    for query, results in zip(queries, batch_results):
+        assert [d.content for d in results] == [d.content for d in vector_db.search(query, limit=3)]
+        assert all(len(document.embedding or []) == 32 for document in results)
+
+
+def test_l2_distance(tmp_path, embedder):
+    vector_db = NumpyDb(collection="l2", path=str(tmp_path), embedder=embedder, distance=Distance.l2)
+    vector_db.create()
+    documents = get_documents(30)
+    vector_db.insert(documents)
+    # The vectors are normalized, so the l2 ranking is the cosine ranking
+    assert [d.content for d in vector_db.search("query", limit=4)] == exact_neighbours(embedder, documents, "query", 4)
+
+
+def test_filters(vector_db):
+    vector_db.insert(get_documents(40))
+
+    def contents(filters):
+        return {document.meta_data["i"] for document in vector_db.search("query", limit=100, filters=filters)}
+
+    assert contents({"parity": "even"}) == set(range(0, 40, 2))
+    assert contents({"name": "doc_1"}) == set(range(1, 40, 3))
+    assert contents({"i": {"$gte": 10, "$lt": 15}}) == set(range(10, 15))
+    assert contents({"i": {"$in": [1, 2, 3]}, "parity": "odd"}) == {1, 3}
+    assert contents({"i": {"$nin": [1, 2, 3]}, "i2": {"$ne": 1}}) == set(range(40)) - {1, 2, 3}
+    assert contents({"tags": ["a"]}) == set(range(10))
+    assert contents({"missing": 1}) == set()
+    with pytest.raises(ValueError):
+        contents({"i": {"$like": 1}})
+
+
+def test_exists_upsert_and_delete(vector_db):
+    documents = get_documents(20)
+    vector_db.insert(documents)
+    assert vector_db.doc_exists(documents[0])
+    assert vector_db.docs_exist(documents[:5] + [Document(content="new")]) == {d.content_hash for d in documents[:5]}
+    assert vector_db.name_exists("doc_2")
+
+    # Documents are keyed on their content hash, upserts replace them in place
+    vector_db.upsert([Document(name="renamed", content="document 3", meta_data={"i": 3})])
+    assert vector_db.get_count() == 20
+    assert vector_db.search("document 3", limit=1)[0].name == "renamed"
+
+    vector_db.delete_docs([d.content_hash for d in documents[:10]])
+    assert vector_db.get_count() == 10
+    results = vector_db.search("query", limit=20)
+    assert {document.meta_data["i"] for document in results} == set(range(10, 20))
+
+
+def test_collection_is_reopened_from_disk(tmp_path, embedder):
+    vector_db = NumpyDb(collection="persisted", path=str(tmp_path), embedder=embedder, compact_threshold=None)
+    vector_db.create()
+    documents = get_documents(30)
+    vector_db.insert(documents)
+    vector_db.delete_docs([documents[0].content_hash])
+    expected = [d.content for d in vector_db.search("query", limit=5)]
+    vector_db.close()
+
+    reopened = NumpyDb(collection="persisted", path=str(tmp_path), embedder=embedder)
+    assert reopened.exists()
+    assert reopened.get_count() == 29
+    assert [d.content for d in reopened.search("query", limit=5)] == expected
+
+    # Compaction drops the tombstoned row without changing the results
+    reopened.optimize()
+    assert [d.content for d in reopened.search("query", limit=5)] == expected
+
+    assert reopened.clear()
+    assert reopened.get_count() == 0
+    assert reopened.search("query") == []
+    reopened.delete()
+    assert not reopened.exists()
@@ -0,0 +1,143 @@
+"""Compiles the statements of PgVector2 searches without connecting to a database"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.vectordb.pgvector import PgVector2
+from phi.vectordb.pgvector.storage import VectorStorage
+from phi.vectordb.search import SearchType
+
+# The engine connects lazily, nothing listens on this url
+DB_URL = "postgresql+psycopg://ai:ai@localhost:1/ai"
+QUERY_EMBEDDING = [0.5, -0.5, 0.5, -0.5]
+
+
+def get_vector_db(**kwargs) -> PgVector2:
+    return PgVector2(collection="docs", db_url=DB_URL, embedder=SyntheticEmbedder(dimensions=4), **kwargs)
+
+
+def compile_sql(clause):
+    compiled = clause.compile(dialect=postgresql.dialect())
+    return " ".join(str(compiled).split()), compiled.params
+
+
+def test_plain_values_are_combined_into_one_containment():
+    vector_db = get_vector_db()
+    clauses = vector_db.get_filter_clauses({"author": "a", "page": 1, "tags": ["x"]})
+    assert len(clauses) == 1
+    sql, params = compile_sql(clauses[0])
+    assert sql == "ai.docs.meta_data @> %(meta_data_1)s::JSONB"
+    assert params == {"meta_data_1": {"author": "a", "page": 1, "tags": ["x"]}}
+
+
+def test_table_columns_are_compared_for_equality():
+    vector_db = get_vector_db()
+    clauses = vector_db.get_filter_clauses({"name": "doc", "page": 1})
+    assert [compile_sql(clause) for clause in clauses] == [
+        ("ai.docs.meta_data @> %(meta_data_1)s::JSONB", {"meta_data_1": {"page": 1}}),
+        ("ai.docs.name = %(name_1)s::VARCHAR", {"name_1": "doc"}),
+    ]
+
+
+def test_equality_operators_use_containment():
+    vector_db = get_vector_db()
+    (eq,) = vector_db.get_filter_clauses({"page": {"$eq": 2}})
+    assert compile_sql(eq) == ("ai.docs.meta_data @> %(meta_data_1)s::JSONB", {"meta_data_1": {"page": 2}})
+    (ne,) = vector_db.get_filter_clauses({"page": {"$ne": 2}})
+    assert compile_sql(ne) == ("NOT (ai.docs.meta_data @> %(meta_data_1)s::JSONB)", {"meta_data_1": {"page": 2}})
+
+
+def test_in_operators_use_one_containment_per_value():
+    vector_db = get_vector_db()
+    (in_clause,) = vector_db.get_filter_clauses({"url": {"$in": ["a", "b"]}})
+    sql, params = compile_sql(in_clause)
+    assert sql == "(ai.docs.meta_data @> %(meta_data_1)s::JSONB) OR (ai.docs.meta_data @> %(meta_data_2)s::JSONB)"
+    assert params == {"meta_data_1": {"url": "a"}, "meta_data_2": {"url": "b"}}
+
+    (nin_clause,) = vector_db.get_filter_clauses({"url": {"$nin": ["a"]}})
+    assert compile_sql(nin_clause)[0] == "NOT (ai.docs.meta_data @> %(meta_data_1)s::JSONB)"
+
+    # An empty $in matches nothing and an empty $nin everything
+    assert compile_sql(vector_db.get_filter_clauses({"url": {"$in": []}})[0])[0] == "false"
+    assert compile_sql(vector_db.get_filter_clauses({"url": {"$nin": []}})[0])[0] == "true"
+
+
+def test_range_operators_compare_numbers_numerically_and_other_values_as_text():
+    vector_db = get_vector_db()
+    gte, lt = vector_db.get_filter_clauses({"page": {"$gte": 2, "$lt": 10}})
+    assert compile_sql(gte) == (
+        "CAST((ai.docs.meta_data ->> %(meta_data_1)s::TEXT) AS FLOAT) >= %(param_1)s::INTEGER",
+        {"meta_data_1": "page", "param_1": 2},
+    )
+    assert compile_sql(lt)[0].endswith("< %(param_1)s::INTEGER")
+
+    (gt,) = vector_db.get_filter_clauses({"date": {"$gt": "2024-01-01"}})
+    assert compile_sql(gt) == (
+        "CAST((ai.docs.meta_data ->> %(meta_data_1)s::TEXT) AS VARCHAR) > %(param_1)s::VARCHAR",
+        {"meta_data_1": "date", "param_1": "2024-01-01"},
+    )
+
+
+def test_invalid_filters_raise():
+    vector_db = get_vector_db()
+    with pytest.raises(ValueError):
+        vector_db.get_filter_clauses({"page": {"$like": 1}})
+    with pytest.raises(ValueError):
+        vector_db.get_filter_clauses({"page": {"$in": 1}})
+
+
+def test_vector_search_applies_filters_in_the_nearest_neighbour_query():
+    vector_db = get_vector_db()
+    stmt = vector_db._get_vector_search_statement(
+        QUERY_EMBEDDING, 5, {"page": 1}, vector_db._get_result_columns(include_embeddings=True)
+    )
+    sql, params = compile_sql(stmt)
+    assert sql == (
+        "SELECT ai.docs.name, ai.docs.meta_data, ai.docs.content, ai.docs.usage, ai.docs.embedding FROM ai.docs "
+        "WHERE ai.docs.meta_data @> %(meta_data_1)s::JSONB ORDER BY ai.docs.embedding <=> %(embedding_1)s "
+        "LIMIT %(param_1)s::INTEGER"
+    )
+    assert params == {"meta_data_1": {"page": 1}, "embedding_1": QUERY_EMBEDDING, "param_1": 5}
+
+
+def test_quantized_search_reranks_candidates_at_full_precision():
+    vector_db = get_vector_db(storage=VectorStorage.halfvec, store_full_vector=True, rerank_candidates=4)
+    stmt = vector_db._get_vector_search_statement(QUERY_EMBEDDING, 5, {"page": 1}, vector_db._get_result_columns())
+    sql, params = compile_sql(stmt)
+    assert "JOIN (SELECT ai.docs.id AS id FROM ai.docs WHERE ai.docs.meta_data @> %(meta_data_1)s::JSONB" in sql
+    assert "ORDER BY ai.docs.embedding <=> %(embedding_1)s" in sql
+    assert sql.endswith("ORDER BY ai.docs.embedding_full <=> %(embedding_full_1)s LIMIT %(param_2)s::INTEGER")
+    assert params["param_1"] == 20
+    assert params["param_2"] == 5
+
+
+def test_keyword_search_filters_and_ranks_on_the_tsvector():
+    vector_db = get_vector_db(search_type=SearchType.keyword, content_language="simple")
+    sql, params = compile_sql(vector_db._get_keyword_search_statement("vector db", 3, {"page": 1}))
+    assert "WHERE (ai.docs.content_tsv @@ websearch_to_tsquery(" in sql
+    assert "AND ai.docs.meta_data @> %(meta_data_1)s::JSONB" in sql
+    assert "ORDER BY ts_rank_cd(ai.docs.content_tsv, websearch_to_tsquery(" in sql
+    assert params["param_1"] == "simple"
+    assert params["websearch_to_tsquery_1"] == "vector db"
+    assert params["param_2"] == 3
+
+
+def test_hybrid_search_fuses_both_rankings():
+    vector_db = get_vector_db(search_type=SearchType.hybrid, rrf_k=10, hybrid_candidates=2, keyword_weight=0.5)
+    sql, params = compile_sql(vector_db._get_hybrid_search_statement("vector db", QUERY_EMBEDDING, 5, {"page": 1}))
+    # Both candidate lists are filtered
+    assert sql.count("ai.docs.meta_data @> %(meta_data_1)s::JSONB") == 2
+    assert "FULL OUTER JOIN" in sql
+    assert sql.endswith("ORDER BY fused.score DESC")
+    assert params["param_1"] == 1.0
+    assert params["param_2"] == 0.5
+    assert params["rank_1"] == params["rank_2"] == 10
+    # Each ranking contributes limit * hybrid_candidates candidates
+    assert params["param_3"] == params["param_5"] == 10
+    assert params["param_6"] == 5
+
+
+def test_keyword_search_needs_the_tsvector_column():
+    with pytest.raises(ValueError):
+        get_vector_db().keyword_search("query")
@@ -0,0 +1,58 @@
+"""Runs the PgVector2 writes with the rows captured instead of copied to a database"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from phi.document import Document
+from phi.embedder.synthetic import SyntheticEmbedder
+from phi.vectordb.pgvector import PgVector2
+
+# The engine connects lazily, nothing listens on this url
+DB_URL = "postgresql+psycopg://ai:ai@localhost:1/ai"
+
+
+class CountingEmbedder(SyntheticEmbedder):
+    """Synthetic embedder which records the texts it was asked to embed"""
+
+    embedded: List[str] = []
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        self.embedded.append(text)
+        return self.get_embedding(text), None
+
+
+class CapturingPgVector2(PgVector2):
+    """PgVector2 which keeps the rows it would copy"""
+
+    rows: List[Dict[str, Any]] = []
+
+    def _copy_rows(self, sess, rows: List[Dict[str, Any]], upsert: bool) -> None:
+        self.rows.extend(rows)
+
+
+def get_vector_db(embedder: CountingEmbedder) -> CapturingPgVector2:
+    vector_db = CapturingPgVector2(collection="docs", db_url=DB_URL, embedder=embedder)
+    vector_db.rows = []
+    return vector_db
+
+
+def test_async_writes_embed_each_document_once():
+    embedder = CountingEmbedder(dimensions=4)
+    vector_db = get_vector_db(embedder)
+    documents = [Document(content=f"document {i}") for i in range(3)]
+
+    asyncio.run(vector_db.async_insert(documents))
+    assert embedder.embedded == ["document 0", "document 1", "document 2"]
+    asyncio.run(vector_db.async_upsert(documents[:1]))
+    assert embedder.embedded == ["document 0", "document 1", "document 2", "document 0"]
+    assert [row["content"] for row in vector_db.rows] == ["document 0", "document 1", "document 2", "document 0"]
+
+
+def test_sync_writes_embed_documents_again():
+    embedder = CountingEmbedder(dimensions=4)
+    vector_db = get_vector_db(embedder)
+    documents = [Document(content="document 0", embedding=[0.0] * 4)]
+    vector_db.insert(documents)
+    # An edited document does not keep a stale embedding
+    assert embedder.embedded == ["document 0"]
+    assert vector_db.rows[0]["embedding"] == embedder.get_embedding("document 0")